@@ -1,8 +1,8 @@
 -- Insert sample announcements
-INSERT INTO announcements (title, message, type, issued_by, valid_from, valid_until) VALUES
-('Monsoon Flood Advisory', 'Heavy rainfall is expected in Delhi and NCR from Sep 28. Avoid low-lying flood-prone zones and monitor official alerts.', 'Safety', 'Delhi Disaster Management Authority', '2025-09-27 09:00:00', '2025-09-29 20:00:00'),
-('Earthquake Safety Drill', 'A citywide earthquake safety drill will be conducted in Central Delhi on September 30. Please cooperate with authorities.', 'Advisory', 'Delhi District Magistrate', '2025-09-29 10:00:00', '2025-09-30 18:00:00'),
-('Heatwave Alert', 'Temperatures have crossed 45°C in parts of North India. Avoid outdoor exposure, stay hydrated, and check on vulnerable persons.', 'Safety', 'Indian Meteorological Department', '2025-06-01 08:00:00', '2025-06-15 20:00:00');
+INSERT INTO announcements (title, content, category, source, priority, location, valid_from, valid_until) VALUES
+('Monsoon Flood Advisory', 'Heavy rainfall is expected in Delhi and NCR from Sep 28. Avoid low-lying flood-prone zones and monitor official alerts.', 'Safety', 'Delhi Disaster Management Authority', 'HIGH', 'Delhi', '2025-09-27 09:00:00', '2025-09-29 20:00:00'),
+('Earthquake Safety Drill', 'A citywide earthquake safety drill will be conducted in Central Delhi on September 30. Please cooperate with authorities.', 'Advisory', 'Delhi District Magistrate', 'MEDIUM', 'Delhi', '2025-09-29 10:00:00', '2025-09-30 18:00:00'),
+('Heatwave Alert', 'Temperatures have crossed 45°C in parts of North India. Avoid outdoor exposure, stay hydrated, and check on vulnerable persons.', 'Safety', 'Indian Meteorological Department', 'CRITICAL', 'All India', '2025-06-01 08:00:00', '2025-06-15 20:00:00');
 
 -- Insert sample tourists
 INSERT INTO tourists (tourist_id, password, name, phone, email, emergency_contact, date_of_birth, address, last_stayed_lat, last_stayed_lon)
@@ -1,15 +1,19 @@
--- Announcements Table
+-- Announcements Table (columns as read by safety_updates_handler, area_report_handler and the export)
 DROP TABLE IF EXISTS announcements;
 CREATE TABLE announcements (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    announcement_id INT AUTO_INCREMENT PRIMARY KEY,
     title VARCHAR(200) NOT NULL,
-    message TEXT NOT NULL,
-    type VARCHAR(50),
-    issued_by VARCHAR(150),
+    content TEXT NOT NULL,
+    category VARCHAR(50),
+    source VARCHAR(150),
+    priority VARCHAR(10) NOT NULL DEFAULT 'MEDIUM',
+    location VARCHAR(150),
     valid_from DATETIME,
     valid_until DATETIME,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    published_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_announcements_active (is_active, priority, published_at)
 );
 
 -- Tourists Table
@@ -29,6 +33,74 @@ CREATE TABLE tourists (
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Tourist Locations Table (latest ping per tourist, written by backend/location-service)
+DROP TABLE IF EXISTS tourist_locations;
+CREATE TABLE tourist_locations (
+  tourist_id VARCHAR(20) NOT NULL PRIMARY KEY,
+  latitude DOUBLE NOT NULL,
+  longitude DOUBLE NOT NULL,
+  accuracy_m FLOAT,
+  recorded_at DATETIME(3) NOT NULL,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Location History Table (every ping, append-only, one partition per day)
+-- The primary key is the clustered index, so (tourist_id, time range) lookups are
+-- primary-key range scans. Daily partitions are created ahead of time and expired
+-- with DROP PARTITION by navrakshak.history.maintain_partitions.
+DROP TABLE IF EXISTS location_history;
+CREATE TABLE location_history (
+  tourist_id VARCHAR(20) NOT NULL,
+  recorded_at DATETIME(3) NOT NULL,
+  latitude DOUBLE NOT NULL,
+  longitude DOUBLE NOT NULL,
+  accuracy_m FLOAT,
+  PRIMARY KEY (tourist_id, recorded_at)
+) ENGINE=InnoDB
+PARTITION BY RANGE (TO_DAYS(recorded_at)) (
+  PARTITION p_start VALUES LESS THAN (TO_DAYS('2025-09-01')),
+  PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Location Segments Table (compressed tracks, used instead of location_history when
+-- HISTORY_FORMAT=segments; see navrakshak.trajectory for the data format)
+DROP TABLE IF EXISTS location_segments;
+CREATE TABLE location_segments (
+  tourist_id VARCHAR(20) NOT NULL,
+  start_at DATETIME(3) NOT NULL,
+  end_at DATETIME(3) NOT NULL,
+  raw_points INT NOT NULL,
+  stored_points INT NOT NULL,
+  tolerance_m FLOAT NOT NULL,
+  data BLOB NOT NULL,
+  PRIMARY KEY (tourist_id, start_at)
+) ENGINE=InnoDB
+PARTITION BY RANGE (TO_DAYS(start_at)) (
+  PARTITION p_start VALUES LESS THAN (TO_DAYS('2025-09-01')),
+  PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Geofence Alerts Table (entry / exit / violation / proximity transitions from the location service)
+DROP TABLE IF EXISTS geofence_alerts;
+CREATE TABLE geofence_alerts (
+  alert_id VARCHAR(80) NOT NULL PRIMARY KEY,
+  tourist_id VARCHAR(20) NOT NULL,
+  zone_id VARCHAR(40) NOT NULL,
+  zone_name VARCHAR(150),
+  zone_type VARCHAR(20) NOT NULL,
+  alert_type VARCHAR(20) NOT NULL,
+  severity VARCHAR(10) NOT NULL,
+  latitude DOUBLE NOT NULL,
+  longitude DOUBLE NOT NULL,
+  message VARCHAR(255),
+  created_at DATETIME(3) NOT NULL,
+  acknowledged BOOLEAN NOT NULL DEFAULT FALSE,
+  acknowledged_at DATETIME,
+  resolved_at DATETIME,
+  INDEX idx_geofence_alerts_created (created_at),
+  INDEX idx_geofence_alerts_tourist (tourist_id, created_at)
+);
+
 -- Police Stations Table
 DROP TABLE IF EXISTS police_stations;
 CREATE TABLE police_stations (
@@ -72,3 +144,32 @@ CREATE TABLE risk_zones (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Polygon risk zones; vertices are packed int32 micro-degree rings (see navrakshak.spatial)
+DROP TABLE IF EXISTS zone_polygons;
+CREATE TABLE zone_polygons (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    zone_name VARCHAR(150) NOT NULL,
+    description TEXT,
+    risk_score DECIMAL(3,1) NOT NULL,
+    min_lat DECIMAL(10,6) NOT NULL,
+    min_lon DECIMAL(10,6) NOT NULL,
+    max_lat DECIMAL(10,6) NOT NULL,
+    max_lon DECIMAL(10,6) NOT NULL,
+    vertex_count INT NOT NULL,
+    vertices MEDIUMBLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_zone_polygons_bbox (min_lat, max_lat, min_lon, max_lon)
+);
+
+
+-- Precomputed nearest-facility lookup tables (see navrakshak.facilities); built by tools/build_facility_grid.py
+DROP TABLE IF EXISTS facility_grids;
+CREATE TABLE facility_grids (
+    facility_type VARCHAR(30) PRIMARY KEY,
+    facility_count INT NOT NULL,
+    cell_count INT NOT NULL,
+    data LONGBLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,120 @@
+"""
+Where does the MySQL compressed protocol (``compress=True``) pay off?
+
+Builds realistic result-set wire payloads for announcements and tourists,
+measures zlib cost on both ends and the bytes saved, then reports the
+estimated transfer time with and without compression for several link
+speeds. Runs offline, no database needed.
+
+    python backend/benchmarks/compression_benchmark.py
+"""
+
+import argparse
+import random
+import struct
+import time
+import zlib
+
+LINK_SPEEDS_MBPS = [10, 50, 100, 500, 1000]
+
+WORDS = (
+    "heavy rainfall expected avoid low lying areas monitor official alerts "
+    "traffic diversion near temple tourists advised carry identification "
+    "emergency helpline police hospital district authority advisory safety "
+    "heatwave hydrated outdoor exposure vulnerable persons earthquake drill"
+).split()
+
+
+def lenenc_str(value):
+    data = value.encode('utf-8')
+    n = len(data)
+    if n < 251:
+        return bytes([n]) + data
+    if n < 1 << 16:
+        return b'\xfc' + struct.pack('<H', n) + data
+    return b'\xfd' + struct.pack('<I', n)[:3] + data
+
+
+def packet(payload, seq):
+    return struct.pack('<I', len(payload))[:3] + bytes([seq % 256]) + payload
+
+
+def announcement_row(rng, i):
+    content = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 120))).capitalize() + '.'
+    return [
+        str(i), f'Advisory {i}', content, rng.choice(['Safety', 'Advisory', 'Weather']),
+        'District Authority', rng.choice(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']),
+        rng.choice(['Delhi', 'Uttar Pradesh', 'All India']),
+        '2025-09-27 09:00:00', '2025-09-29 20:00:00', '2025-09-27 09:00:00', '2025-09-27 09:00:00',
+    ]
+
+
+def tourist_row(rng, i):
+    return [
+        f'T{i:07d}', f'Tourist {i}', f'+9198{rng.randint(10000000, 99999999)}',
+        f'tourist{i}@email.com', f'+9197{rng.randint(10000000, 99999999)}', '1990-05-15',
+        'KIET college, Ghaziabad, Lucknow', f'{rng.uniform(8, 35):.7f}', f'{rng.uniform(68, 97):.7f}',
+        '2025-09-09 10:35:00', '2025-09-09 10:35:00',
+    ]
+
+
+def result_set_bytes(make_row, rows, seed=1):
+    """Concatenated row packets as they would travel on the wire."""
+    rng = random.Random(seed)
+    return b''.join(
+        packet(b''.join(lenenc_str(v) for v in make_row(rng, i)), i)
+        for i in range(rows)
+    )
+
+
+def measure(data, level, repeat):
+    best_c = best_d = float('inf')
+    compressed = b''
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        compressed = zlib.compress(data, level)
+        t1 = time.perf_counter()
+        zlib.decompress(compressed)
+        t2 = time.perf_counter()
+        best_c = min(best_c, t1 - t0)
+        best_d = min(best_d, t2 - t1)
+    return len(compressed), best_c, best_d
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--level', type=int, default=zlib.Z_DEFAULT_COMPRESSION,
+                        help='zlib level (MySQL servers use the default level)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    datasets = [
+        ('announcements', announcement_row, [1, 10, 100, 1000, 10000]),
+        ('tourists', tourist_row, [1, 10, 100, 1000, 10000]),
+    ]
+
+    header = (f"{'dataset':<14}{'rows':>7}{'raw KB':>10}{'zlib KB':>10}{'ratio':>7}"
+              f"{'cpu ms':>9}  " + ''.join(f"{f'{s}Mb/s':>20}" for s in LINK_SPEEDS_MBPS))
+    print(header)
+    print('-' * len(header))
+    for name, make_row, sizes in datasets:
+        for rows in sizes:
+            data = result_set_bytes(make_row, rows)
+            size, c_time, d_time = measure(data, args.level, args.repeat)
+            cpu = c_time + d_time
+            cells = []
+            for mbps in LINK_SPEEDS_MBPS:
+                bytes_per_s = mbps * 1e6 / 8
+                plain = len(data) / bytes_per_s
+                packed = size / bytes_per_s + cpu
+                winner = 'zlib' if packed < plain else 'raw'
+                cells.append(f"{plain * 1e3:.2f}/{packed * 1e3:.2f} {winner[0]}")
+            print(f"{name:<14}{rows:>7}{len(data) / 1024:>10.1f}{size / 1024:>10.1f}"
+                  f"{len(data) / size:>7.2f}{cpu * 1e3:>9.3f}  " + ''.join(f"{c:>20}" for c in cells))
+    print()
+    print("Per link speed: raw ms / compressed ms (transfer + zlib on both ends), "
+          "winner r=raw z=zlib.")
+
+
+if __name__ == '__main__':
+    main()
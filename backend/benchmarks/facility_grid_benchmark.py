@@ -0,0 +1,130 @@
+"""
+Nearest-facility grid: build time, size, lookup speed and correctness.
+
+Places hospitals in clusters around synthetic cities plus a sparse rural
+spread over India, builds a ``FacilityGrid``, and compares its nearest
+facility with a linear scan over all facilities (what the SQL query in
+``nearest_hospitals_handler`` does) for random points. Then moves, adds
+and removes a few facilities and times the incremental update against a
+full rebuild. Runs offline, no database needed.
+
+    python backend/benchmarks/facility_grid_benchmark.py --facilities 30000 --queries 20000
+"""
+
+import argparse
+import random
+import time
+
+from navrakshak.facilities import DEFAULT_MAX_CANDIDATES, INDIA_BBOX, FacilityGrid
+from navrakshak.geofence import haversine_m
+
+
+def synthetic_facilities(rng, count, cities):
+    facilities = {}
+    min_lat, min_lon, max_lat, max_lon = INDIA_BBOX
+    for fid in range(1, count + 1):
+        if rng.random() < 0.8:
+            clat, clon = rng.choice(cities)
+            lat, lon = clat + rng.gauss(0, 0.15), clon + rng.gauss(0, 0.15)
+        else:
+            lat, lon = rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)
+        facilities[fid] = {'id': fid, 'name': f'Hospital {fid}', 'latitude': lat, 'longitude': lon}
+    return facilities
+
+
+def linear_nearest(facilities, lat, lon):
+    best = min(facilities.values(), key=lambda f: haversine_m(lat, lon, f['latitude'], f['longitude']))
+    return best, haversine_m(lat, lon, best['latitude'], best['longitude']) / 1000
+
+
+def random_points(rng, count, cities):
+    min_lat, min_lon, max_lat, max_lon = INDIA_BBOX
+    points = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            clat, clon = rng.choice(cities)
+            points.append((clat + rng.gauss(0, 0.2), clon + rng.gauss(0, 0.2)))
+        else:
+            points.append((rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)))
+    return points
+
+
+def check(grid, facilities, points):
+    mismatches = 0
+    for lat, lon in points:
+        found = grid.nearest(lat, lon)
+        _, expected_km = linear_nearest(facilities, lat, lon)
+        if found is None or abs(found[1] - expected_km) > 1e-9:
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--facilities', type=int, default=30000)
+    parser.add_argument('--cities', type=int, default=60)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--check', type=int, default=500, help='queries compared with a linear scan')
+    parser.add_argument('--changes', type=int, default=10)
+    parser.add_argument('--max-candidates', type=int, default=DEFAULT_MAX_CANDIDATES)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    min_lat, min_lon, max_lat, max_lon = INDIA_BBOX
+    cities = [(rng.uniform(min_lat + 2, max_lat - 2), rng.uniform(min_lon + 2, max_lon - 2))
+              for _ in range(args.cities)]
+    facilities = synthetic_facilities(rng, args.facilities, cities)
+
+    t0 = time.perf_counter()
+    grid = FacilityGrid(facilities, max_candidates=args.max_candidates)
+    build = time.perf_counter() - t0
+    blob = grid.to_bytes()
+    sizes = [len(ids) for _, ids in grid.cells.values()]
+    by_precision = {}
+    for cell in grid.cells:
+        by_precision[len(cell)] = by_precision.get(len(cell), 0) + 1
+    print(f'{len(facilities)} facilities: {len(grid.cells)} cells built in {build:.1f} s, '
+          f'{len(blob) / 1024:.0f} KB stored')
+    print('cells per precision: ' + ', '.join(f'{p}={n}' for p, n in sorted(by_precision.items())))
+    print(f'candidates per cell: mean {sum(sizes) / len(sizes):.1f}, max {max(sizes)}')
+
+    t0 = time.perf_counter()
+    restored = FacilityGrid.from_bytes(blob)
+    print(f'blob loaded in {(time.perf_counter() - t0) * 1e3:.0f} ms')
+
+    points = random_points(rng, args.queries, cities)
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        restored.nearest(lat, lon)
+    grid_time = (time.perf_counter() - t0) / len(points)
+    sample = points[:args.check]
+    t0 = time.perf_counter()
+    for lat, lon in sample[:50]:
+        linear_nearest(facilities, lat, lon)
+    scan_time = (time.perf_counter() - t0) / 50
+    print(f'lookup {grid_time * 1e6:.1f} us vs. linear scan {scan_time * 1e3:.1f} ms; '
+          f'{check(restored, facilities, sample)} mismatches in {len(sample)} checked')
+
+    changed = {fid: dict(row) for fid, row in facilities.items()}
+    ids = rng.sample(sorted(changed), args.changes * 2)
+    for fid in ids[:args.changes]:
+        changed[fid]['latitude'] += rng.gauss(0, 0.05)
+        changed[fid]['longitude'] += rng.gauss(0, 0.05)
+    for fid in ids[args.changes:]:
+        del changed[fid]
+    for n in range(args.changes):
+        fid = args.facilities + 1 + n
+        clat, clon = rng.choice(cities)
+        changed[fid] = {'id': fid, 'name': f'Hospital {fid}',
+                        'latitude': clat + rng.gauss(0, 0.15), 'longitude': clon + rng.gauss(0, 0.15)}
+
+    t0 = time.perf_counter()
+    count, cells = restored.update(changed)
+    update = time.perf_counter() - t0
+    print(f'update: {count} facilities changed, {cells} cells recomputed in {update:.2f} s '
+          f'(full build {build:.1f} s); {check(restored, changed, sample)} mismatches after update')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""
+Fake MySQL server speaking enough of the wire protocol for client benchmarks.
+
+An asyncio server for the vendored pymysql: it sends the handshake,
+verifies ``mysql_native_password`` or ``caching_sha2_password`` (fast
+path, or through an auth switch that costs one more round trip),
+speaks the compressed protocol and answers ``COM_QUERY`` with canned
+result sets, including several statements in one query
+(``Connection.query_batch``). Network conditions are injected on the
+server side, so runs are repeatable on loopback:
+
+``rtt_ms``
+    Delay before every response flight (the greeting included, standing
+    in for the TCP handshake), i.e. added round-trip time.
+``query_ms``
+    Server time per statement.
+``bandwidth_mbps``
+    Responses are paced to this rate.
+``fragment_bytes``
+    Responses are written in chunks of this size with ``TCP_NODELAY``,
+    so the client sees packets split across reads.
+
+By default ``SELECT`` / ``SHOW`` / ``WITH`` statements return a
+hospital-like result set (id, name, address, DECIMAL coordinates,
+DATETIME) with as many rows as their ``LIMIT`` (or ``default_rows``), and
+other statements return OK. Pass a ``resolver(sql)`` returning a
+:class:`ResultSet` or ``None`` to serve something else. No data is stored.
+Runs offline, no database needed.
+
+    python backend/benchmarks/fake_mysql.py --port 33061 --rtt-ms 1 --bandwidth-mbps 100
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import socket
+import struct
+import zlib
+from datetime import datetime, timedelta
+
+# Everything but SSL and CLIENT_DEPRECATE_EOF (results end with EOF packets)
+CAPABILITIES = 0xFFFFFFFF & ~(1 << 11) & ~(1 << 24)
+CLIENT_CONNECT_WITH_DB = 1 << 3
+CLIENT_COMPRESS = 1 << 5
+CLIENT_SECURE_CONNECTION = 1 << 15
+CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA = 1 << 21
+SERVER_STATUS_AUTOCOMMIT = 2
+SERVER_MORE_RESULTS_EXISTS = 8
+UTF8MB4 = 45
+BINARY = 63
+
+COM_QUIT = 1
+COM_QUERY = 3
+
+NATIVE = 'mysql_native_password'
+CACHING_SHA2 = 'caching_sha2_password'
+# account on mysql_native_password behind a caching_sha2_password default: one auth switch
+SWITCH = 'switch'
+AUTH_MODES = (NATIVE, CACHING_SHA2, SWITCH)
+
+LIMIT = re.compile(r'\bLIMIT\s+(?:\d+\s*,\s*)?(\d+)\s*$', re.IGNORECASE)
+ROWS_STATEMENT = re.compile(r'^\s*(SELECT|SHOW|WITH)\b', re.IGNORECASE)
+
+
+def lenenc_int(n):
+    if n < 251:
+        return bytes([n])
+    if n < 1 << 16:
+        return b'\xfc' + struct.pack('<H', n)
+    if n < 1 << 24:
+        return b'\xfd' + struct.pack('<I', n)[:3]
+    return b'\xfe' + struct.pack('<Q', n)
+
+
+def lenenc_str(value):
+    if value is None:
+        return b'\xfb'
+    data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+    return lenenc_int(len(data)) + data
+
+
+def _sha1(data):
+    return hashlib.sha1(data).digest()
+
+
+def _sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+def _xor(a, b):
+    return bytes(x ^ y for x, y in zip(a, b))
+
+
+def native_scramble(password, salt):
+    """What the client must send for ``mysql_native_password``."""
+    if not password:
+        return b''
+    stage1 = _sha1(password.encode('utf-8'))
+    return _xor(stage1, _sha1(salt + _sha1(stage1)))
+
+
+def caching_sha2_scramble(password, salt):
+    """What the client must send for the ``caching_sha2_password`` fast path."""
+    if not password:
+        return b''
+    p1 = _sha256(password.encode('utf-8'))
+    return _xor(p1, _sha256(_sha256(p1) + salt))
+
+
+class ResultSet:
+    """A canned result set.
+
+    :param columns: ``(name, field_type, charset)`` tuples; see
+        ``pymysql.constants.FIELD_TYPE``, charset 63 for binary/numeric
+        columns and 45 for text.
+    :param rows: Rows of values in the text protocol form (``str``,
+        ``bytes``, numbers or ``None``).
+    """
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.column_payloads = [
+            b''.join(lenenc_str(part) for part in ('def', 'navrakshak', 'bench', 'bench', name, name))
+            + b'\x0c' + struct.pack('<HIBHBxx', charset, 1024, field_type, 0, 0)
+            for name, field_type, charset in columns
+        ]
+        self.row_payloads = [b''.join(lenenc_str(value) for value in row) for row in rows]
+
+
+HOSPITAL_COLUMNS = [
+    ('id', 3, BINARY),             # LONG
+    ('name', 253, UTF8MB4),        # VAR_STRING
+    ('address', 253, UTF8MB4),
+    ('latitude', 246, BINARY),     # NEWDECIMAL
+    ('longitude', 246, BINARY),
+    ('created_at', 12, BINARY),    # DATETIME
+]
+
+
+def hospital_rows(n):
+    created = datetime(2025, 9, 1, 10, 35)
+    return [(i, f'District Hospital {i}', f'{i} Hospital Road, Ghaziabad', f'28.{i % 1000000:06d}0',
+             f'77.{i * 7 % 1000000:06d}0', (created + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'))
+            for i in range(n)]
+
+
+def default_resolver(default_rows=20):
+    """Hospital rows for ``SELECT``/``SHOW``/``WITH`` (``LIMIT`` rows if given), OK otherwise."""
+    cache = {}
+
+    def resolve(sql):
+        if not ROWS_STATEMENT.match(sql):
+            return None
+        match = LIMIT.search(sql)
+        n = int(match.group(1)) if match else default_rows
+        if n not in cache:
+            cache[n] = ResultSet(HOSPITAL_COLUMNS, hospital_rows(n))
+        return cache[n]
+    return resolve
+
+
+def split_statements(sql):
+    """Statements of a multi-statement query; ``;`` inside quotes does not split."""
+    statements, start, quote, i = [], 0, None, 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '\'"`':
+            quote = char
+        elif char == ';':
+            statements.append(sql[start:i])
+            start = i + 1
+        i += 1
+    statements.append(sql[start:])
+    return [s.strip() for s in statements if s.strip()]
+
+
+class Session:
+    """One client connection."""
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.seq = 0
+        self.compressed_seq = 0
+        self.compress = False
+        self.out = bytearray()
+        self.inbuf = bytearray()
+
+    def send(self, payload):
+        self.out += struct.pack('<I', len(payload))[:3] + bytes([self.seq]) + payload
+        self.seq = (self.seq + 1) % 256
+
+    def ok(self, status=SERVER_STATUS_AUTOCOMMIT):
+        self.send(b'\x00\x00\x00' + struct.pack('<HH', status, 0))
+
+    def eof(self, status=SERVER_STATUS_AUTOCOMMIT):
+        self.send(b'\xfe' + struct.pack('<HH', 0, status))
+
+    def error(self, code, state, message):
+        self.send(b'\xff' + struct.pack('<H', code) + b'#' + state.encode() + message.encode('utf-8'))
+
+    def result_set(self, result, status):
+        self.send(lenenc_int(len(result.columns)))
+        for payload in result.column_payloads:
+            self.send(payload)
+        self.eof()
+        for payload in result.row_payloads:
+            self.send(payload)
+        self.eof(status)
+
+    async def flush(self):
+        data = bytes(self.out)
+        self.out.clear()
+        if self.compress:
+            packed = zlib.compress(data) if len(data) >= 50 else None
+            if packed is not None and len(packed) < len(data):
+                header = struct.pack('<I', len(packed))[:3] + bytes([self.compressed_seq]) + struct.pack('<I', len(data))[:3]
+                data = header + packed
+            else:
+                data = struct.pack('<I', len(data))[:3] + bytes([self.compressed_seq]) + b'\0\0\0' + data
+            self.compressed_seq = (self.compressed_seq + 1) % 256
+        await self.server.write(self.writer, data)
+
+    async def read_bytes(self, n):
+        if not self.compress:
+            return await self.reader.readexactly(n)
+        while len(self.inbuf) < n:
+            header = await self.reader.readexactly(7)
+            length = int.from_bytes(header[:3], 'little')
+            uncompressed = int.from_bytes(header[4:7], 'little')
+            self.compressed_seq = (header[3] + 1) % 256
+            data = await self.reader.readexactly(length)
+            self.inbuf += zlib.decompress(data) if uncompressed else data
+        data = bytes(self.inbuf[:n])
+        del self.inbuf[:n]
+        return data
+
+    async def receive(self):
+        header = await self.read_bytes(4)
+        self.seq = (header[3] + 1) % 256
+        payload = await self.read_bytes(int.from_bytes(header[:3], 'little'))
+        self.server.stats['bytes_received'] += 4 + len(payload)
+        return payload
+
+    def greeting(self, salt, plugin):
+        return (b'\x0a' + self.server.version.encode() + b'\0' + struct.pack('<I', id(self) & 0x7FFFFFFF)
+                + salt[:8] + b'\0' + struct.pack('<H', CAPABILITIES & 0xFFFF) + bytes([UTF8MB4])
+                + struct.pack('<HH', SERVER_STATUS_AUTOCOMMIT, CAPABILITIES >> 16) + bytes([21]) + b'\0' * 10
+                + salt[8:] + b'\0' + plugin.encode() + b'\0')
+
+    async def authenticate(self):
+        server = self.server
+        salt = os.urandom(20)
+        plugin = NATIVE if server.auth == NATIVE else CACHING_SHA2
+        self.send(self.greeting(salt, plugin))
+        await server.delay(server.rtt_ms)
+        await self.flush()
+
+        response = await self.receive()
+        flags = struct.unpack_from('<I', response)[0]
+        position = 32
+        end = response.index(b'\0', position)
+        user = response[position:end].decode('utf-8')
+        position = end + 1
+        if flags & CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA:
+            length = response[position]  # short scrambles only
+            position += 1
+        elif flags & CLIENT_SECURE_CONNECTION:
+            length = response[position]
+            position += 1
+        else:
+            length = response.index(b'\0', position) - position
+        scramble = response[position:position + length]
+
+        if server.auth == SWITCH:
+            salt = os.urandom(20)
+            self.send(b'\xfe' + NATIVE.encode() + b'\0' + salt + b'\0')
+            await server.delay(server.rtt_ms)
+            await self.flush()
+            scramble = await self.receive()
+            plugin = NATIVE
+
+        if plugin == NATIVE:
+            valid = scramble == native_scramble(server.password, salt)
+        else:
+            valid = scramble == caching_sha2_scramble(server.password, salt)
+            if valid and server.password:
+                self.send(b'\x01\x03')  # fast auth succeeded
+        if user != server.user or not valid:
+            self.error(1045, '28000', f"Access denied for user '{user}'")
+            await server.delay(server.rtt_ms)
+            await self.flush()
+            return False
+        self.ok()
+        await server.delay(server.rtt_ms)
+        await self.flush()
+        self.compress = bool(flags & CLIENT_COMPRESS)
+        return True
+
+    async def run(self):
+        server = self.server
+        server.stats['connections'] += 1
+        if not await self.authenticate():
+            self.writer.close()
+            return
+        while True:
+            try:
+                payload = await self.receive()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            server.stats['commands'] += 1
+            command = payload[0]
+            if command == COM_QUIT:
+                self.writer.close()
+                return
+            if command == COM_QUERY:
+                statements = split_statements(payload[1:].decode('utf-8', 'replace'))
+                for i, statement in enumerate(statements):
+                    status = SERVER_STATUS_AUTOCOMMIT | (SERVER_MORE_RESULTS_EXISTS if i < len(statements) - 1 else 0)
+                    result = server.resolver(statement)
+                    if result is None:
+                        self.ok(status)
+                    else:
+                        self.result_set(result, status)
+                await server.delay(server.rtt_ms + server.query_ms * len(statements))
+            else:
+                # COM_PING, COM_INIT_DB, COM_SET_OPTION, ...
+                self.ok()
+                await server.delay(server.rtt_ms)
+            await self.flush()
+
+
+class FakeMySQLServer:
+    """Fake server; see the module docstring for the network options.
+
+    :param auth: ``mysql_native_password``, ``caching_sha2_password`` or
+        ``switch``.
+    :param resolver: ``resolver(statement)`` returning a :class:`ResultSet`
+        or ``None`` for an OK packet; defaults to :func:`default_resolver`.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, user='root', password='', auth=NATIVE, resolver=None,
+                 rtt_ms=0.0, query_ms=0.0, bandwidth_mbps=None, fragment_bytes=None, version='8.0.36-fake'):
+        if auth not in AUTH_MODES:
+            raise ValueError(f'Unknown auth mode: {auth}')
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.auth = auth
+        self.resolver = resolver or default_resolver()
+        self.rtt_ms = rtt_ms
+        self.query_ms = query_ms
+        self.bandwidth_mbps = bandwidth_mbps
+        self.fragment_bytes = fragment_bytes
+        self.version = version
+        self.stats = {'connections': 0, 'commands': 0, 'bytes_sent': 0, 'bytes_received': 0}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._session, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _session(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            await Session(self, reader, writer).run()
+        except ConnectionError:
+            pass
+
+    @staticmethod
+    async def delay(ms):
+        if ms > 0:
+            await asyncio.sleep(ms / 1000)
+
+    async def write(self, writer, data):
+        self.stats['bytes_sent'] += len(data)
+        if not self.fragment_bytes and not self.bandwidth_mbps:
+            writer.write(data)
+            await writer.drain()
+            return
+        chunk = self.fragment_bytes or 16384
+        for start in range(0, len(data), chunk):
+            piece = data[start:start + chunk]
+            writer.write(piece)
+            await writer.drain()
+            if self.bandwidth_mbps:
+                await asyncio.sleep(len(piece) * 8 / (self.bandwidth_mbps * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=33061, help='0 picks a free port')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--auth', choices=AUTH_MODES, default=NATIVE)
+    parser.add_argument('--rtt-ms', type=float, default=0.0)
+    parser.add_argument('--query-ms', type=float, default=0.0)
+    parser.add_argument('--bandwidth-mbps', type=float)
+    parser.add_argument('--fragment-bytes', type=int)
+    parser.add_argument('--default-rows', type=int, default=20, help='rows of a SELECT without LIMIT')
+    args = parser.parse_args()
+
+    async def serve():
+        server = await FakeMySQLServer(
+            args.host, args.port, args.user, args.password, args.auth, default_resolver(args.default_rows),
+            args.rtt_ms, args.query_ms, args.bandwidth_mbps, args.fragment_bytes).start()
+        print(f'listening on {args.host}:{server.port}', flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Sustained pings/sec of the streaming geofence engine on one core.
+
+Places circular risk zones around synthetic city centres, moves tourists
+on random walks that start inside those cities (so many pings hit zone
+cells), and feeds the pings through ``GeofenceEngine.process`` one at a
+time. Reports throughput, alerts emitted and how many pings took the
+no-candidate fast path. ``--index`` picks the R-tree (default) or the
+uniform grid. Runs offline, no database needed.
+
+    python backend/benchmarks/geofence_benchmark.py --zones 500 --tourists 10000 --pings 500000
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from navrakshak.geofence import CircleZone, GeofenceEngine, GridIndex
+from navrakshak.locations import Ping
+
+
+def synthetic_zones(rng, count, cities):
+    zones = []
+    for i in range(count):
+        clat, clon = rng.choice(cities)
+        zones.append(CircleZone(
+            i + 1, f'Zone {i + 1}', round(rng.uniform(1, 10), 1),
+            clat + rng.gauss(0, 0.08), clon + rng.gauss(0, 0.08), round(rng.uniform(0.2, 3.0), 2),
+        ))
+    return zones
+
+
+def synthetic_pings(rng, tourists, count, cities):
+    start = datetime(2025, 9, 27, 8)
+    positions = []
+    for _ in range(tourists):
+        clat, clon = rng.choice(cities)
+        positions.append([clat + rng.gauss(0, 0.1), clon + rng.gauss(0, 0.1), rng.uniform(0, 2 * math.pi)])
+    pings = []
+    for n in range(count):
+        i = rng.randrange(tourists)
+        pos = positions[i]
+        pos[2] += rng.gauss(0, 0.3)
+        # ~20 m per ping
+        pos[0] += math.cos(pos[2]) * 0.00018
+        pos[1] += math.sin(pos[2]) * 0.00018
+        pings.append(Ping(f'T{i:07d}', pos[0], pos[1], start + timedelta(milliseconds=n * 10), None))
+    return pings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--zones', type=int, default=500)
+    parser.add_argument('--cities', type=int, default=40)
+    parser.add_argument('--tourists', type=int, default=10000)
+    parser.add_argument('--pings', type=int, default=500000)
+    parser.add_argument('--proximity', type=float, default=200.0, help='metres, 0 disables proximity alerts')
+    parser.add_argument('--index', choices=['rtree', 'grid'], default='rtree')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cities = [(rng.uniform(8, 34), rng.uniform(70, 94)) for _ in range(args.cities)]
+    zones = synthetic_zones(rng, args.zones, cities)
+    pings = synthetic_pings(rng, args.tourists, args.pings, cities)
+
+    t0 = time.perf_counter()
+    factory = (lambda z, margin_m: GridIndex(z, margin_m=margin_m)) if args.index == 'grid' else None
+    engine = GeofenceEngine(zones, proximity_m=args.proximity, index_factory=factory)
+    build = time.perf_counter() - t0
+
+    index = engine.index
+    fast = sum(1 for p in pings if not index.candidates(p.latitude, p.longitude))
+
+    kinds = {}
+    t0 = time.perf_counter()
+    process = engine.process
+    for ping in pings:
+        for alert in process(ping):
+            kinds[alert['alertType']] = kinds.get(alert['alertType'], 0) + 1
+    elapsed = time.perf_counter() - t0
+
+    if args.index == 'grid':
+        shape = f'{len(index)} grid cells'
+    else:
+        shape = f'R-tree of height {index.height}'
+    print(f'{args.zones} zones, {shape}, index built in {build * 1e3:.1f} ms')
+    print(f'{len(pings)} pings from {args.tourists} tourists, '
+          f'{fast / len(pings):.0%} with no candidate zone')
+    print(f'{len(pings) / elapsed:,.0f} pings/s ({elapsed / len(pings) * 1e6:.2f} us/ping)')
+    print(f'{sum(kinds.values())} alerts: ' + ', '.join(f'{k}={v}' for k, v in sorted(kinds.items())))
+    print(f'{engine.tracked()} tourists inside or near a zone at the end')
+
+
+if __name__ == '__main__':
+    main()
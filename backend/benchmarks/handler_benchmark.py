@@ -0,0 +1,238 @@
+"""
+End-to-end latency of the Lambda handlers against a local MySQL.
+
+Recreates a scratch database on a local MySQL or MariaDB, loads
+``RDS/schema.sql``, fills it with ``tools/generate_dataset.py`` at every
+``--scales`` multiple and calls each ``lambda_handler`` in-process with
+random requests, exactly as Lambda would (one connection per invocation).
+Reports the cold first call, p50/p95/p99 and sequential throughput per
+handler and scale, plus the p50 of each traced phase; writes the results as
+JSON and compares them with an earlier run.
+
+Needs a server on port 3306 (the handlers do not take a port) that accepts
+the ``DB_*`` / ``--db-*`` credentials, e.g.
+
+    docker run -d -p 3306:3306 -e MYSQL_ALLOW_EMPTY_PASSWORD=1 mysql:8.0
+    python backend/benchmarks/handler_benchmark.py --scales 1,10 --out baseline.json
+    python backend/benchmarks/handler_benchmark.py --scales 1,10 --compare baseline.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HANDLER_DIR = os.path.join(BACKEND_DIR, 'db-querry-lambdas')
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'tools'))
+
+import _common  # noqa: E402  (puts the layers on sys.path)
+import generate_dataset  # noqa: E402
+from navrakshak import tracing  # noqa: E402
+
+
+def random_point(rng):
+    """A point near one of the generated cities, where the facilities are."""
+    _, lat, lon = generate_dataset.near_city(rng, 0.3)
+    return {'latitude': lat, 'longitude': lon}
+
+
+def request(body):
+    return {'body': json.dumps(body, default=str)}
+
+
+def tourist_id(rng, sizes):
+    return f"T{rng.randint(1, max(sizes['tourists'], 1)):07d}"
+
+
+# handler module -> function(rng, sizes) returning an API Gateway event
+CASES = {
+    'nearest_hospitals_handler': lambda rng, sizes: request(random_point(rng)),
+    'nearest_police_station_handler': lambda rng, sizes: request(random_point(rng)),
+    'area_info_handler': lambda rng, sizes: request(random_point(rng)),
+    'area_report_handler': lambda rng, sizes: request(random_point(rng)),
+    'batch_risk_handler': lambda rng, sizes: request({'points': [random_point(rng) for _ in range(100)]}),
+    'route_risk_handler': lambda rng, sizes: request(
+        {'start': random_point(rng), 'end': random_point(rng), 'max_step_m': 500}),
+    'safety_updates_handler': lambda rng, sizes: request({
+        'priority': rng.choice(['', 'HIGH', 'CRITICAL']),
+        'category': rng.choice(['', 'Safety', 'Weather']),
+        'limit': 20,
+    }),
+    'user_profile_handler': lambda rng, sizes: request(
+        {'tourist_id': tourist_id(rng, sizes), 'password': 'password123'}),
+    'location_history_handler': lambda rng, sizes: request(
+        {'tourist_id': tourist_id(rng, sizes)}),
+}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def schema_statements(path):
+    """Statements of a ``;``-terminated SQL file, comments dropped."""
+    with open(path, encoding='utf-8') as f:
+        lines = [line for line in f if not line.lstrip().startswith('--')]
+    return [statement.strip() for statement in ''.join(lines).split(';') if statement.strip()]
+
+
+def prepare(args, sizes, facility_grid):
+    """Recreate the scratch database and fill it; returns the generator summary."""
+    connection = _common.connect(argparse.Namespace(**{**vars(args), 'db_name': None}), local_infile=True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP DATABASE IF EXISTS `{args.db_name}`')
+            cursor.execute(f'CREATE DATABASE `{args.db_name}` CHARACTER SET utf8mb4')
+            cursor.execute(f'USE `{args.db_name}`')
+            for statement in schema_statements(os.path.join(BACKEND_DIR, 'RDS', 'schema.sql')):
+                cursor.execute(statement)
+        summary = generate_dataset.load(connection, sizes, args.seed, mode='auto')
+        if facility_grid:
+            from navrakshak.facilities import FacilityGrid, load_facilities, save_grid
+            for facility_type in ('hospitals', 'police_stations'):
+                save_grid(connection, facility_type, FacilityGrid(load_facilities(connection, facility_type)))
+        return summary
+    finally:
+        connection.close()
+
+
+def load_handler(name):
+    """A fresh copy of the handler module, so no cache survives from the previous scale."""
+    spec = importlib.util.spec_from_file_location(f'bench_{name}', os.path.join(HANDLER_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def failed(handler, event):
+    """Invoke *handler*; true on a 4xx/5xx response or an exception."""
+    try:
+        return handler(event, None).get('statusCode', 200) >= 400
+    except Exception:
+        return True
+
+
+def run_handler(name, requests, sizes, seed):
+    rng = random.Random(f'{seed}:{name}')
+    handler = load_handler(name).lambda_handler
+    tracing.reset()
+    events = [CASES[name](rng, sizes) for _ in range(requests + 1)]
+
+    started = time.perf_counter()
+    errors = int(failed(handler, events[0]))
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    started = time.perf_counter()
+    for event in events[1:]:
+        t0 = time.perf_counter()
+        errors += failed(handler, event)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    phases = {}
+    for function in tracing.report().values():
+        phases.update((phase, summary['p50']) for phase, summary in function.items() if phase != 'duration')
+    return {
+        'cold_ms': round(cold_ms, 2),
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(max(latencies), 2),
+        'requests_per_second': round(requests / elapsed, 1),
+        'errors': errors,
+        'phase_p50_ms': phases,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the change against *baseline*; returns the number of regressions."""
+    previous = {(r['handler'], r['scale']): r for r in baseline['results']}
+    regressions = 0
+    print()
+    print(f"{'handler':<32}{'scale':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for result in results:
+        before = previous.get((result['handler'], result['scale']))
+        if before is None:
+            continue
+        deltas = [result[key] / before[key] - 1 if before[key] else 0.0 for key in ('p50_ms', 'p95_ms', 'p99_ms')]
+        flag = ''
+        if deltas[1] > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{result['handler']:<32}{result['scale']:>6g}" + ''.join(f'{d:>+9.1%}' for d in deltas) + flag)
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', default='1,10', help='comma-separated generate_dataset.py --scale values')
+    parser.add_argument('--handlers', default=','.join(CASES), help='comma-separated handler modules')
+    parser.add_argument('--requests', type=int, default=300, help='timed requests per handler and scale')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--facility-grid', action='store_true',
+                        help='store the nearest-facility grids, so the nearest_* handlers skip SQL')
+    parser.add_argument('--out', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='results JSON of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.10, help='p95 slowdown reported as a regression')
+    _common.add_db_arguments(parser)
+    parser.set_defaults(db_name='navrakshak_bench')
+    args = parser.parse_args()
+
+    if not args.db_name.endswith('_bench'):
+        parser.error('the scratch database is dropped and recreated, so its name must end in _bench')
+    if args.db_port != 3306:
+        print('warning: the handlers always connect to port 3306', file=sys.stderr)
+    os.environ.update(DB_HOST=args.db_host, DB_USER=args.db_user, DB_PASSWORD=args.db_password,
+                      DB_NAME=args.db_name, TRACE_MODE='histogram', LOG_LEVEL='OFF')
+
+    handlers = args.handlers.split(',')
+    results = []
+    print(f"{'handler':<32}{'scale':>6}{'cold':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'errors':>8}")
+    for scale in (float(s) for s in args.scales.split(',')):
+        sizes = generate_dataset.sizes_for(scale)
+        started = time.perf_counter()
+        prepare(args, sizes, args.facility_grid)
+        print(f'-- scale {scale:g}: {sizes} loaded in {time.perf_counter() - started:.1f} s')
+        for name in handlers:
+            result = {'handler': name, 'scale': scale, 'sizes': sizes,
+                      **run_handler(name, args.requests, sizes, args.seed)}
+            results.append(result)
+            print(f"{name:<32}{scale:>6g}{result['cold_ms']:>9.1f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                  f"{result['p99_ms']:>9.1f}{result['requests_per_second']:>9.1f}{result['errors']:>8}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'requests': args.requests,
+                'seed': args.seed,
+                'facility_grid': args.facility_grid,
+                'results': results,
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            if compare(results, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-invocation logging cost: DEBUG prints vs. the sampled JSON logger.
+
+Replays the logging of one ``area_info_handler`` invocation: the old
+style (eleven ``print`` calls including ``json.dumps(event)``) against
+:class:`navrakshak.log.RequestLogger` at INFO, at INFO with 1% of
+invocations sampled at DEBUG, and at DEBUG. Output goes to /dev/null, so
+only the CPU cost is measured; bytes per invocation approximate the
+CloudWatch ingestion.
+
+    python backend/benchmarks/logging_benchmark.py --invocations 50000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+from navrakshak.log import RequestLogger
+
+EVENT = {
+    'resource': '/areainfo', 'path': '/areainfo', 'httpMethod': 'POST',
+    'headers': {'Content-Type': 'application/json', 'User-Agent': 'okhttp/4.12.0', 'X-Forwarded-For': '10.0.0.1'},
+    'requestContext': {'requestId': 'c6af9ac6-7b61-11e6-9a41-93e8deadbeef', 'stage': 'dev'},
+    'body': json.dumps({'latitude': 28.6139, 'longitude': 77.2090}),
+}
+
+
+class Context:
+    aws_request_id = 'c6af9ac6-7b61-11e6-9a41-93e8deadbeef'
+
+
+def print_style(event, out):
+    with contextlib.redirect_stdout(out):
+        print(f"DEBUG: Received event: {json.dumps(event)}")
+        body = json.loads(event['body'])
+        print("DEBUG: Using API Gateway format")
+        print(f"DEBUG: Parsed coordinates - lat: {body['latitude']}, lng: {body['longitude']}")
+        print("DEBUG: Loading risk zones from database")
+        print("DEBUG: Zone lookup done, found zone: True")
+        print("DEBUG: Risk score: 7.5")
+        print("DEBUG: Successfully created response")
+        print("DEBUG: Returning successful response")
+
+
+def logger_style(log):
+    @log.handler
+    def handler(event, context):
+        log.debug('received event: %s', event)
+        body = json.loads(event['body'])
+        log.debug('coordinates lat=%s lon=%s', body['latitude'], body['longitude'])
+        with log.timer('zones'):
+            log.debug('loading risk zones from database')
+        with log.timer('lookup'):
+            pass
+        log.note(zone_found=True, risk_score=7.5)
+        return {'statusCode': 200}
+    return handler
+
+
+class Counting(io.TextIOBase):
+    def __init__(self, sink):
+        self.sink = sink
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text)
+        return self.sink.write(text)
+
+
+def run(name, call, out, invocations):
+    out.bytes = 0
+    t0 = time.perf_counter()
+    for _ in range(invocations):
+        call()
+    elapsed = time.perf_counter() - t0
+    print(f'{name:<24} {elapsed / invocations * 1e6:8.1f} us/invocation  {out.bytes / invocations:7.0f} bytes/invocation')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--invocations', type=int, default=50000)
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull:
+        out = Counting(devnull)
+        run('print DEBUG lines', lambda: print_style(EVENT, out), out, args.invocations)
+        for name, level, rate in (('logger INFO', 'INFO', 0.0), ('logger INFO, 1% sampled', 'INFO', 0.01),
+                                  ('logger DEBUG', 'DEBUG', 0.0), ('logger OFF', 'OFF', 0.0)):
+            handler = logger_style(RequestLogger('area_info', level, rate, out))
+            run(name, lambda: handler(EVENT, Context()), out, args.invocations)
+
+
+if __name__ == '__main__':
+    main()
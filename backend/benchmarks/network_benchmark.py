@@ -0,0 +1,192 @@
+"""
+Connection setup, round trips, pipelining and compression of pymysql over an emulated network.
+
+Runs the vendored pymysql against ``fake_mysql.py`` (started in a
+subprocess per scenario) with an injected round-trip time and bandwidth:
+
+``connect``
+    ``pymysql.connect()`` + ``close()`` per auth mode: native password,
+    caching_sha2 fast path, and an auth switch (one more round trip).
+``reuse``
+    One small query per Lambda invocation, connecting each time (what
+    the handlers do) vs. on a connection kept across invocations.
+``pipelining``
+    Three ``area_report``-style statements one after another vs. in one
+    ``Connection.query_batch()`` round trip.
+``compression``
+    A large result with and without ``compress=True`` at each
+    ``--bandwidths`` link speed.
+``fragmentation``
+    A medium result delivered in small TCP segments, against the same
+    result in one write: the cost of the client's partial reads.
+
+Prints the median and p95 per variant. Runs offline, no database needed.
+
+    python backend/benchmarks/network_benchmark.py --rtt-ms 1 --iterations 200
+    python backend/benchmarks/network_benchmark.py --scenarios compression --bandwidths 5,50,500
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pymysql
+from pymysql.constants import CLIENT
+
+FAKE_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_mysql.py')
+PASSWORD = 'bench'
+
+SMALL_QUERY = 'SELECT id, name, latitude, longitude FROM hospitals ORDER BY distance LIMIT 1'
+REPORT_QUERIES = [
+    'SELECT zone_name, risk_score FROM risk_zones WHERE latitude BETWEEN 28.5 AND 28.7 LIMIT 5',
+    'SELECT name, phone FROM hospitals WHERE latitude BETWEEN 28.5 AND 28.7 LIMIT 3',
+    'SELECT title, content FROM announcements WHERE is_active = TRUE LIMIT 5',
+]
+
+
+@contextlib.contextmanager
+def fake_server(**options):
+    """Start ``fake_mysql.py`` with *options*; yields its port."""
+    command = [sys.executable, FAKE_SERVER, '--port', '0', '--password', PASSWORD]
+    for key, value in options.items():
+        if value is not None:
+            command += [f"--{key.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        line = process.stdout.readline()
+        if not line.startswith('listening on'):
+            raise RuntimeError(f'fake_mysql.py did not start: {line!r}')
+        yield int(line.rsplit(':', 1)[1])
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def connect(port, **kwargs):
+    return pymysql.connect(host='127.0.0.1', port=port, user='root', password=PASSWORD, database='navrakshak',
+                           cursorclass=pymysql.cursors.DictCursor, **kwargs)
+
+
+def timed(function, iterations):
+    """Milliseconds of each of *iterations* calls, after one warmup call."""
+    function()
+    times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def query(connection, sql):
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+def scenario_connect(args):
+    for auth in ('mysql_native_password', 'caching_sha2_password', 'switch'):
+        with fake_server(rtt_ms=args.rtt_ms, auth=auth) as port:
+            yield auth, timed(lambda: connect(port).close(), args.iterations)
+
+
+def scenario_reuse(args):
+    with fake_server(rtt_ms=args.rtt_ms) as port:
+        def per_invocation():
+            connection = connect(port)
+            try:
+                query(connection, SMALL_QUERY)
+            finally:
+                connection.close()
+        yield 'connect per invocation', timed(per_invocation, args.iterations)
+
+        connection = connect(port)
+        try:
+            yield 'reused connection', timed(lambda: query(connection, SMALL_QUERY), args.iterations)
+        finally:
+            connection.close()
+
+
+def scenario_pipelining(args):
+    with fake_server(rtt_ms=args.rtt_ms) as port:
+        connection = connect(port, client_flag=CLIENT.MULTI_STATEMENTS)
+        try:
+            yield '3 queries in sequence', timed(lambda: [query(connection, sql) for sql in REPORT_QUERIES],
+                                                 args.iterations)
+            yield '3 queries in query_batch', timed(lambda: connection.query_batch(REPORT_QUERIES), args.iterations)
+        finally:
+            connection.close()
+
+
+def scenario_compression(args):
+    sql = f'SELECT * FROM hospitals LIMIT {args.large_rows}'
+    for mbps in args.bandwidths:
+        with fake_server(rtt_ms=args.rtt_ms, bandwidth_mbps=mbps) as port:
+            for compress in (False, True):
+                connection = connect(port, compress=compress)
+                try:
+                    label = f"{mbps:g} Mbit/s {'compressed' if compress else 'plain'}"
+                    yield label, timed(lambda: query(connection, sql), max(args.iterations // 10, 5))
+                finally:
+                    connection.close()
+
+
+def scenario_fragmentation(args):
+    sql = 'SELECT * FROM hospitals LIMIT 200'
+    for fragment in (None, 1460, 64):
+        with fake_server(rtt_ms=args.rtt_ms, fragment_bytes=fragment) as port:
+            connection = connect(port)
+            try:
+                label = f'{fragment}-byte segments' if fragment else 'one write'
+                yield label, timed(lambda: query(connection, sql), args.iterations)
+            finally:
+                connection.close()
+
+
+SCENARIOS = {
+    'connect': scenario_connect,
+    'reuse': scenario_reuse,
+    'pipelining': scenario_pipelining,
+    'compression': scenario_compression,
+    'fragmentation': scenario_fragmentation,
+}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--rtt-ms', type=float, default=1.0, help='added round-trip time')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--bandwidths', type=lambda s: [float(v) for v in s.split(',')], default=[10.0, 100.0],
+                        help='link speeds in Mbit/s for the compression scenario')
+    parser.add_argument('--large-rows', type=int, default=5000, help='rows of the compression scenario result')
+    parser.add_argument('--out', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'scenario':<15}{'variant':<38}{'median ms':>10}{'p95 ms':>10}{'RTTs':>7}")
+    for name in args.scenarios.split(','):
+        for variant, times in SCENARIOS[name](args):
+            median = percentile(times, 0.5)
+            result = {'scenario': name, 'variant': variant, 'median_ms': round(median, 3),
+                      'p95_ms': round(percentile(times, 0.95), 3)}
+            results.append(result)
+            # RTTs: median time in units of the injected round trip, an upper bound on round trips taken
+            rtts = f'{median / args.rtt_ms:.1f}' if args.rtt_ms else '-'
+            print(f"{name:<15}{variant:<38}{result['median_ms']:>10.2f}{result['p95_ms']:>10.2f}{rtts:>7}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'rtt_ms': args.rtt_ms, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+Microbenchmarks of the vendored pymysql result decoding and escaping hot paths.
+
+Feeds MySQL result sets through ``protocol.MysqlPacket``,
+``MySQLResult._read_row_from_packet``, ``converters.escape_item``,
+``converters.convert_datetime`` and ``DictCursorMixin._conv_row`` one at a
+time, plus the whole ``DictCursor.execute()`` + ``fetchall()`` path, with
+no server. The result sets are synthesized for four row shapes (narrow,
+wide, DECIMAL/DATETIME heavy, large TEXT); ``--capture`` adds a recorded
+response (the raw server bytes of one query, e.g. cut from a packet
+capture).
+
+Timing works like pyperf: the loop count is calibrated until one run
+takes ``--min-time``, one warmup run is dropped, and the median of
+``--runs`` runs is reported with its spread. Allocations are counted
+separately with tracemalloc: memory blocks and bytes still held per
+operation, i.e. what the produced rows cost. Save a baseline with ``--out``
+and compare a later run with ``--compare``. Runs offline, no database
+needed.
+
+    python backend/benchmarks/pymysql_microbenchmark.py --out baseline.json
+    python backend/benchmarks/pymysql_microbenchmark.py --shapes wide,decimal_datetime --compare baseline.json
+"""
+
+import argparse
+import io
+import json
+import statistics
+import struct
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pymysql
+from pymysql import converters
+from pymysql.constants import FIELD_TYPE
+from pymysql.protocol import MysqlPacket
+
+BINARY = 63
+UTF8MB4 = 45
+EOF_PACKET = b'\xfe\x00\x00\x02\x00'
+BASE_TIME = datetime(2025, 9, 1, 8, 0)
+
+
+def lenenc_int(n):
+    if n < 251:
+        return bytes([n])
+    if n < 1 << 16:
+        return b'\xfc' + struct.pack('<H', n)
+    if n < 1 << 24:
+        return b'\xfd' + struct.pack('<I', n)[:3]
+    return b'\xfe' + struct.pack('<Q', n)
+
+
+def lenenc_str(value):
+    if value is None:
+        return b'\xfb'
+    data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+    return lenenc_int(len(data)) + data
+
+
+def column_def(name, field_type, charset):
+    return (b''.join(lenenc_str(part) for part in ('def', 'navrakshak', 'bench', 'bench', name, name))
+            + b'\x0c' + struct.pack('<HIBHBxx', charset, 1024, field_type, 0, 0))
+
+
+# (column, field type, charset, value of row i); text values as the server sends them
+def _columns(shape):
+    if shape == 'narrow':
+        return [
+            ('id', FIELD_TYPE.LONG, BINARY, lambda i: i),
+            ('name', FIELD_TYPE.VAR_STRING, UTF8MB4, lambda i: f'District Hospital {i}'),
+            ('latitude', FIELD_TYPE.DOUBLE, BINARY, lambda i: 28.6 + i * 1e-6),
+            ('longitude', FIELD_TYPE.DOUBLE, BINARY, lambda i: 77.2 + i * 1e-6),
+        ]
+    if shape == 'wide':
+        columns = [('id', FIELD_TYPE.LONGLONG, BINARY, lambda i: i)]
+        for c in range(15):
+            columns.append((f'label_{c}', FIELD_TYPE.VAR_STRING, UTF8MB4, lambda i, c=c: f'value {c} of row {i}'))
+            columns.append((f'count_{c}', FIELD_TYPE.LONG, BINARY, lambda i, c=c: i * c))
+        columns += [(f'flag_{c}', FIELD_TYPE.TINY, BINARY, lambda i, c=c: (i + c) % 2) for c in range(8)]
+        columns += [(f'score_{c}', FIELD_TYPE.DOUBLE, BINARY, lambda i, c=c: i / (c + 1)) for c in range(8)]
+        return columns
+    if shape == 'decimal_datetime':
+        columns = [('id', FIELD_TYPE.LONG, BINARY, lambda i: i)]
+        columns += [(f'amount_{c}', FIELD_TYPE.NEWDECIMAL, BINARY, lambda i, c=c: f'{i * 7 + c}.{(i * 31) % 1000000:06d}')
+                    for c in range(8)]
+        columns += [(f'at_{c}', FIELD_TYPE.DATETIME, BINARY,
+                     lambda i, c=c: (BASE_TIME + timedelta(seconds=i * 61 + c * 3600)).strftime('%Y-%m-%d %H:%M:%S'))
+                    for c in range(4)]
+        columns += [(f'at_ms_{c}', FIELD_TYPE.DATETIME, BINARY,
+                     lambda i, c=c: (BASE_TIME + timedelta(milliseconds=i * 1234 + c)).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3])
+                    for c in range(2)]
+        return columns
+    if shape == 'large_text':
+        paragraph = 'Heavy rainfall expected in low lying areas; follow official advisories. ' * 900
+        return [
+            ('announcement_id', FIELD_TYPE.LONG, BINARY, lambda i: i),
+            ('title', FIELD_TYPE.VAR_STRING, UTF8MB4, lambda i: f'Advisory {i}'),
+            ('content', FIELD_TYPE.BLOB, UTF8MB4, lambda i: paragraph[i % 50:]),
+        ]
+    raise ValueError(f'Unknown shape: {shape}')
+
+
+SHAPES = ('narrow', 'wide', 'decimal_datetime', 'large_text')
+DEFAULT_ROWS = {'narrow': 1000, 'wide': 500, 'decimal_datetime': 1000, 'large_text': 50}
+
+
+def packet(payload, seq):
+    return struct.pack('<I', len(payload))[:3] + bytes([seq % 256]) + payload
+
+
+def result_set(shape, rows):
+    """Server bytes of one result set of *rows* rows, sequence ids from 1."""
+    columns = _columns(shape)
+    payloads = [lenenc_int(len(columns))]
+    payloads += [column_def(name, field_type, charset) for name, field_type, charset, _ in columns]
+    payloads.append(EOF_PACKET)
+    payloads += [b''.join(lenenc_str(value(i)) for *_, value in columns) for i in range(rows)]
+    payloads.append(EOF_PACKET)
+    return b''.join(packet(p, seq + 1) for seq, p in enumerate(payloads))
+
+
+def split_packets(data):
+    """Payloads of the packets in *data* (no multi-packet payloads)."""
+    payloads, position = [], 0
+    while position < len(data):
+        length = int.from_bytes(data[position:position + 3], 'little')
+        payloads.append(data[position + 4:position + 4 + length])
+        position += 4 + length
+    return payloads
+
+
+class CannedSocket:
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data):
+        pass
+
+
+def canned_cursor(response):
+    conn = pymysql.connect(defer_connect=True, cursorclass=pymysql.cursors.DictCursor)
+    conn._sock = CannedSocket()
+    conn._rfile = io.BytesIO(response)
+    conn.server_status = 0
+    return conn.cursor()
+
+
+class Case:
+    """Inputs of every benchmark for one result set."""
+
+    def __init__(self, name, response):
+        self.name = name
+        self.response = response
+        cursor = canned_cursor(response)
+        cursor.execute('SELECT * FROM bench')
+        self.cursor = cursor
+        self.result = cursor._result
+        self.encoding = cursor.connection.encoding
+        self.columns = len(self.result.fields)
+        self.row_payloads = split_packets(response)[self.columns + 2:-1]
+        self.rows = self.result.rows
+        datetime_columns = [i for i, f in enumerate(self.result.fields) if f.type_code == FIELD_TYPE.DATETIME]
+        self.datetime_strings = [row[i].decode('ascii') for row in map(self._raw_row, self.row_payloads)
+                                 for i in datetime_columns if row[i] is not None]
+
+    def _raw_row(self, payload):
+        packet = MysqlPacket(payload, self.encoding)
+        return [packet.read_length_coded_string() for _ in range(self.columns)]
+
+
+def _packet(case):
+    encoding, columns = case.encoding, case.columns
+
+    def run(payload):
+        packet = MysqlPacket(payload, encoding)
+        return [packet.read_length_coded_string() for _ in range(columns)]
+    return run, case.row_payloads
+
+
+def _read_row(case):
+    read_row, encoding = case.result._read_row_from_packet, case.encoding
+    return (lambda payload: read_row(MysqlPacket(payload, encoding))), case.row_payloads
+
+
+def _escape(case):
+    escape_item = converters.escape_item
+
+    def run(row):
+        return [escape_item(value, 'utf8mb4') for value in row]
+    return run, case.rows
+
+
+def _convert_datetime(case):
+    return converters.convert_datetime, case.datetime_strings
+
+
+def _conv_row(case):
+    return case.cursor._conv_row, case.rows
+
+
+# benchmark -> function(case) returning (function of one input, inputs); one call is one op
+BENCHMARKS = {
+    'MysqlPacket': _packet,
+    '_read_row_from_packet': _read_row,
+    'escape_item': _escape,
+    'convert_datetime': _convert_datetime,
+    '_conv_row': _conv_row,
+}
+
+
+def time_ops(function, inputs, loops):
+    started = time.perf_counter()
+    for _ in range(loops):
+        for item in inputs:
+            function(item)
+    return time.perf_counter() - started
+
+
+def time_fetchall(case, loops):
+    """Whole ``execute()`` + ``fetchall()`` per op; rows are counted as ops."""
+    cursor = canned_cursor(case.response)
+    rfile = cursor.connection._rfile
+    started = time.perf_counter()
+    for _ in range(loops):
+        rfile.seek(0)
+        cursor.execute('SELECT * FROM bench')
+        cursor.fetchall()
+    return time.perf_counter() - started
+
+
+def measure(timer, ops_per_loop, runs, min_time):
+    """``(median ops/s, relative stdev)``; *timer(loops)* returns seconds."""
+    loops = 1
+    while timer(loops) < min_time and loops < 1 << 20:
+        loops *= 2
+    timer(loops)  # warmup
+    rates = [loops * ops_per_loop / timer(loops) for _ in range(runs)]
+    return statistics.median(rates), statistics.stdev(rates) / statistics.mean(rates) if runs > 1 else 0.0
+
+
+def allocations(function, inputs):
+    """Memory blocks and bytes still allocated per op after running *function* over *inputs*."""
+    inputs = list(inputs)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        outputs = [function(item) for item in inputs]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = [s for s in after.compare_to(before, 'filename') if s.size_diff > 0 or s.count_diff > 0]
+    del outputs
+    return (sum(s.count_diff for s in stats) / len(inputs), sum(s.size_diff for s in stats) / len(inputs))
+
+
+def run_case(case, names, runs, min_time):
+    results = []
+    for name in names:
+        if name == 'fetchall':
+            rate, spread = measure(lambda loops: time_fetchall(case, loops), len(case.rows), runs, min_time)
+            function, inputs = None, None
+        else:
+            function, inputs = BENCHMARKS[name](case)
+            if not inputs:
+                continue
+            rate, spread = measure(lambda loops: time_ops(function, inputs, loops), len(inputs), runs, min_time)
+        blocks, size = allocations(function, inputs[:200]) if function else (None, None)
+        results.append({'benchmark': name, 'shape': case.name, 'ops_per_second': round(rate), 'spread': round(spread, 4),
+                        'ns_per_op': round(1e9 / rate, 1), 'blocks_per_op': blocks and round(blocks, 2),
+                        'bytes_per_op': size and round(size)})
+    return results
+
+
+def print_result(result, baseline=None):
+    line = (f"{result['benchmark']:<24}{result['shape']:<18}{result['ops_per_second']:>12,}"
+            f"{'±' + format(result['spread'], '.1%'):>8}{result['ns_per_op']:>11,.0f}")
+    line += (f"{result['blocks_per_op']:>9.1f}{result['bytes_per_op']:>10,}" if result['blocks_per_op'] is not None
+             else f"{'-':>9}{'-':>10}")
+    if baseline:
+        line += f"{result['ops_per_second'] / baseline['ops_per_second']:>9.2f}x"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--shapes', default=','.join(SHAPES), help='comma-separated row shapes')
+    parser.add_argument('--benchmarks', default=','.join([*BENCHMARKS, 'fetchall']),
+                        help='comma-separated benchmarks')
+    parser.add_argument('--rows', type=int, help='rows per result set (default: per shape)')
+    parser.add_argument('--capture', help='raw server response of one query to add as shape "capture"')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds per run')
+    parser.add_argument('--out', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='results JSON of an earlier run')
+    args = parser.parse_args()
+
+    cases = [Case(shape, result_set(shape, args.rows or DEFAULT_ROWS[shape]))
+             for shape in args.shapes.split(',') if shape]
+    if args.capture:
+        with open(args.capture, 'rb') as f:
+            cases.append(Case('capture', f.read()))
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {(r['benchmark'], r['shape']): r for r in json.load(f)['results']}
+
+    print(f"{'benchmark':<24}{'shape':<18}{'ops/s':>12}{'':>8}{'ns/op':>11}{'blocks':>9}{'bytes':>10}"
+          + (f"{'vs base':>10}" if baseline else ''))
+    results = []
+    for case in cases:
+        for result in run_case(case, args.benchmarks.split(','), args.runs, args.min_time):
+            results.append(result)
+            print_result(result, baseline.get((result['benchmark'], result['shape'])))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'pymysql': pymysql.__version__, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Client-side cost of the pymysql query profiling hooks.
+
+Runs ``DictCursor.execute()`` + ``fetchall()`` against canned result-set
+packets served from memory (no server, no network), so the numbers are
+pure client CPU: without a profiler, with the in-memory top-N aggregate,
+and with a log sink whose threshold filters every query. Prints
+microseconds per query, the overhead against the unprofiled run and the
+top fingerprints of the last profiled run. Runs offline, no database needed.
+
+    python backend/benchmarks/query_profiling_benchmark.py --queries 2000
+"""
+
+import argparse
+import io
+import struct
+import time
+
+import pymysql
+from pymysql import profiling
+from pymysql.constants import FIELD_TYPE
+
+COLUMNS = [
+    ('id', FIELD_TYPE.LONG), ('name', FIELD_TYPE.VAR_STRING), ('latitude', FIELD_TYPE.NEWDECIMAL),
+    ('longitude', FIELD_TYPE.NEWDECIMAL), ('district', FIELD_TYPE.VAR_STRING),
+    ('created_at', FIELD_TYPE.DATETIME),
+]
+
+SQL = 'SELECT id, name, latitude, longitude, district, created_at FROM hospitals WHERE state = %s LIMIT %s'
+
+
+def lenenc_str(value):
+    data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+    return bytes([len(data)]) + data
+
+
+def packet(payload, seq):
+    return struct.pack('<I', len(payload))[:3] + bytes([seq]) + payload
+
+
+def column_def(name, field_type):
+    return (b''.join(lenenc_str(part) for part in ('def', 'navrakshak', 'hospitals', 'hospitals', name, name))
+            + b'\x0c' + struct.pack('<HIBHBxx', 45, 255, field_type, 0, 0))
+
+
+def result_set(rows):
+    """Wire bytes of one ``rows``-row response, sequence ids starting at 1."""
+    eof = b'\xfe\x00\x00\x02\x00'
+    payloads = [bytes([len(COLUMNS)])]
+    payloads += [column_def(name, field_type) for name, field_type in COLUMNS]
+    payloads.append(eof)
+    for i in range(rows):
+        payloads.append(b''.join(lenenc_str(v) for v in (
+            i, f'District Hospital {i}', f'28.{i:07d}', f'77.{i:07d}', 'Ghaziabad', '2025-09-09 10:35:00')))
+    payloads.append(eof)
+    return b''.join(packet(p, (seq + 1) % 256) for seq, p in enumerate(payloads))
+
+
+class CannedSocket:
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data):
+        pass
+
+
+def canned_connection(response, queries):
+    conn = pymysql.connect(defer_connect=True, cursorclass=pymysql.cursors.DictCursor)
+    conn._sock = CannedSocket()
+    conn._rfile = io.BytesIO(response * queries)
+    conn.server_status = 0
+    return conn
+
+
+def run(response, queries, rows):
+    conn = canned_connection(response, queries)
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    for _ in range(queries):
+        cursor.execute(SQL, ('Uttar Pradesh', rows))
+        cursor.fetchall()
+    return (time.perf_counter() - started) / queries * 1e6
+
+
+def best(repeat, sinks, *args):
+    """Fastest run per sink; the sinks take turns so drift hits them alike."""
+    times = [float('inf')] * len(sinks)
+    for _ in range(repeat):
+        for i, sink in enumerate(sinks):
+            if sink is None:
+                profiling.disable()
+            else:
+                profiling.enable(sink)
+            try:
+                times[i] = min(times[i], run(*args))
+            finally:
+                profiling.disable()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    top = profiling.TopQueries()
+    print(f"{'rows':>6}{'off us':>10}{'top-N us':>10}{'overhead':>10}{'log us':>10}{'overhead':>10}")
+    for rows in (1, 20, 200):
+        response = result_set(rows)
+        queries = max(args.queries // max(rows // 10, 1), 100)
+        sinks = [None, top, profiling.LogSink(io.StringIO(), min_ms=float('inf'))]
+        off, with_top, with_log = best(args.repeat, sinks, response, queries, rows)
+        print(f'{rows:>6}{off:>10.1f}{with_top:>10.1f}{with_top / off - 1:>10.1%}'
+              f'{with_log:>10.1f}{with_log / off - 1:>10.1%}')
+    print()
+    for entry in top.top(3):
+        print(f"{entry['count']:>8} x {entry['mean_ms'] * 1e3:7.1f} us (rtt {entry['mean_rtt_ms'] * 1e3:.1f} us, "
+              f"decode {entry['decode_ms'] / entry['count'] * 1e3:.1f} us, {entry['mean_rows']} rows)  "
+              f"{entry['fingerprint']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Batch risk assessment: NumPy arrays vs. per-point R-tree lookups.
+
+Builds circular risk zones (plus a few polygons) around synthetic city
+centres and assesses random points near those cities with
+``BatchAssessor`` twice: vectorized over NumPy arrays and with the
+per-point fallback. Checks both give the same nearest zone for every
+point and reports points/sec for each. Runs offline, no database needed.
+
+    python backend/benchmarks/risk_batch_benchmark.py --zones 2000 --points 20000
+"""
+
+import argparse
+import math
+import random
+import time
+
+from navrakshak.geofence import CircleZone
+from navrakshak.risk import BatchAssessor, np
+from navrakshak.spatial import PolygonZone
+
+
+def synthetic_zones(rng, count, polygons, cities):
+    zones = []
+    for i in range(count):
+        clat, clon = rng.choice(cities)
+        zones.append(CircleZone(
+            i + 1, f'Zone {i + 1}', round(rng.uniform(1, 10), 1),
+            clat + rng.gauss(0, 0.08), clon + rng.gauss(0, 0.08), round(rng.uniform(0.2, 3.0), 2),
+        ))
+    for i in range(polygons):
+        clat, clon = rng.choice(cities)
+        clat += rng.gauss(0, 0.05)
+        clon += rng.gauss(0, 0.05)
+        ring = []
+        for k in range(24):
+            angle = 2 * math.pi * k / 24
+            r = rng.uniform(0.005, 0.03)
+            ring.append((clat + r * math.sin(angle), clon + r * math.cos(angle)))
+        zones.append(PolygonZone(i + 1, f'Polygon {i + 1}', round(rng.uniform(1, 10), 1), [ring]))
+    return zones
+
+
+def run(assessor, points, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = assessor.nearest(points)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--zones', type=int, default=2000)
+    parser.add_argument('--polygons', type=int, default=50)
+    parser.add_argument('--cities', type=int, default=40)
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cities = [(rng.uniform(8, 34), rng.uniform(70, 94)) for _ in range(args.cities)]
+    zones = synthetic_zones(rng, args.zones, args.polygons, cities)
+    points = []
+    for _ in range(args.points):
+        clat, clon = rng.choice(cities)
+        points.append((clat + rng.gauss(0, 0.1), clon + rng.gauss(0, 0.1)))
+
+    print(f'{args.zones} circles, {args.polygons} polygons, {args.points} points')
+    fallback_time, expected = run(BatchAssessor(zones, use_numpy=False), points, args.repeat)
+    hits = sum(1 for zone, _ in expected if zone is not None)
+    print(f'{hits / len(points):.0%} of points inside a zone')
+    print(f"{'per-point R-tree':<18}{len(points) / fallback_time:>12,.0f} points/s")
+    if np is None:
+        print('NumPy is not installed, vectorized path skipped')
+        return
+
+    numpy_time, result = run(BatchAssessor(zones, use_numpy=True), points, args.repeat)
+    mismatches = sum(
+        1 for (a, da), (b, db) in zip(expected, result)
+        if a is not b and not (da is not None and db is not None and abs(da - db) < 1e-9)
+    )
+    print(f"{'numpy':<18}{len(points) / numpy_time:>12,.0f} points/s "
+          f'({fallback_time / numpy_time:.1f}x), {mismatches} mismatches')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Travel-time re-ranking of the nearest hospitals on a synthetic road graph.
+
+Builds a city-sized street grid (residential streets, an arterial every
+tenth row and column) cut by a river with a bridge every few kilometres,
+places hospitals at random, and for random points re-ranks the ``k``
+straight-line nearest hospitals by driving time. Reports graph size and
+load time, ranking latency percentiles against the time budget, how often
+the fastest hospital is not the closest one, and checks the A* times
+against a plain Dijkstra search. Runs offline, no database needed.
+
+    python backend/benchmarks/road_ranking_benchmark.py --size 300 --queries 2000
+"""
+
+import argparse
+import heapq
+import math
+import random
+import time
+
+from navrakshak.geofence import METRES_PER_DEGREE, haversine_m
+from navrakshak.roads import RoadGraph, build_graph, rank_by_travel_time
+
+ORIGIN = (28.45, 77.0)
+
+
+def street_grid(size, spacing_m, bridge_every):
+    """Nodes and ways of a ``size * size`` street grid with a river down the middle."""
+    dlat = spacing_m / METRES_PER_DEGREE
+    dlon = dlat / math.cos(math.radians(ORIGIN[0]))
+    nodes = {r * size + c: (ORIGIN[0] + r * dlat, ORIGIN[1] + c * dlon) for r in range(size) for c in range(size)}
+    river = size // 2
+    ways = []
+    for r in range(size):
+        speed = 50 if r % 10 == 0 else 20
+        row = [r * size + c for c in range(size)]
+        if r % bridge_every == 0:
+            ways.append((row, speed, 0))
+        else:
+            # The street stops at the river bank
+            ways.append((row[:river], speed, 0))
+            ways.append((row[river:], speed, 0))
+    for c in range(size):
+        ways.append(([r * size + c for r in range(size)], 50 if c % 10 == 0 else 20, 0))
+    return nodes, ways
+
+
+def dijkstra_times(graph, lat, lon, targets):
+    """Reference: exhaustive search, same snapping and access legs as :meth:`RoadGraph.travel_times`."""
+    from navrakshak.roads import ACCESS_SPEED_MPS
+    start = graph.snap(lat, lon)
+    best = {start[0]: start[1] / ACCESS_SPEED_MPS}
+    heap = [(best[start[0]], start[0])]
+    while heap:
+        g, node = heapq.heappop(heap)
+        if g > best[node]:
+            continue
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            neighbour = graph.targets[edge]
+            cost = g + graph.seconds[edge]
+            if cost < best.get(neighbour, math.inf):
+                best[neighbour] = cost
+                heapq.heappush(heap, (cost, neighbour))
+    times = []
+    for target_lat, target_lon in targets:
+        node, access_m = graph.snap(target_lat, target_lon)
+        times.append(best[node] + access_m / ACCESS_SPEED_MPS if node in best else None)
+    return times
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=300, help='streets per side')
+    parser.add_argument('--spacing', type=float, default=150.0, help='metres between streets')
+    parser.add_argument('--bridge-every', type=int, default=25, help='streets between bridges')
+    parser.add_argument('--hospitals', type=int, default=60)
+    parser.add_argument('--candidates', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--check', type=int, default=30, help='queries checked against Dijkstra')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    nodes, ways = street_grid(args.size, args.spacing, args.bridge_every)
+    t0 = time.perf_counter()
+    graph = build_graph(nodes, ways)
+    build = time.perf_counter() - t0
+    data = graph.to_bytes()
+    t0 = time.perf_counter()
+    graph = RoadGraph.from_bytes(data)
+    load = time.perf_counter() - t0
+    print(f'{len(nodes)} street nodes -> {len(graph)} graph nodes, {graph.edge_count} edges, '
+          f'{len(data) / 1024:.0f} KB; built in {build:.1f} s, loaded in {load * 1e3:.1f} ms')
+
+    lat0, lon0 = nodes[0]
+    lat1, lon1 = nodes[len(nodes) - 1]
+
+    def random_point():
+        return rng.uniform(lat0, lat1), rng.uniform(lon0, lon1)
+
+    hospitals = [{'id': i, 'latitude': lat, 'longitude': lon} for i, (lat, lon) in
+                 enumerate(random_point() for _ in range(args.hospitals))]
+
+    def straight_line(lat, lon):
+        ranked = sorted((haversine_m(lat, lon, h['latitude'], h['longitude']) / 1000, h['id']) for h in hospitals)
+        return [(hospitals[i], d) for d, i in ranked[:args.candidates]]
+
+    latencies = []
+    changed = saved = unreached = mismatches = 0
+    for n in range(args.queries):
+        lat, lon = random_point()
+        candidates = straight_line(lat, lon)
+        t0 = time.perf_counter()
+        ranked = rank_by_travel_time(graph, lat, lon, candidates, args.budget_ms / 1000)
+        latencies.append(time.perf_counter() - t0)
+        unreached += sum(1 for entry in ranked if entry[2] is None)
+        if ranked[0][0] is not candidates[0][0]:
+            changed += 1
+            closest = next(entry for entry in ranked if entry[0] is candidates[0][0])
+            if closest[2] is not None:
+                saved += closest[2] - ranked[0][2]
+        if n < args.check:
+            expected = dijkstra_times(graph, lat, lon, [(h['latitude'], h['longitude']) for h, _ in candidates])
+            fastest = min(t for t in expected if t is not None)
+            if ranked[0][2] is None or abs(ranked[0][2] - fastest) > 1e-3:
+                mismatches += 1
+
+    print(f'ranking {args.candidates} candidates: p50 {percentile(latencies, 0.5) * 1e3:.1f} ms, '
+          f'p95 {percentile(latencies, 0.95) * 1e3:.1f} ms, p99 {percentile(latencies, 0.99) * 1e3:.1f} ms, '
+          f'max {max(latencies) * 1e3:.1f} ms (budget {args.budget_ms:.0f} ms)')
+    print(f'fastest hospital is not the closest in {changed / args.queries:.1%} of queries, '
+          f'{saved / 60 / max(changed, 1):.1f} min faster on average; '
+          f'{unreached} candidates left unranked by the budget')
+    print(f'{mismatches} of {min(args.check, args.queries)} fastest times differ from Dijkstra')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Route risk scoring latency.
+
+Builds circular and polygon risk zones around synthetic city centres and
+scores random-walk routes that pass through those cities with
+``score_route``. Reports milliseconds per route and compares the total
+exposure with an estimate that samples the route about every metre and
+tests each sample for containment. Runs offline, no database needed.
+
+    python backend/benchmarks/route_benchmark.py --zones 5000 --vertices 500 --routes 20
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+
+from navrakshak.geofence import CircleZone
+from navrakshak.routes import densify, score_route
+from navrakshak.spatial import PolygonZone, ZoneIndex
+
+
+def synthetic_zones(rng, count, polygons, cities):
+    zones = []
+    for i in range(count):
+        clat, clon = rng.choice(cities)
+        zones.append(CircleZone(
+            i + 1, f'Zone {i + 1}', round(rng.uniform(1, 10), 1),
+            clat + rng.gauss(0, 0.08), clon + rng.gauss(0, 0.08), round(rng.uniform(0.2, 3.0), 2),
+        ))
+    for i in range(polygons):
+        clat, clon = rng.choice(cities)
+        clat += rng.gauss(0, 0.05)
+        clon += rng.gauss(0, 0.05)
+        ring = []
+        for k in range(24):
+            angle = 2 * math.pi * k / 24
+            r = rng.uniform(0.005, 0.03)
+            ring.append((clat + r * math.sin(angle), clon + r * math.cos(angle)))
+        zones.append(PolygonZone(i + 1, f'Polygon {i + 1}', round(rng.uniform(1, 10), 1), [ring]))
+    return zones
+
+
+def synthetic_route(rng, vertices, cities):
+    lat, lon = rng.choice(cities)
+    heading = rng.uniform(0, 2 * math.pi)
+    route = [(lat, lon)]
+    for _ in range(vertices - 1):
+        heading += rng.gauss(0, 0.3)
+        # 50-400 m legs
+        step = rng.uniform(50, 400) / 111320
+        lat += math.cos(heading) * step
+        lon += math.sin(heading) * step / math.cos(math.radians(lat))
+        route.append((lat, lon))
+    return route
+
+
+def sampled_exposure(index, route, step_m=1.0):
+    points, lengths = densify(route, step_m)
+    exposure = 0.0
+    for (a, b), length in zip(zip(points, points[1:]), lengths):
+        lat, lon = (a[0] + b[0]) / 2, (a[1] + b[1]) / 2
+        risk = max((z.risk_score for z in index.containing(lat, lon)), default=0.0)
+        exposure += risk * length / 1000
+    return exposure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--zones', type=int, default=5000)
+    parser.add_argument('--polygons', type=int, default=100)
+    parser.add_argument('--cities', type=int, default=40)
+    parser.add_argument('--vertices', type=int, default=500)
+    parser.add_argument('--routes', type=int, default=20)
+    parser.add_argument('--step', type=float, default=250.0, help='densify step in metres')
+    parser.add_argument('--check', type=int, default=2, help='routes to compare with point sampling')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cities = [(rng.uniform(8, 34), rng.uniform(70, 94)) for _ in range(args.cities)]
+    zones = synthetic_zones(rng, args.zones, args.polygons, cities)
+    index = ZoneIndex(zones)
+    routes = [synthetic_route(rng, args.vertices, cities) for _ in range(args.routes)]
+
+    timings = []
+    results = []
+    for route in routes:
+        t0 = time.perf_counter()
+        results.append(score_route(index, route, args.step))
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+
+    segments = statistics.mean(len(r['segments']) for r in results)
+    risky = statistics.mean(r['distance_in_risk_zones_km'] / r['distance_km'] for r in results)
+    print(f'{args.zones} circles, {args.polygons} polygons; {args.routes} routes of {args.vertices} vertices '
+          f'(~{statistics.mean(r["distance_km"] for r in results):.0f} km, {segments:.0f} segments, '
+          f'{risky:.0%} inside zones)')
+    print(f'score_route: p50 {timings[len(timings) // 2]:.1f} ms, max {timings[-1]:.1f} ms')
+
+    for route, result in list(zip(routes, results))[:args.check]:
+        expected = sampled_exposure(index, route)
+        print(f"exposure {result['total_exposure']:.3f} risk-km vs. {expected:.3f} sampled every 1 m")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+"""
+Load generator for the Lex router: synthetic Lex V2 events at a target rate.
+
+Builds fulfillment events the way the exported bot in ``Chatbot/AI-Model/Lex``
+shapes them. Slot names, slot values and sample utterances are read per
+locale from the bot definition, so Hindi events carry the Hindi slot values.
+Intents, locales and slot values are drawn from a configurable mix;
+coordinates cluster around the cities of ``tools/generate_dataset.py``.
+
+The events drive ``router.lambda_handler`` in-process against local stub
+backends, which serve the five APIs with an injectable latency and error
+rate over keep-alive HTTP, like the real functions behind API Gateway.
+With ``--url`` the events are POSTed to a deployed router or a local
+emulator instead. Requests are sent open-loop at ``--rps``; latencies count
+from the scheduled send time, so queueing behind a slow router shows up in
+the tail instead of lowering the rate. Reports p50/p95/p99/max and the
+error rate per intent and locale. The in-process mode also reports the
+p50 of each router phase. Runs offline, no database needed (the router
+needs ``urllib3``).
+
+    python backend/benchmarks/router_load.py --requests 2000 --rps 100 --backend-latency-ms 30
+    python backend/benchmarks/router_load.py --mix mix.json --save-events events.jsonl --out load.json
+    python backend/benchmarks/router_load.py --replay events.jsonl --url http://127.0.0.1:9000/lex --concurrency 32
+
+A mix file gives relative weights; slot values are keyed by slot type and
+missing values are drawn uniformly:
+
+    {"locales": {"en_US": 3, "hi_IN": 1},
+     "intents": {"AreaInformation": 5, "EmergencyAssistance": 2, "DigitalID": 1, "SafetyUpdates": 2},
+     "slots": {"AreaInfoType": {"hospital": 3, "police": 2, "safety": 1, "अस्पताल": 3}}}
+"""
+
+import argparse
+import glob
+import http.client
+import importlib.util
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+ROUTER_PATH = os.path.join(BACKEND_DIR, 'lambda-router', 'router.py')
+DEFAULT_BOT = os.path.join(REPO_DIR, 'Chatbot', 'AI-Model', 'Lex', 'Lex Configuration', 'NavRakshak-Chatbot')
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'tools'))
+
+import _common  # noqa: E402,F401  (puts the layers on sys.path)
+import generate_dataset  # noqa: E402
+from navrakshak import tracing  # noqa: E402
+from navrakshak.risk import assessment, risk_advice  # noqa: E402
+
+INTENTS = ('EmergencyAssistance', 'AreaInformation', 'DigitalID', 'SafetyUpdates')
+DEFAULT_MIX = {
+    'locales': {'en_US': 0.7, 'hi_IN': 0.3},
+    'intents': {'EmergencyAssistance': 0.15, 'AreaInformation': 0.5, 'DigitalID': 0.15, 'SafetyUpdates': 0.2},
+    'slots': {},
+}
+NUMBER_SLOT_TYPE = 'AMAZON.Number'
+
+# Replies of the router when it could not serve the intent
+FAILURE_REPLIES = ("Sorry, I'm experiencing technical difficulties", "I didn't understand that")
+
+# Router environment variable -> stub path
+BACKENDS = {
+    'LOGIN_API': '/login',
+    'HOSPITAL_API': '/hospital',
+    'POLICE_API': '/police',
+    'RISK_API': '/risk',
+    'ANNOUNCEMENTS_API': '/announcements',
+}
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_bot(path=DEFAULT_BOT, intents=INTENTS):
+    """Slots and utterances of *intents* per locale of an exported Lex V2 bot.
+
+    :return: ``{'name': bot, 'locales': {locale: {intent: {'utterances':
+        [...], 'slots': {slot: (slot_type, [values])}}}}}``; the values of
+        built-in slot types are ``None``.
+    """
+    locales = {}
+    for locale_dir in sorted(glob.glob(os.path.join(path, 'BotLocales', '*'))):
+        slot_types = {}
+        for slot_type_file in glob.glob(os.path.join(locale_dir, 'SlotTypes', '*', 'SlotType.json')):
+            slot_type = _read_json(slot_type_file)
+            slot_types[slot_type['name']] = [v['sampleValue']['value'] for v in slot_type['slotTypeValues']]
+        definitions = {}
+        for intent in intents:
+            intent_dir = os.path.join(locale_dir, 'Intents', intent)
+            if not os.path.isdir(intent_dir):
+                continue
+            utterances = [u['utterance'] for u in _read_json(os.path.join(intent_dir, 'Intent.json'))
+                          .get('sampleUtterances') or []]
+            slots = {}
+            for slot_file in sorted(glob.glob(os.path.join(intent_dir, 'Slots', '*', 'Slot.json'))):
+                slot = _read_json(slot_file)
+                slots[slot['name']] = (slot['slotTypeName'], slot_types.get(slot['slotTypeName']))
+            definitions[intent] = {'utterances': utterances or [intent], 'slots': slots}
+        locales[os.path.basename(locale_dir)] = definitions
+    return {'name': _read_json(os.path.join(path, 'Bot.json'))['name'], 'locales': locales}
+
+
+def weighted(rng, weights):
+    keys = list(weights)
+    return rng.choices(keys, [weights[k] for k in keys])[0]
+
+
+def slot_value(rng, slot_type, values, mix):
+    """A value of a custom slot type, by the mix's weights if it has any for this locale's values."""
+    weights = mix['slots'].get(slot_type) or {}
+    known = {value: weights[value] for value in values if value in weights}
+    return weighted(rng, known or dict.fromkeys(values, 1))
+
+
+def make_event(rng, bot, mix):
+    """One fulfillment code hook event, as Lex V2 sends it to the router."""
+    locale = weighted(rng, {k: v for k, v in mix['locales'].items() if k in bot['locales']})
+    definitions = bot['locales'][locale]
+    intent = weighted(rng, {k: v for k, v in mix['intents'].items() if k in definitions})
+    definition = definitions[intent]
+    _, lat, lon = generate_dataset.near_city(rng, 0.3)
+    slots = {}
+    for name, (slot_type, values) in definition['slots'].items():
+        if slot_type == NUMBER_SLOT_TYPE:
+            value = str(lon if 'lon' in name.lower() else lat)
+        else:
+            value = slot_value(rng, slot_type, values, mix)
+        slots[name] = {
+            'shape': 'Scalar',
+            'value': {'originalValue': value, 'interpretedValue': value, 'resolvedValues': [value]},
+        }
+    session_id = f'{rng.getrandbits(64):016x}'
+    return {
+        'messageVersion': '1.0',
+        'invocationSource': 'FulfillmentCodeHook',
+        'inputMode': 'Text',
+        'responseContentType': 'text/plain; charset=utf-8',
+        'sessionId': session_id,
+        'inputTranscript': rng.choice(definition['utterances']),
+        'bot': {'id': 'NAVRAKSHAK', 'name': bot['name'], 'aliasId': 'TSTALIASID', 'aliasName': 'TestBotAlias',
+                'localeId': locale, 'version': 'DRAFT'},
+        'interpretations': [{'intent': {'name': intent, 'slots': slots, 'state': 'ReadyForFulfillment',
+                                        'confirmationState': 'None'},
+                             'nluConfidence': {'score': round(rng.uniform(0.7, 1.0), 2)},
+                             'interpretationSource': 'Lex'}],
+        'requestAttributes': {},
+        'sessionState': {
+            'sessionAttributes': {},
+            'activeContexts': [],
+            'intent': {'name': intent, 'slots': slots, 'state': 'ReadyForFulfillment', 'confirmationState': 'None'},
+            'originatingRequestId': str(uuid.UUID(int=rng.getrandbits(128))),
+        },
+    }
+
+
+def stub_response(path, payload, rng, safe_share):
+    """Body the real function would return for *payload*."""
+    lat, lon = payload.get('latitude', 28.6139), payload.get('longitude', 77.2090)
+    distance_km = round(rng.uniform(0.2, 8.0), 3)
+    if path == '/police':
+        return {'id': 1, 'name': 'Kotwali Police Station', 'address': 'Station Road', 'state': 'Delhi',
+                'latitude': lat, 'longitude': lon, 'distance_km': distance_km}
+    if path == '/hospital':
+        return {'id': 1, 'name': 'District Hospital', 'address': 'Hospital Road', 'phone': '+911123456789',
+                'type': 'Government', 'latitude': lat, 'longitude': lon, 'distance_km': distance_km}
+    if path == '/risk':
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
+        if rng.random() < safe_share:
+            return assessment(lat, lon, None, None, timestamp)
+        score = round(rng.uniform(1, 10), 1)
+        level, recommendations, safety_tips = risk_advice(score)
+        return {
+            'location': {'latitude': lat, 'longitude': lon},
+            'nearest_risk_zone': {'id': 1, 'shape': 'circle', 'zone_name': 'Old City', 'description': 'Crowded market',
+                                  'risk_score': score, 'risk_level': level, 'center_latitude': lat,
+                                  'center_longitude': lon, 'radius_km': 2.0, 'distance_from_center': distance_km},
+            'recommendations': recommendations,
+            'safety_tips': safety_tips,
+            'assessment_time': timestamp,
+        }
+    if path == '/login':
+        tourist_id = payload.get('tourist_id', 'T003')
+        return {'message': 'Login successful', 'user_profile': {
+            'tourist_id': tourist_id, 'name': 'Test Tourist', 'phone': '+919999999999',
+            'email': 'tourist@example.com', 'emergency_contact': '+918888888888', 'address': 'Delhi',
+            'last_location': {'latitude': lat, 'longitude': lon}}}
+    if path == '/announcements':
+        return {'announcements': [
+            {'title': f'Advisory {i}', 'content': 'Heavy rainfall expected, avoid low lying areas.',
+             'priority': rng.choice(['HIGH', 'CRITICAL'])} for i in range(payload.get('limit', 3))]}
+    return None
+
+
+class StubBackends:
+    """The router's five backend APIs on a local keep-alive HTTP server.
+
+    :param latency_ms: Median response time; each response takes a
+        log-normal draw around it.
+    :param error_rate: Share of responses that are a 500 database error.
+    :param safe_share: Share of risk answers without a zone (``SAFE``).
+    """
+
+    def __init__(self, latency_ms=20.0, error_rate=0.0, safe_share=0.3, seed=1):
+        stubs = self
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.safe_share = safe_share
+        self.rng = random.Random(f'{seed}:stubs')
+        self.lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body go out in separate writes; with Nagle on, each response waits for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                with stubs.lock:
+                    delay = stubs.latency_ms * stubs.rng.lognormvariate(0, 0.5) / 1000 if stubs.latency_ms else 0
+                    failed = stubs.rng.random() < stubs.error_rate
+                    body = None if failed else stub_response(self.path, payload, stubs.rng, stubs.safe_share)
+                time.sleep(delay)
+                status = 200
+                if failed:
+                    status, body = 500, {'error': 'Database error', 'message': 'injected failure'}
+                elif body is None:
+                    status, body = 404, {'error': 'Not found'}
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def environ(self):
+        """Router environment variables pointing at the stubs."""
+        host, port = self.server.server_address
+        return {name: f'http://{host}:{port}{path}' for name, path in BACKENDS.items()}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def in_process_sender():
+    """``send(event) -> ok`` calling a fresh copy of the router module."""
+    spec = importlib.util.spec_from_file_location('bench_router', ROUTER_PATH)
+    router = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(router)
+
+    def send(event):
+        router.lambda_handler(event, None)
+        return not router.tracer.failed
+    return send
+
+
+def http_sender(url):
+    """``send(event) -> ok`` POSTing to *url*, one keep-alive connection per thread."""
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    local = threading.local()
+
+    def send(event):
+        if getattr(local, 'connection', None) is None:
+            local.connection = connection_class(parts.netloc, timeout=30)
+        try:
+            local.connection.request('POST', parts.path or '/', json.dumps(event).encode('utf-8'),
+                                     {'Content-Type': 'application/json'})
+            response = local.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            local.connection = None
+            raise
+        if response.status >= 400:
+            return False
+        messages = json.loads(data).get('messages') or [{}]
+        return not str(messages[0].get('content', '')).startswith(FAILURE_REPLIES)
+    return send
+
+
+def drive(send, events, rps, concurrency):
+    """Send *events* at *rps* (0: as fast as *concurrency* allows).
+
+    :return: ``([(latency_s, service_s, ok)], elapsed_s)``; the latency
+        counts from the scheduled send time.
+    """
+    results = [None] * len(events)
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def task(i, event, scheduled):
+        started = time.perf_counter()
+        try:
+            ok = send(event)
+        except Exception:
+            ok = False
+        finally:
+            if not rps:
+                slots.release()
+        done = time.perf_counter()
+        results[i] = (done - scheduled, done - started, ok)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        for i, event in enumerate(events):
+            if rps:
+                scheduled = start + i / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                slots.acquire()
+                scheduled = time.perf_counter()
+            pool.submit(task, i, event, scheduled)
+    return results, time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(results):
+    latencies = [r[0] * 1000 for r in results]
+    errors = sum(1 for r in results if not r[2])
+    return {
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': round(errors / len(results), 4),
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(max(latencies), 2),
+        'service_p50_ms': round(percentile([r[1] * 1000 for r in results], 0.5), 2),
+    }
+
+
+def event_key(event):
+    return event['sessionState']['intent']['name'], event['bot']['localeId']
+
+
+def parse_weights(text):
+    return {key: float(value) for key, value in (item.split('=') for item in text.split(','))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bot', default=DEFAULT_BOT, help='exported Lex V2 bot directory')
+    parser.add_argument('--mix', help='JSON file with locale, intent and slot value weights')
+    parser.add_argument('--locales', type=parse_weights, help='e.g. en_US=3,hi_IN=1 (overrides --mix)')
+    parser.add_argument('--intents', type=parse_weights, help='e.g. AreaInformation=5,DigitalID=1')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rps', type=float, default=50.0, help='target requests per second, 0 for closed loop')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight (in-process: always 1)')
+    parser.add_argument('--url', help='POST the events here instead of calling the router in-process')
+    parser.add_argument('--backend-latency-ms', type=float, default=20.0)
+    parser.add_argument('--backend-error-rate', type=float, default=0.0)
+    parser.add_argument('--safe-share', type=float, default=0.3, help='share of risk answers outside any zone')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-events', help='also write the events to this JSON lines file')
+    parser.add_argument('--replay', help='send the events of a JSON lines file instead of generating them')
+    parser.add_argument('--out', help='write the report to this JSON file')
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay, encoding='utf-8') as f:
+            events = [json.loads(line) for line in f if line.strip()]
+    else:
+        mix = {**DEFAULT_MIX, **(_read_json(args.mix) if args.mix else {})}
+        mix = {**mix, 'locales': args.locales or mix['locales'], 'intents': args.intents or mix['intents']}
+        bot = load_bot(args.bot)
+        rng = random.Random(f'{args.seed}:events')
+        events = [make_event(rng, bot, mix) for _ in range(args.requests)]
+    if args.save_events:
+        with open(args.save_events, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(event, ensure_ascii=False) + '\n' for event in events)
+
+    stubs = None
+    if args.url:
+        send, concurrency = http_sender(args.url), args.concurrency
+    else:
+        # one event at a time, like one Lambda execution environment
+        stubs = StubBackends(args.backend_latency_ms, args.backend_error_rate, args.safe_share, args.seed)
+        os.environ.update(stubs.environ(), TRACE_MODE='histogram')
+        send, concurrency = in_process_sender(), 1
+        tracing.reset()
+    try:
+        results, elapsed = drive(send, events, args.rps, concurrency)
+    finally:
+        if stubs:
+            stubs.close()
+
+    groups = {}
+    for event, result in zip(events, results):
+        groups.setdefault(event_key(event), []).append(result)
+    report = {'total': summarize(results), 'achieved_rps': round(len(results) / elapsed, 1), 'by_intent': []}
+    print(f"{'intent':<22}{'locale':<8}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}")
+    for (intent, locale), group in sorted(groups.items()) + [(('total', ''), results)]:
+        summary = summarize(group)
+        if intent != 'total':
+            report['by_intent'].append({'intent': intent, 'locale': locale, **summary})
+        print(f"{intent:<22}{locale:<8}{summary['requests']:>9}{summary['error_rate']:>8.1%}{summary['p50_ms']:>9.1f}"
+              f"{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}{summary['max_ms']:>9.1f}")
+    print(f"\n{report['achieved_rps']} req/s achieved (target {args.rps:g}), "
+          f"service p50 {report['total']['service_p50_ms']} ms")
+    if stubs:
+        report['phase_p50_ms'] = {phase: summary['p50']
+                                  for phase, summary in tracing.report().get('router', {}).items()}
+        print('router phases p50 (ms): ' + ', '.join(f'{k} {v}' for k, v in report['phase_p50_ms'].items()))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Response encoding: per-row formatting plus json.dumps vs. navrakshak.serialize.dumps.
+
+Builds two large responses from synthetic rows shaped like the handlers'
+query results and times turning them into a ``body`` string three ways:
+
+``legacy``
+    What the handlers did before: copy each row into a new dict with
+    ``strftime`` on every DATETIME column (``safety_updates_handler``,
+    the zone timestamps of each ``batch_risk_handler`` assessment), then
+    ``json.dumps``.
+``dumps (json)``
+    ``dumps`` on the rows as fetched, with orjson hidden so the stdlib
+    fallback is used.
+``dumps (orjson)``
+    The same with orjson, when it is installed.
+
+Checks every variant decodes to the same document as the legacy body.
+Runs offline, no database needed.
+
+    python backend/benchmarks/serialize_benchmark.py --announcements 20000 --points 10000
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from navrakshak.geofence import CircleZone
+from navrakshak.risk import assessment
+
+CATEGORIES = ['WEATHER', 'SAFETY', 'TRAFFIC', 'HEALTH', 'EVENT']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def load_serializer(hide_orjson):
+    """A fresh ``navrakshak.serialize`` module, built without orjson if *hide_orjson*."""
+    saved = sys.modules.get('orjson')
+    if hide_orjson:
+        sys.modules['orjson'] = None
+    try:
+        spec = importlib.util.find_spec('navrakshak.serialize')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        if saved is not None:
+            sys.modules['orjson'] = saved
+        else:
+            sys.modules.pop('orjson', None)
+    return module
+
+
+def announcement_rows(rng, count, now):
+    rows = []
+    for i in range(count):
+        published = now - timedelta(minutes=rng.randrange(60 * 24 * 30))
+        rows.append({
+            'announcement_id': i + 1,
+            'title': f'Advisory {i + 1}: {rng.choice(CATEGORIES).title()} update',
+            'content': 'Heavy rainfall expected in low lying areas. Avoid travel after dark. ' * rng.randint(1, 4),
+            'category': rng.choice(CATEGORIES),
+            'source': 'District Administration',
+            'priority': rng.choice(PRIORITIES),
+            'location': 'All India' if rng.random() < 0.2 else f'City {rng.randrange(40)}',
+            'valid_from': published,
+            'valid_until': published + timedelta(days=7) if rng.random() < 0.7 else None,
+            'published_at': published,
+            'updated_at': published + timedelta(hours=1),
+        })
+    return rows
+
+
+def legacy_announcements(rows):
+    processed = []
+    for row in rows:
+        processed.append({
+            'announcement_id': row['announcement_id'],
+            'title': row['title'],
+            'content': row['content'],
+            'category': row['category'],
+            'source': row['source'],
+            'priority': row['priority'],
+            'location': row['location'],
+            'valid_from': row['valid_from'].strftime(DATETIME_FORMAT) if row['valid_from'] else None,
+            'valid_until': row['valid_until'].strftime(DATETIME_FORMAT) if row['valid_until'] else None,
+            'published_at': row['published_at'].strftime(DATETIME_FORMAT) if row['published_at'] else None,
+            'updated_at': row['updated_at'].strftime(DATETIME_FORMAT) if row['updated_at'] else None,
+        })
+    return {'total_announcements': len(processed), 'announcements': processed}
+
+
+def current_announcements(rows):
+    return {'total_announcements': len(rows), 'announcements': rows}
+
+
+def risk_points(rng, count, now):
+    zones = [
+        CircleZone(i + 1, f'Zone {i + 1}', Decimal(f'{rng.uniform(1, 10):.1f}'), 28.6 + rng.gauss(0, 0.1),
+                   77.2 + rng.gauss(0, 0.1), 1.5, 'Crowded market area',
+                   now - timedelta(days=rng.randrange(365)), now - timedelta(days=rng.randrange(30)))
+        for i in range(200)
+    ]
+    points = []
+    for _ in range(count):
+        lat, lon = 28.6 + rng.gauss(0, 0.1), 77.2 + rng.gauss(0, 0.1)
+        zone = rng.choice(zones) if rng.random() < 0.6 else None
+        points.append((lat, lon, zone, round(rng.uniform(0, 1.5), 3) if zone else None))
+    return points
+
+
+def legacy_assessments(points, timestamp):
+    assessments = []
+    for lat, lon, zone, distance_km in points:
+        result = assessment(lat, lon, zone, distance_km, timestamp)
+        summary = result['nearest_risk_zone']
+        if summary is not None:
+            # zone_summary() used to strftime both timestamps for every point
+            summary['created_at'] = zone.created_at.strftime(DATETIME_FORMAT)
+            summary['updated_at'] = zone.updated_at.strftime(DATETIME_FORMAT)
+        assessments.append(result)
+    return {'count': len(assessments), 'assessments': assessments, 'assessment_time': timestamp}
+
+
+def current_assessments(points, timestamp):
+    assessments = [assessment(lat, lon, zone, distance_km, timestamp) for lat, lon, zone, distance_km in points]
+    return {'count': len(assessments), 'assessments': assessments, 'assessment_time': timestamp}
+
+
+def best_of(function, repeat):
+    # Like timeit, with the collector off: the decoded legacy document kept for
+    # the equality check would otherwise slow down the variants timed after it
+    best = float('inf')
+    result = None
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--announcements', type=int, default=5000, help='rows in the announcements response')
+    parser.add_argument('--points', type=int, default=10000, help='assessments in the batch risk response')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime(2025, 3, 1, 12, 0, 0)
+    timestamp = now.strftime('%Y-%m-%d %H:%M:%S UTC')
+    rows = announcement_rows(rng, args.announcements, now)
+    points = risk_points(rng, args.points, now)
+
+    encoders = [('dumps (json)', load_serializer(hide_orjson=True).dumps)]
+    fast = load_serializer(hide_orjson=False)
+    if fast.orjson is not None:
+        encoders.append(('dumps (orjson)', fast.dumps))
+    else:
+        print('orjson is not installed; skipping the orjson variant')
+
+    payloads = [
+        ('announcements', len(rows), lambda: legacy_announcements(rows), lambda: current_announcements(rows)),
+        ('batch_risk', len(points), lambda: legacy_assessments(points, timestamp),
+         lambda: current_assessments(points, timestamp)),
+    ]
+
+    print(f"{'payload':<15}{'variant':<16}{'items':>8}{'ms':>10}{'MB/s':>9}{'speedup':>9}")
+    for name, items, legacy, current in payloads:
+        legacy_seconds, legacy_body = best_of(lambda: json.dumps(legacy()), args.repeat)
+        expected = json.loads(legacy_body)
+        print(f"{name:<15}{'legacy':<16}{items:>8}{legacy_seconds * 1000:>10.1f}"
+              f"{len(legacy_body.encode('utf-8')) / legacy_seconds / 1e6:>9.1f}{1.0:>8.1f}x")
+        for label, dumps in encoders:
+            seconds, body = best_of(lambda: dumps(current()), args.repeat)
+            if json.loads(body) != expected:
+                raise SystemExit(f'{name}: {label} body differs from the legacy body')
+            print(f"{name:<15}{label:<16}{items:>8}{seconds * 1000:>10.1f}"
+                  f"{len(body.encode('utf-8')) / seconds / 1e6:>9.1f}{legacy_seconds / seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
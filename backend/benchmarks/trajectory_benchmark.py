@@ -0,0 +1,196 @@
+"""
+Compressed trajectory segments vs. raw location_history rows.
+
+Generates synthetic GPS traces (walking, driving and standing still with
+GPS jitter, one ping every few seconds), then for each tolerance reports
+stored bytes, points kept, position error when replaying by time
+interpolation, compression throughput and replay throughput. Raw replay
+decodes MySQL text-protocol row packets with the vendored PyMySQL, like a
+``SELECT`` on ``location_history`` would. Runs offline, no database needed.
+
+    python backend/benchmarks/trajectory_benchmark.py --tourists 50 --hours 2
+"""
+
+import argparse
+import math
+import random
+import struct
+import time
+from datetime import datetime, timedelta
+
+from pymysql.converters import convert_datetime
+from pymysql.protocol import MysqlPacket
+
+from navrakshak.locations import Ping
+from navrakshak.trajectory import (
+    EARTH_RADIUS_M, SegmentBuilder, from_millis, iter_points, to_millis,
+)
+
+# InnoDB bytes per location_history row: 5 header + 6 trx id + 7 roll ptr,
+# tourist_id (1 + ~8), DATETIME(3) 7, two DOUBLE 16, FLOAT 4
+RAW_ROW_BYTES = 5 + 6 + 7 + 9 + 7 + 16 + 4
+# Same for a location_segments row without the blob: two DATETIME(3), two
+# INT, FLOAT and the blob length prefix
+SEGMENT_ROW_BYTES = 5 + 6 + 7 + 9 + 7 + 7 + 4 + 4 + 4 + 2
+
+MODES = {
+    'walk': 1.4,
+    'drive': 12.0,
+    'still': 0.0,
+}
+
+
+def synthetic_trace(rng, start, hours):
+    """List of ``(datetime, lat, lon)`` for one tourist."""
+    lat = rng.uniform(12.0, 30.0)
+    lon = rng.uniform(72.0, 88.0)
+    heading = rng.uniform(0, 2 * math.pi)
+    t = start + timedelta(seconds=rng.uniform(0, 60))
+    end = start + timedelta(hours=hours)
+    points = []
+    mode, mode_until = 'still', t
+    while t < end:
+        if t >= mode_until:
+            mode = rng.choice(list(MODES))
+            mode_until = t + timedelta(minutes=rng.uniform(5, 30))
+        dt = rng.uniform(3, 5)
+        speed = MODES[mode]
+        heading += rng.gauss(0, 0.08 if mode == 'drive' else 0.2)
+        metres = speed * dt
+        lat += math.cos(heading) * metres / 111320
+        lon += math.sin(heading) * metres / (111320 * math.cos(math.radians(lat)))
+        # GPS noise of a few metres
+        jitter_lat = rng.gauss(0, 3) / 111320
+        jitter_lon = rng.gauss(0, 3) / 111320
+        points.append((t, lat + jitter_lat, lon + jitter_lon))
+        t += timedelta(seconds=dt)
+    return points
+
+
+def lenenc_str(value):
+    data = value.encode()
+    return bytes([len(data)]) + data
+
+
+def raw_packets(traces):
+    """Text-protocol row packets as a location_history SELECT returns them."""
+    packets = []
+    for tourist_id, points in traces:
+        for t, lat, lon in points:
+            payload = (lenenc_str(t.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]) +
+                       lenenc_str(repr(lat)) + lenenc_str(repr(lon)) + b'\xfb')
+            packets.append(struct.pack('<I', len(payload))[:3] + b'\0' + payload)
+    return packets
+
+
+def replay_raw(packets):
+    n = 0
+    for data in packets:
+        packet = MysqlPacket(data[4:], 'utf8')
+        convert_datetime(packet.read_length_coded_string().decode())
+        float(packet.read_length_coded_string())
+        float(packet.read_length_coded_string())
+        packet.read_length_coded_string()
+        n += 1
+    return n
+
+
+def replay_segments(segments):
+    n = 0
+    for segment in segments:
+        for t, lat, lon in iter_points(segment.data):
+            from_millis(t)
+            n += 1
+    return n
+
+
+def compress_traces(traces, tolerance):
+    builder = SegmentBuilder(tolerance)
+    segments = []
+    for tourist_id, points in traces:
+        for t, lat, lon in points:
+            segments.extend(builder.add(Ping(tourist_id, lat, lon, t, None)))
+    segments.extend(builder.close_all())
+    return segments
+
+
+def interpolation_errors(traces, segments):
+    """Distance in metres between each raw ping and the replayed track at its time."""
+    by_tourist = {}
+    for segment in segments:
+        by_tourist.setdefault(segment.tourist_id, []).append(list(iter_points(segment.data)))
+    errors = []
+    for tourist_id, points in traces:
+        kept = [p for seg in by_tourist[tourist_id] for p in seg]
+        j = 0
+        for t, lat, lon in points:
+            ms = to_millis(t)
+            while j + 1 < len(kept) and kept[j + 1][0] <= ms:
+                j += 1
+            t0, lat0, lon0 = kept[j]
+            if j + 1 < len(kept) and kept[j + 1][0] > t0:
+                t1, lat1, lon1 = kept[j + 1]
+                f = min(1.0, max(0.0, (ms - t0) / (t1 - t0)))
+                lat0 += (lat1 - lat0) * f
+                lon0 += (lon1 - lon0) * f
+            dy = math.radians(lat - lat0) * EARTH_RADIUS_M
+            dx = math.radians(lon - lon0) * EARTH_RADIUS_M * math.cos(math.radians(lat))
+            errors.append(math.hypot(dx, dy))
+    errors.sort()
+    return errors
+
+
+def best_of(repeat, fn, *args):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tourists', type=int, default=50)
+    parser.add_argument('--hours', type=float, default=2.0)
+    parser.add_argument('--tolerances', default='0,1,5,10,25', help='comma-separated metres')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = datetime(2025, 9, 27, 8)
+    traces = [(f'T{i:07d}', synthetic_trace(rng, start, args.hours)) for i in range(args.tourists)]
+    total = sum(len(points) for _, points in traces)
+
+    raw_bytes = total * RAW_ROW_BYTES
+    packets = raw_packets(traces)
+    raw_time, _ = best_of(args.repeat, replay_raw, packets)
+    print(f'{args.tourists} tourists, {total} pings')
+    print()
+    header = (f"{'format':<14}{'points':>9}{'KB':>10}{'B/ping':>8}{'ratio':>7}"
+              f"{'err p50 m':>11}{'err p99 m':>11}{'compress/s':>13}{'replay/s':>12}")
+    print(header)
+    print('-' * len(header))
+    print(f"{'raw rows':<14}{total:>9}{raw_bytes / 1024:>10.1f}{RAW_ROW_BYTES:>8.1f}{1:>7.1f}"
+          f"{0:>11.2f}{0:>11.2f}{'-':>13}{total / raw_time:>12,.0f}")
+
+    for tolerance in [float(t) for t in args.tolerances.split(',')]:
+        compress_time, segments = best_of(args.repeat, compress_traces, traces, tolerance)
+        stored = sum(s.stored_points for s in segments)
+        size = sum(len(s.data) + SEGMENT_ROW_BYTES for s in segments)
+        replay_time, _ = best_of(args.repeat, replay_segments, segments)
+        errors = interpolation_errors(traces, segments)
+        p50 = errors[len(errors) // 2]
+        p99 = errors[min(len(errors) - 1, int(len(errors) * 0.99))]
+        print(f"{f'dp {tolerance:g} m':<14}{stored:>9}{size / 1024:>10.1f}{size / total:>8.1f}"
+              f"{raw_bytes / size:>7.1f}{p50:>11.2f}{p99:>11.2f}{total / compress_time:>13,.0f}"
+              f"{total / replay_time:>12,.0f}")
+    print()
+    print('Bytes are estimated InnoDB row sizes without page overhead; replay/s counts raw pings '
+          'covered per second (segments decode only the kept points).')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the NavRakshak Lambda functions.
+
+This package is deployed as a Lambda Layer (see ``common-layer/setup.md``)
+next to the PyMySQL layer, so handlers can simply ``import navrakshak``.
+"""
@@ -0,0 +1,138 @@
+"""
+Streaming table exports.
+
+Rows are pulled from an unbuffered ``SSDictCursor`` one at a time and
+encoded into JSON Lines or CSV chunks as they arrive, so memory use is
+bounded by ``chunk_size`` instead of by the size of the table.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pymysql
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+
+# Roughly how many bytes are buffered before a chunk is yielded.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+FORMATS = ('jsonl', 'csv')
+
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Exportable datasets. Passwords are never exported.
+EXPORTS = {
+    'tourists': {
+        'columns': [
+            'tourist_id', 'name', 'phone', 'email', 'emergency_contact',
+            'date_of_birth', 'address', 'last_stayed_lat', 'last_stayed_lon',
+            'created_at', 'updated_at'
+        ],
+        'table': 'tourists',
+        'order_by': 'tourist_id',
+        'since_column': 'updated_at',
+    },
+    'announcements': {
+        'columns': [
+            'announcement_id', 'title', 'content', 'category', 'source',
+            'priority', 'location', 'valid_from', 'valid_until',
+            'published_at', 'updated_at'
+        ],
+        'table': 'announcements',
+        'order_by': 'announcement_id',
+        'since_column': 'updated_at',
+    },
+    'location_history': {
+        'columns': ['tourist_id', 'recorded_at', 'latitude', 'longitude', 'accuracy_m'],
+        'table': 'location_history',
+        'order_by': 'tourist_id, recorded_at',
+        'since_column': 'recorded_at',
+    },
+}
+
+
+def build_export_query(dataset, since=None):
+    """Return ``(sql, params)`` for *dataset*, optionally limited to rows
+    changed at or after *since*."""
+    spec = EXPORTS[dataset]
+    sql = f"SELECT {', '.join(spec['columns'])} FROM {spec['table']}"
+    params = []
+    if since is not None:
+        sql += f" WHERE {spec['since_column']} >= %s"
+        params.append(since)
+    sql += f" ORDER BY {spec['order_by']}"
+    return sql, params
+
+
+def iter_rows(connection, sql, params=None):
+    """Yield rows of *sql* as dicts without buffering the result set."""
+    with connection.cursor(pymysql.cursors.SSDictCursor) as cursor:
+        cursor.execute(sql, params)
+        yield from cursor.fetchall_unbuffered()
+
+
+def to_plain(value):
+    """Convert a column value into something JSON/CSV friendly."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', 'replace')
+    return value
+
+
+def encode_jsonl(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encode *rows* as JSON Lines, yielding ``bytes`` chunks."""
+    buf = io.BytesIO()
+    for row in rows:
+        line = json.dumps({k: to_plain(v) for k, v in row.items()}, ensure_ascii=False)
+        buf.write(line.encode('utf-8'))
+        buf.write(b'\n')
+        if buf.tell() >= chunk_size:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def encode_csv(rows, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encode *rows* as CSV with a header line, yielding ``bytes`` chunks."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([to_plain(row[c]) for c in columns])
+        if buf.tell() >= chunk_size:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode('utf-8')
+
+
+def stream_export(connection, dataset, fmt='jsonl', since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream *dataset* from *connection* as encoded ``bytes`` chunks.
+
+    :raise ValueError: If the dataset or format is unknown.
+    """
+    if dataset not in EXPORTS:
+        raise ValueError(f"Unknown dataset '{dataset}'")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'")
+
+    sql, params = build_export_query(dataset, since)
+    rows = iter_rows(connection, sql, params)
+    if fmt == 'csv':
+        return encode_csv(rows, EXPORTS[dataset]['columns'], chunk_size)
+    return encode_jsonl(rows, chunk_size)
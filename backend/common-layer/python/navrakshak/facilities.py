@@ -0,0 +1,447 @@
+"""
+Precomputed nearest-facility lookup over a geohash grid.
+
+For every leaf cell of a geohash tree covering the service area,
+:class:`FacilityGrid` stores the few facilities that can be nearest to
+*any* point inside the cell: with ``R`` the smallest "farthest distance
+from the cell" over all facilities, a facility is a candidate when its
+distance to the nearest point of the cell is at most ``R``. A lookup
+encodes the point once, probes its geohash prefixes from the coarsest
+leaf precision down (at most five dict lookups) and computes exact
+haversine distances to the candidates only.
+
+Cells start at precision :data:`MIN_PRECISION` (about 156 x 156 km) and
+are split into their 32 children while they hold more than
+``max_candidates`` facilities, down to :data:`MAX_PRECISION` (about
+150 m). Cells far from every facility compared with their own size
+(:data:`SPLIT_RATIO`) are left whole: there the list shrinks only slowly,
+and a few dozen candidates are still cheap to scan. The candidates
+of a starting cell come from range queries on an R-tree of the
+facilities; a child's candidates are always among its parent's, so every
+split only scans the parent's short list.
+
+:meth:`FacilityGrid.update` takes a fresh facility snapshot and recomputes
+only the leaves that an added, removed or moved facility could affect:
+those whose stored ``R`` reaches the facility's old or new position.
+"""
+
+import json
+import math
+import time
+import zlib
+
+import pymysql
+
+from navrakshak.geofence import EARTH_RADIUS_M, METRES_PER_DEGREE, haversine_m
+from navrakshak.spatial import ZoneIndex
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MIN_PRECISION = 3
+MAX_PRECISION = 7
+DEFAULT_MAX_CANDIDATES = 12
+FORMAT_VERSION = 1
+
+# Approximate bounding box of India (min_lat, min_lon, max_lat, max_lon)
+INDIA_BBOX = (6.0, 68.0, 37.5, 97.5)
+
+# Cells farther than this many half-diagonals from every facility are not
+# split: far away, the candidate list shrinks only slowly with the cell size
+SPLIT_RATIO = 16
+
+# Slack for floating-point noise in the candidate test
+_MARGIN_M = 1.0
+
+FACILITY_SQL = {
+    'hospitals': """
+        SELECT id, name, address, phone, type, latitude, longitude, district, state, created_at
+        FROM hospitals
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """,
+    'police_stations': """
+        SELECT id, name, address, state, latitude, longitude
+        FROM police_stations
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """,
+}
+
+GRID_SQL = 'SELECT data FROM facility_grids WHERE facility_type = %s'
+
+SAVE_GRID_SQL = """
+    INSERT INTO facility_grids (facility_type, facility_count, cell_count, data)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        facility_count = VALUES(facility_count),
+        cell_count = VALUES(cell_count),
+        data = VALUES(data)
+"""
+
+
+def geohash(lat, lon, precision=MAX_PRECISION):
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = value * 2 + 1
+                lon_lo = mid
+            else:
+                value *= 2
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = value * 2 + 1
+                lat_lo = mid
+            else:
+                value *= 2
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def geohash_bbox(cell):
+    """``(min_lat, min_lon, max_lat, max_lon)`` of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in cell:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def _min_dist(box, lat, lon):
+    """Exact great-circle distance from a point to the nearest point of *box*."""
+    min_lat, min_lon, max_lat, max_lon = box
+    if min_lon <= lon <= max_lon:
+        return haversine_m(min(max(lat, min_lat), max_lat), lon, lat, lon)
+    # Outside the longitude range the nearest point lies on the closer meridian edge,
+    # where the distance is smallest at latitude atan2(sin lat, cos lat cos dlon)
+    edge = min_lon if (min_lon - lon) % 360.0 < (lon - max_lon) % 360.0 else max_lon
+    phi = math.radians(lat)
+    nearest = math.degrees(math.atan2(math.sin(phi), math.cos(phi) * math.cos(math.radians(lon - edge))))
+    return haversine_m(min(max(nearest, min_lat), max_lat), edge, lat, lon)
+
+
+def _max_dist(box, lat, lon):
+    """Great-circle distance to the farthest point of *box*, which is always a corner."""
+    min_lat, min_lon, max_lat, max_lon = box
+    return max(haversine_m(min_lat, min_lon, lat, lon), haversine_m(min_lat, max_lon, lat, lon),
+               haversine_m(max_lat, min_lon, lat, lon), haversine_m(max_lat, max_lon, lat, lon))
+
+
+def _covers(box, bbox):
+    return box[0] <= bbox[2] and bbox[0] <= box[2] and box[1] <= bbox[3] and bbox[1] <= box[3]
+
+
+def _grow(box, margin_m):
+    """*box* grown by *margin_m* on every side, generously in longitude."""
+    if margin_m == math.inf:
+        return (-90.0, -180.0, 90.0, 180.0)
+    dlat = margin_m / METRES_PER_DEGREE
+    min_lat, max_lat = max(-90.0, box[0] - dlat), min(90.0, box[2] + dlat)
+    widest = max(abs(min_lat), abs(max_lat))
+    dlon = 360.0 if widest >= 89.0 else dlat / math.cos(math.radians(widest))
+    return (min_lat, box[1] - dlon, max_lat, box[3] + dlon)
+
+
+def _circle_bbox(lat, lon, radius_m):
+    return _grow((lat, lon, lat, lon), radius_m)
+
+
+def _cover(bbox, precision):
+    """Geohash cells of *precision* that intersect *bbox*."""
+    cells = ['']
+    for _ in range(precision):
+        cells = [cell + char for cell in cells for char in BASE32
+                 if _covers(geohash_bbox(cell + char), bbox)]
+    return cells
+
+
+class _Point:
+    __slots__ = ('fid', 'lat', 'lon', 'bbox')
+
+    def __init__(self, fid, lat, lon):
+        self.fid = fid
+        self.lat = lat
+        self.lon = lon
+        self.bbox = (lat, lon, lat, lon)
+
+
+class _Leaf:
+    __slots__ = ('cell', 'bbox')
+
+    def __init__(self, cell, bbox):
+        self.cell = cell
+        self.bbox = bbox
+
+
+def _json_value(value):
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if value is not None and not isinstance(value, (str, int, float)):
+        return float(value)
+    return value
+
+
+def facility_rows(rows):
+    """``{id: row}`` with coordinates as floats and JSON-ready values."""
+    facilities = {}
+    for row in rows:
+        row = {key: _json_value(value) for key, value in row.items()}
+        row['latitude'] = float(row['latitude'])
+        row['longitude'] = float(row['longitude'])
+        facilities[row['id']] = row
+    return facilities
+
+
+class FacilityGrid:
+    """Nearest-facility lookup table; see the module docstring.
+
+    :param facilities: ``{id: row}`` from :func:`facility_rows`; rows need
+        ``latitude`` and ``longitude``.
+    :param bbox: Area to cover. Points outside it get no answer from
+        :meth:`nearest`. (default: :data:`INDIA_BBOX`)
+    :param max_candidates: Split cells holding more candidates than this.
+    """
+
+    def __init__(self, facilities, bbox=INDIA_BBOX, max_candidates=DEFAULT_MAX_CANDIDATES, cells=None):
+        self.facilities = facilities
+        self.bbox = tuple(bbox)
+        self.max_candidates = max_candidates
+        # {geohash: (radius_m, (facility ids...))}; only leaves are stored
+        self.cells = cells if cells is not None else {}
+        self._points = None
+        if cells is None:
+            self._build_all()
+
+    # -- building ----------------------------------------------------------
+
+    def _index(self):
+        return ZoneIndex([_Point(fid, row['latitude'], row['longitude'])
+                          for fid, row in self.facilities.items()])
+
+    def _candidates(self, box, points):
+        if not points:
+            return math.inf, []
+        radius = min(_max_dist(box, lat, lon) for _, lat, lon in points)
+        limit = radius + _MARGIN_M
+        return radius, [p for p in points if _min_dist(box, p[1], p[2]) <= limit]
+
+    def _search(self, index, box):
+        """Superset of the candidates of *box*, from the facility R-tree."""
+        clat, clon = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        half_diagonal = haversine_m(box[0], box[1], box[2], box[3]) / 2
+        # Grow a square around the centre until it holds a facility within its radius
+        reach = max(half_diagonal, 1000.0)
+        nearest = None
+        while reach < 2 * math.pi * EARTH_RADIUS_M:
+            found = index.overlapping(_circle_bbox(clat, clon, reach))
+            if found:
+                nearest = min(haversine_m(clat, clon, p.lat, p.lon) for p in found)
+                if nearest <= reach:
+                    break
+            reach *= 2
+        if nearest is None:
+            return []
+        # maxdist <= nearest + h, and a candidate has mindist >= distance - h
+        reach = nearest + 2 * half_diagonal + _MARGIN_M
+        return [(p.fid, p.lat, p.lon) for p in index.overlapping(_circle_bbox(clat, clon, reach))]
+
+    def _build(self, cell, points):
+        """Store leaves for *cell*, splitting it while it has too many candidates."""
+        box = geohash_bbox(cell)
+        radius, points = self._candidates(box, points)
+        if (len(points) <= self.max_candidates or len(cell) >= MAX_PRECISION
+                or radius > SPLIT_RATIO * haversine_m(box[0], box[1], box[2], box[3]) / 2):
+            self.cells[cell] = (radius, tuple(sorted(p[0] for p in points)))
+            return
+        for char in BASE32:
+            child = cell + char
+            if _covers(geohash_bbox(child), self.bbox):
+                self._build(child, points)
+
+    def _build_all(self):
+        self.cells = {}
+        index = self._index()
+        for cell in _cover(self.bbox, MIN_PRECISION):
+            self._build(cell, self._search(index, geohash_bbox(cell)))
+
+    # -- incremental updates ----------------------------------------------
+
+    def update(self, facilities):
+        """Replace the facility set, recomputing only the affected leaves.
+
+        A leaf is affected when an added, removed or moved facility (old or
+        new position) passes its candidate test. Leaves may split further
+        but are never merged back.
+
+        :return: ``(changed facilities, recomputed leaves)``
+        """
+        old = self.facilities
+        changed = [fid for fid in old.keys() | facilities.keys()
+                   if fid not in old or fid not in facilities
+                   or (old[fid]['latitude'], old[fid]['longitude'])
+                   != (facilities[fid]['latitude'], facilities[fid]['longitude'])]
+        positions = [(old[fid]['latitude'], old[fid]['longitude']) for fid in changed if fid in old]
+        positions += [(facilities[fid]['latitude'], facilities[fid]['longitude'])
+                      for fid in changed if fid in facilities]
+
+        self.facilities = facilities
+        self._points = None
+        if not positions:
+            return 0, 0
+        # Leaves grown by their radius: a facility inside one may be a candidate there
+        reach = ZoneIndex([
+            _Leaf(cell, _grow(geohash_bbox(cell), radius + _MARGIN_M))
+            for cell, (radius, _) in self.cells.items()
+        ])
+        affected = set()
+        for lat, lon in positions:
+            affected.update(leaf.cell for leaf in reach.candidates(lat, lon))
+
+        index = self._index()
+        for cell in affected:
+            del self.cells[cell]
+            self._build(cell, self._search(index, geohash_bbox(cell)))
+        return len(changed), len(affected)
+
+    # -- lookups -------------------------------------------------------------
+
+    def candidates(self, lat, lon):
+        """Candidate facility ids of the leaf holding the point, or ``None`` outside the grid."""
+        code = geohash(lat, lon, MAX_PRECISION)
+        cells = self.cells
+        for precision in range(MIN_PRECISION, MAX_PRECISION + 1):
+            entry = cells.get(code[:precision])
+            if entry is not None:
+                return entry[1]
+        return None
+
+    def nearest(self, lat, lon):
+        """``(row, distance_km)`` of the nearest facility, or ``None`` when the grid has no answer."""
+        ids = self.candidates(lat, lon)
+        if not ids:
+            return None
+        best = best_m = None
+        for fid in ids:
+            row = self.facilities[fid]
+            d = haversine_m(lat, lon, row['latitude'], row['longitude'])
+            if best_m is None or d < best_m:
+                best, best_m = row, d
+        return best, best_m / 1000
+
+    def nearest_k(self, lat, lon, k):
+        """Up to *k* ``(row, distance_km)`` pairs, nearest first, anywhere on Earth."""
+        if self._points is None:
+            self._points = self._index()
+        reach = 1000.0
+        while True:
+            found = self._points.overlapping(_circle_bbox(lat, lon, reach))
+            nearest = sorted((haversine_m(lat, lon, p.lat, p.lon), p.fid) for p in found)
+            # Everything within reach is in the box, so the first k within reach are exact
+            if (len(nearest) >= k and nearest[k - 1][0] <= reach) or reach > math.pi * EARTH_RADIUS_M:
+                return [(self.facilities[fid], d / 1000) for d, fid in nearest[:k]]
+            reach *= 2
+
+    # -- storage -------------------------------------------------------------
+
+    def to_bytes(self):
+        return zlib.compress(json.dumps({
+            'version': FORMAT_VERSION,
+            'bbox': self.bbox,
+            'max_candidates': self.max_candidates,
+            'facilities': list(self.facilities.values()),
+            'cells': {cell: [None if r == math.inf else round(r, 1), list(ids)]
+                      for cell, (r, ids) in self.cells.items()},
+        }, separators=(',', ':')).encode(), 6)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """:raise ValueError: If the blob is corrupt or has an unknown format version."""
+        try:
+            state = json.loads(zlib.decompress(data))
+            if state.get('version') != FORMAT_VERSION:
+                raise ValueError('Unknown facility grid format')
+            facilities = {row['id']: row for row in state['facilities']}
+            cells = {cell: (math.inf if r is None else r, tuple(ids)) for cell, (r, ids) in state['cells'].items()}
+            return cls(facilities, state['bbox'], state['max_candidates'], cells)
+        except (zlib.error, AttributeError, KeyError, TypeError) as e:
+            raise ValueError(f'Corrupt facility grid: {e!r}') from e
+
+
+def load_facilities(connection, facility_type):
+    with connection.cursor() as cursor:
+        cursor.execute(FACILITY_SQL[facility_type])
+        columns = [c[0] for c in cursor.description]
+        return facility_rows(
+            row if isinstance(row, dict) else dict(zip(columns, row)) for row in cursor.fetchall()
+        )
+
+
+def load_grid(connection, facility_type):
+    """The stored :class:`FacilityGrid`, or ``None`` if it was never built."""
+    with connection.cursor() as cursor:
+        cursor.execute(GRID_SQL, (facility_type,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return FacilityGrid.from_bytes(row['data'] if isinstance(row, dict) else row[0])
+
+
+def save_grid(connection, facility_type, grid):
+    with connection.cursor() as cursor:
+        cursor.execute(SAVE_GRID_SQL, (facility_type, len(grid.facilities), len(grid.cells), grid.to_bytes()))
+    connection.commit()
+
+
+class GridCache:
+    """Keep the stored :class:`FacilityGrid` of one facility type between Lambda invocations.
+
+    ``get(connect)`` reloads it at most every *ttl* seconds and returns
+    ``None`` while no grid has been built, so callers fall back to SQL.
+    *connect* is only called when a reload is due.
+
+    The grid is only a shortcut, so a reload that fails (no
+    ``facility_grids`` table yet, a corrupt blob, a database error) never
+    fails the request: the previous grid, or ``None``, is kept until the
+    next reload and the exception is left in :attr:`error`.
+    """
+
+    def __init__(self, facility_type, ttl=900):
+        self.facility_type = facility_type
+        self.ttl = ttl
+        self.grid = None
+        self.loaded_at = None
+        self.error = None
+
+    def get(self, connect):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl:
+            try:
+                connection = connect()
+                try:
+                    self.grid = load_grid(connection, self.facility_type)
+                finally:
+                    connection.close()
+                self.error = None
+            except (pymysql.MySQLError, ValueError) as e:
+                self.error = e
+            self.loaded_at = time.monotonic()
+        return self.grid
@@ -0,0 +1,292 @@
+"""
+Streaming geofence evaluation.
+
+:class:`GeofenceEngine` consumes location pings one at a time and returns
+alerts only when a tourist's relation to a zone changes. The alerts use
+the shape of the dashboard's ``GeofenceAlert``: ``entry``, ``exit``,
+``violation`` (entering a restricted zone) and optionally ``proximity``.
+
+Zones are found through a spatial index over their (proximity-expanded)
+bounding boxes: by default the R-tree of :class:`navrakshak.spatial.ZoneIndex`,
+or :class:`GridIndex`, a uniform lat/lon grid. A ping costs one index lookup
+plus an exact test for the few candidate zones. Pings far from every zone,
+from tourists who were not inside or near a zone before, return at once.
+Per-tourist state is a small ``{zone_id: INSIDE | NEAR}`` dict, dropped
+once empty.
+
+Zones only need ``zone_id``, ``name``, ``zone_type``, ``severity``,
+``risk_score``, ``bbox``, ``contains(lat, lon)`` and ``distance_m(lat, lon)``
+(metres to the boundary, ``<= 0`` inside), so circles from ``risk_zones``
+and polygons from ``zone_polygons`` share the index.
+"""
+
+import math
+from datetime import datetime
+
+EARTH_RADIUS_M = 6371000.0
+METRES_PER_DEGREE = math.pi / 180 * EARTH_RADIUS_M
+
+DEFAULT_CELL_DEG = 0.05
+DEFAULT_PROXIMITY_M = 0.0
+
+INSIDE = 1
+NEAR = 2
+
+ZONES_SQL = """
+    SELECT id, zone_name, description, risk_score, latitude, longitude, radius_km,
+           created_at, updated_at
+    FROM risk_zones
+    WHERE latitude IS NOT NULL
+    AND longitude IS NOT NULL
+    AND radius_km IS NOT NULL
+"""
+
+_NO_ALERTS = ()
+
+
+def severity_for(risk_score):
+    """Map a 0-10 ``risk_score`` onto the dashboard's alert severities."""
+    if risk_score >= 8.0:
+        return 'critical'
+    if risk_score >= 6.0:
+        return 'high'
+    if risk_score >= 4.0:
+        return 'medium'
+    return 'low'
+
+
+def zone_type_for(risk_score):
+    """Zones scored 8 and above are restricted; entering one is a violation."""
+    return 'restricted' if risk_score >= 8.0 else 'caution'
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2 +
+         math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class CircleZone:
+    """A ``risk_zones`` row: centre plus ``radius_km``."""
+
+    __slots__ = ('zone_id', 'name', 'description', 'zone_type', 'severity', 'risk_score',
+                 'lat', 'lon', 'radius_m', 'bbox', 'created_at', 'updated_at')
+
+    def __init__(self, zone_id, name, risk_score, lat, lon, radius_km, description=None,
+                 created_at=None, updated_at=None):
+        self.zone_id = zone_id
+        self.name = name
+        self.description = description
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.risk_score = float(risk_score)
+        self.zone_type = zone_type_for(self.risk_score)
+        self.severity = severity_for(self.risk_score)
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.radius_m = float(radius_km) * 1000
+        dlat = self.radius_m / METRES_PER_DEGREE
+        dlon = dlat / max(math.cos(math.radians(self.lat)), 1e-6)
+        # (min_lat, min_lon, max_lat, max_lon)
+        self.bbox = (self.lat - dlat, self.lon - dlon, self.lat + dlat, self.lon + dlon)
+
+    @property
+    def center(self):
+        return self.lat, self.lon
+
+    def contains(self, lat, lon):
+        return haversine_m(self.lat, self.lon, lat, lon) <= self.radius_m
+
+    def distance_m(self, lat, lon):
+        return haversine_m(self.lat, self.lon, lat, lon) - self.radius_m
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a :data:`ZONES_SQL` row (tuple or dict)."""
+        if isinstance(row, dict):
+            row = (row['id'], row['zone_name'], row['description'], row['risk_score'],
+                   row['latitude'], row['longitude'], row['radius_km'],
+                   row['created_at'], row['updated_at'])
+        zone_id, name, description, risk_score, lat, lon, radius_km, created_at, updated_at = row
+        return cls(zone_id, name, risk_score, lat, lon, radius_km, description, created_at, updated_at)
+
+
+def load_zones(connection):
+    """Read all circular zones from ``risk_zones``."""
+    with connection.cursor() as cursor:
+        cursor.execute(ZONES_SQL)
+        return [CircleZone.from_row(row) for row in cursor.fetchall()]
+
+
+class GridIndex:
+    """Uniform grid over zone bounding boxes, expanded by *margin_m*."""
+
+    def __init__(self, zones, cell_deg=DEFAULT_CELL_DEG, margin_m=0.0):
+        self.cell_deg = cell_deg
+        self._inv = 1.0 / cell_deg
+        cells = {}
+        for zone in zones:
+            min_lat, min_lon, max_lat, max_lon = zone.bbox
+            dlat = margin_m / METRES_PER_DEGREE
+            dlon = dlat / max(math.cos(math.radians((min_lat + max_lat) / 2)), 1e-6)
+            for i in range(self._cell(min_lat - dlat), self._cell(max_lat + dlat) + 1):
+                for j in range(self._cell(min_lon - dlon), self._cell(max_lon + dlon) + 1):
+                    cells.setdefault((i, j), []).append(zone)
+        self._cells = {key: tuple(value) for key, value in cells.items()}
+
+    def _cell(self, value):
+        return math.floor(value * self._inv)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def candidates(self, lat, lon):
+        """Zones whose expanded bounding box may contain ``(lat, lon)``."""
+        return self._cells.get((math.floor(lat * self._inv), math.floor(lon * self._inv)), ())
+
+
+class GeofenceEngine:
+    """Track inside/near state per tourist and emit transition alerts.
+
+    :param zones: Zone objects (see the module docstring).
+    :param proximity_m: Emit ``proximity`` alerts within this distance
+        outside a zone. 0 disables them. (default: 0)
+    :param index_factory: Callable ``(zones, margin_m)`` returning an
+        object with ``candidates(lat, lon)``.
+        (default: :class:`navrakshak.spatial.ZoneIndex`)
+    """
+
+    def __init__(self, zones=(), proximity_m=DEFAULT_PROXIMITY_M, index_factory=None):
+        self.proximity_m = proximity_m
+        self._index_factory = index_factory or _zone_index
+        self._state = {}
+        self.pings = 0
+        self.alerts = 0
+        self.replace_zones(zones)
+
+    def replace_zones(self, zones):
+        """Swap in a new zone set; tourists keep their state for unchanged zone ids."""
+        self.zones = {zone.zone_id: zone for zone in zones}
+        self.index = self._index_factory(list(self.zones.values()), self.proximity_m)
+
+    def forget(self, tourist_id):
+        self._state.pop(tourist_id, None)
+
+    def tracked(self):
+        return len(self._state)
+
+    def evaluate(self, lat, lon):
+        """Return ``[(zone, distance_m)]`` for zones the point is inside or near."""
+        limit = self.proximity_m
+        hits = []
+        for zone in self.index.candidates(lat, lon):
+            d = zone.distance_m(lat, lon)
+            if d <= limit:
+                hits.append((zone, d))
+        return hits
+
+    def process(self, ping):
+        """Feed one ping; return the list of alerts it triggers (often empty)."""
+        self.pings += 1
+        tourist_id = ping.tourist_id
+        previous = self._state.get(tourist_id)
+        candidates = self.index.candidates(ping.latitude, ping.longitude)
+        if not candidates and previous is None:
+            return _NO_ALERTS
+
+        current = {}
+        lat, lon = ping.latitude, ping.longitude
+        limit = self.proximity_m
+        for zone in candidates:
+            if zone.contains(lat, lon):
+                current[zone.zone_id] = INSIDE
+            elif limit and zone.distance_m(lat, lon) <= limit:
+                current[zone.zone_id] = NEAR
+
+        if current == (previous or {}):
+            return _NO_ALERTS
+        if current:
+            self._state[tourist_id] = current
+        else:
+            del self._state[tourist_id]
+
+        alerts = []
+        previous = previous or {}
+        for zone_id, status in current.items():
+            before = previous.get(zone_id)
+            if status == before:
+                continue
+            zone = self.zones[zone_id]
+            if status == INSIDE:
+                kind = 'violation' if zone.zone_type == 'restricted' else 'entry'
+            elif before == INSIDE:
+                kind = 'exit'
+            else:
+                kind = 'proximity'
+            alerts.append(make_alert(ping, zone, kind))
+        for zone_id, before in previous.items():
+            if before == INSIDE and zone_id not in current:
+                zone = self.zones.get(zone_id)
+                if zone is not None:
+                    alerts.append(make_alert(ping, zone, 'exit'))
+        self.alerts += len(alerts)
+        return alerts
+
+
+def _zone_index(zones, margin_m):
+    # Imported here because navrakshak.spatial builds on this module
+    from navrakshak.spatial import ZoneIndex
+    return ZoneIndex(zones, margin_m)
+
+
+MESSAGES = {
+    'entry': 'Tourist entered {name} (risk score {score:g})',
+    'violation': 'Tourist entered restricted zone {name} (risk score {score:g})',
+    'exit': 'Tourist left {name}',
+    'proximity': 'Tourist is approaching {name} (risk score {score:g})',
+}
+
+
+def make_alert(ping, zone, kind):
+    """Alert dict in the dashboard's ``GeofenceAlert`` shape."""
+    if kind == 'exit':
+        severity = 'low'
+    elif kind == 'proximity':
+        severity = 'medium' if zone.severity == 'critical' else 'low'
+    else:
+        severity = zone.severity
+    timestamp = ping.recorded_at.isoformat(timespec='milliseconds') + 'Z'
+    return {
+        'id': f'{ping.tourist_id}-{zone.zone_id}-{kind}-{ping.recorded_at:%Y%m%d%H%M%S%f}',
+        'touristId': ping.tourist_id,
+        'touristName': None,
+        'zoneId': str(zone.zone_id),
+        'zoneName': zone.name,
+        'zoneType': zone.zone_type,
+        'alertType': kind,
+        'location': {'lat': ping.latitude, 'lng': ping.longitude},
+        'timestamp': timestamp,
+        'severity': severity,
+        'message': MESSAGES[kind].format(name=zone.name, score=zone.risk_score),
+        'acknowledged': False,
+    }
+
+
+ALERT_INSERT_SQL = """
+    INSERT IGNORE INTO geofence_alerts
+        (alert_id, tourist_id, zone_id, zone_name, zone_type, alert_type, severity,
+         latitude, longitude, message, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def alert_rows(alerts):
+    """Argument tuples for :data:`ALERT_INSERT_SQL`."""
+    return [
+        (a['id'], a['touristId'], a['zoneId'], a['zoneName'], a['zoneType'], a['alertType'],
+         a['severity'], a['location']['lat'], a['location']['lng'], a['message'],
+         datetime.fromisoformat(a['timestamp'][:-1]))
+        for a in alerts
+    ]
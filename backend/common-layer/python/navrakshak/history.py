@@ -0,0 +1,141 @@
+"""
+Append-only location history, partitioned by day.
+
+``location_history`` (see ``RDS/schema.sql``) is clustered on
+``(tourist_id, recorded_at)``, so a track query for one tourist over a
+time range is a single range scan of the primary key. No secondary index
+or row lookup is needed, and ``recorded_at`` prunes the scan to the day
+partitions involved.
+
+The table is partitioned with ``RANGE (TO_DAYS(recorded_at))``: one
+partition per day plus a catch-all ``p_future``. :func:`maintain_partitions`
+splits the next days off ``p_future`` before data arrives for them. It
+also drops days past the retention window with ``ALTER TABLE ... DROP
+PARTITION``, which discards a whole day's tablespace in constant time
+instead of deleting rows one by one. ``location_segments`` (compressed
+tracks, see :mod:`navrakshak.trajectory`) is partitioned the same way.
+"""
+
+from datetime import datetime, timedelta
+
+TABLE = 'location_history'
+# Day-partitioned tables handled by maintain_partitions
+PARTITIONED_TABLES = ('location_history', 'location_segments')
+FUTURE_PARTITION = 'p_future'
+PARTITION_PREFIX = 'p'
+PARTITION_DATE_FORMAT = '%Y%m%d'
+
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_DAYS_AHEAD = 3
+
+# INSERT IGNORE makes appends idempotent, so a retried batch does not fail
+# on pings that were already stored.
+APPEND_HISTORY_SQL = """
+    INSERT IGNORE INTO location_history (tourist_id, recorded_at, latitude, longitude, accuracy_m)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+TRACK_SQL = """
+    SELECT recorded_at, latitude, longitude, accuracy_m
+    FROM location_history
+    WHERE tourist_id = %s
+    AND recorded_at >= %s
+    AND recorded_at < %s
+    ORDER BY recorded_at
+    LIMIT %s
+"""
+
+PARTITIONS_SQL = """
+    SELECT PARTITION_NAME
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = %s
+    AND PARTITION_NAME IS NOT NULL
+"""
+
+
+def history_rows(pings):
+    """Argument tuples for :data:`APPEND_HISTORY_SQL` from ``navrakshak.locations.Ping``s."""
+    return [(p.tourist_id, p.recorded_at, p.latitude, p.longitude, p.accuracy) for p in pings]
+
+
+def append_history(connection, pings):
+    """Bulk-append *pings* (one multi-row INSERT per ``max_stmt_length``)."""
+    if not pings:
+        return 0
+    with connection.cursor() as cursor:
+        inserted = cursor.executemany(APPEND_HISTORY_SQL, history_rows(pings))
+    connection.commit()
+    return inserted
+
+
+def track_query(tourist_id, start, end, limit=5000):
+    """``(sql, args)`` for the pings of *tourist_id* in ``[start, end)``."""
+    return TRACK_SQL, (tourist_id, start, end, limit)
+
+
+def partition_name(day):
+    return PARTITION_PREFIX + day.strftime(PARTITION_DATE_FORMAT)
+
+
+def partition_day(name):
+    """Day of a daily partition name, or ``None`` for other partitions."""
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], PARTITION_DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def plan_partitions(existing, today, retention_days=DEFAULT_RETENTION_DAYS, days_ahead=DEFAULT_DAYS_AHEAD):
+    """Return ``(add, drop)``: days to create and partition names to drop.
+
+    A partition for day *d* holds rows up to the start of the next day, so
+    it can go once ``d < today - retention_days``. New days always come
+    after the newest existing one because only ``p_future`` is split.
+    """
+    days = sorted(d for d in (partition_day(n) for n in existing) if d is not None)
+    cutoff = today - timedelta(days=retention_days)
+    drop = [partition_name(d) for d in days if d < cutoff]
+
+    first = max(days[-1] + timedelta(days=1), cutoff) if days else cutoff
+    last = today + timedelta(days=days_ahead)
+    add = []
+    day = first
+    while day <= last:
+        add.append(day)
+        day += timedelta(days=1)
+    return add, drop
+
+
+def add_partitions_sql(days, table=TABLE):
+    """Split the given days off ``p_future``."""
+    parts = ', '.join(
+        f"PARTITION {partition_name(d)} VALUES LESS THAN (TO_DAYS('{d + timedelta(days=1):%Y-%m-%d}'))"
+        for d in days
+    )
+    return (f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+            f"({parts}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE)")
+
+
+def drop_partitions_sql(names, table=TABLE):
+    return f"ALTER TABLE {table} DROP PARTITION {', '.join(names)}"
+
+
+def maintain_partitions(connection, today=None, retention_days=DEFAULT_RETENTION_DAYS,
+                        days_ahead=DEFAULT_DAYS_AHEAD, table=TABLE):
+    """Create upcoming day partitions and drop expired ones.
+
+    Safe to run repeatedly (e.g. daily from EventBridge). Returns
+    ``{'added': [...], 'dropped': [...]}`` with partition names.
+    """
+    today = today or datetime.utcnow().date()
+    with connection.cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL, (table,))
+        existing = [row['PARTITION_NAME'] if isinstance(row, dict) else row[0]
+                    for row in cursor.fetchall()]
+        add, drop = plan_partitions(existing, today, retention_days, days_ahead)
+        if add:
+            cursor.execute(add_partitions_sql(add, table))
+        if drop:
+            cursor.execute(drop_partitions_sql(drop, table))
+    return {'added': [partition_name(d) for d in add], 'dropped': drop}
@@ -0,0 +1,133 @@
+"""
+Tourist location pings: parsing, in-memory coalescing and batched writes.
+
+Devices ping every few seconds, but only the newest position of each
+tourist matters for ``tourists.last_stayed_lat`` / ``last_stayed_lon``.
+:class:`PingCoalescer` keeps one pending ping per tourist, so a flush
+writes at most one row per tourist however many pings arrived since the
+previous flush. A flush is two statements: a multi-row upsert into
+``tourist_locations`` (sent through ``Cursor.executemany``, which folds the
+rows into one ``INSERT ... VALUES (...), (...)``) and one ``UPDATE`` that
+copies the stored positions onto ``tourists``.
+"""
+
+import collections
+from datetime import datetime, timezone
+
+Ping = collections.namedtuple('Ping', 'tourist_id latitude longitude recorded_at accuracy')
+
+MAX_TOURIST_ID_LENGTH = 20
+
+# Older rows are never overwritten by a late ping, so batches may be
+# written concurrently and retried out of order.
+UPSERT_LOCATION_SQL = """
+    INSERT INTO tourist_locations (tourist_id, latitude, longitude, accuracy_m, recorded_at)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        latitude = IF(VALUES(recorded_at) >= recorded_at, VALUES(latitude), latitude),
+        longitude = IF(VALUES(recorded_at) >= recorded_at, VALUES(longitude), longitude),
+        accuracy_m = IF(VALUES(recorded_at) >= recorded_at, VALUES(accuracy_m), accuracy_m),
+        recorded_at = GREATEST(recorded_at, VALUES(recorded_at))
+"""
+
+SYNC_LAST_STAYED_SQL = """
+    UPDATE tourists t
+    JOIN tourist_locations l ON l.tourist_id = t.tourist_id
+    SET t.last_stayed_lat = l.latitude,
+        t.last_stayed_lon = l.longitude
+    WHERE t.tourist_id IN ({placeholders})
+"""
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp (``Date.toISOString()``) into naive UTC.
+
+    :raise ValueError: If *value* is malformed or out of range.
+    """
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError) as e:
+            raise ValueError(f'timestamp out of range: {value}') from e
+    text = str(value).strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_ping(tourist_id, payload):
+    """Build a :class:`Ping` from a request payload, or raise ``ValueError``.
+
+    Accepts the website's ``{"location": {"lat", "lng"}, "timestamp"}`` shape
+    as well as flat ``latitude`` / ``longitude`` keys.
+    """
+    tourist_id = str(tourist_id or payload.get('tourist_id') or '').strip()
+    if not tourist_id or len(tourist_id) > MAX_TOURIST_ID_LENGTH:
+        raise ValueError('tourist_id missing or too long')
+
+    location = payload.get('location') or {}
+    try:
+        latitude = float(location.get('lat', payload.get('latitude')))
+        longitude = float(location.get('lng', payload.get('longitude')))
+    except (TypeError, ValueError):
+        raise ValueError('latitude/longitude missing or not numeric')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f'coordinates out of range: {latitude}, {longitude}')
+
+    accuracy = payload.get('accuracy')
+    try:
+        accuracy = float(accuracy) if accuracy is not None else None
+        recorded_at = parse_timestamp(payload.get('timestamp'))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('accuracy or timestamp malformed')
+
+    return Ping(tourist_id, latitude, longitude, recorded_at, accuracy)
+
+
+class PingCoalescer:
+    """Keep only the newest pending :class:`Ping` per tourist."""
+
+    def __init__(self):
+        self._pending = {}
+        self.received = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, ping):
+        self.received += 1
+        current = self._pending.get(ping.tourist_id)
+        if current is not None:
+            self.coalesced += 1
+            if ping.recorded_at < current.recorded_at:
+                return
+        self._pending[ping.tourist_id] = ping
+
+    def drain(self):
+        """Return all pending pings and start a new, empty batch."""
+        pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+    def restore(self, pings):
+        """Put back pings from a failed flush unless a newer one arrived since."""
+        for ping in pings:
+            current = self._pending.get(ping.tourist_id)
+            if current is None or current.recorded_at < ping.recorded_at:
+                self._pending[ping.tourist_id] = ping
+
+
+def location_rows(pings):
+    """Argument tuples for :data:`UPSERT_LOCATION_SQL`."""
+    return [(p.tourist_id, p.latitude, p.longitude, p.accuracy, p.recorded_at) for p in pings]
+
+
+def sync_last_stayed_query(pings):
+    """``(sql, args)`` copying the stored positions of *pings* onto ``tourists``."""
+    ids = [p.tourist_id for p in pings]
+    return SYNC_LAST_STAYED_SQL.format(placeholders=', '.join(['%s'] * len(ids))), ids
@@ -0,0 +1,150 @@
+"""
+Leveled, sampled JSON logging for the Lambda handlers.
+
+Every line is one JSON object on stdout, which CloudWatch Logs Insights
+can query field by field. A handler creates one :class:`RequestLogger`
+at module level and decorates ``lambda_handler`` with
+:meth:`RequestLogger.handler`; each invocation then ends with a single
+summary line carrying the status code, total duration, per-phase timings
+from :meth:`RequestLogger.timer` and any fields added with
+:meth:`RequestLogger.note`. Timings come from the logger's
+:class:`navrakshak.tracing.Tracer`; in ``emf`` mode the summary line is
+also the invocation's CloudWatch metric record, so it is written even
+when ``LOG_LEVEL`` hides INFO.
+
+Messages use ``%``-style arguments, formatted only when the line is
+actually written, and a disabled level costs one integer comparison, so
+``log.debug('event: %s', event)`` is nearly free in production.
+``LOG_SAMPLE_RATE`` turns on DEBUG for that fraction of invocations (the
+whole invocation, so sampled requests can be followed end to end); their
+summary says ``"sampled": true``.
+
+``LOG_LEVEL`` is ``DEBUG``, ``INFO`` (default), ``WARNING``, ``ERROR`` or
+``OFF``. The summary line is written at INFO, or at ERROR for 5xx
+responses and exceptions.
+"""
+
+import functools
+import json
+import os
+import random
+import sys
+import time
+import traceback
+
+from navrakshak.tracing import Tracer, add_trace_header
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR, 'OFF': OFF}
+_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+class RequestLogger:
+    """Logger for one Lambda function; see the module docstring.
+
+    :param name: Function name written with every line.
+    :param level: Level name; defaults to ``LOG_LEVEL``.
+    :param sample_rate: Fraction of invocations logged at DEBUG; defaults
+        to ``LOG_SAMPLE_RATE`` (``0``).
+    :param stream: Where lines go. (default: stdout)
+    :param tracer: :class:`~navrakshak.tracing.Tracer` for the timings;
+        one named after the function is created if not given.
+    """
+
+    def __init__(self, name, level=None, sample_rate=None, stream=None, tracer=None):
+        self.name = name
+        self.level = LEVELS[(level or os.environ.get('LOG_LEVEL', 'INFO')).upper()]
+        self.sample_rate = float(os.environ.get('LOG_SAMPLE_RATE', 0) if sample_rate is None else sample_rate)
+        self.stream = stream or sys.stdout
+        self.tracer = tracer or Tracer(name, stream=self.stream)
+        # Effective level of the current invocation (lowered when sampled)
+        self.threshold = self.level
+        self.request_id = None
+        self.sampled = False
+        self.cold_start = True
+        self.fields = {}
+
+    def enabled(self, level):
+        return level >= self.threshold
+
+    def _write(self, level, record):
+        record = {'level': _NAMES[level], 'function': self.name, 'request_id': self.request_id, **record}
+        self.stream.write(json.dumps(record, default=str, separators=(',', ':')) + '\n')
+
+    def log(self, level, message, *args, **fields):
+        if level < self.threshold:
+            return
+        self._write(level, {'message': message % args if args else message, **fields})
+
+    def debug(self, message, *args, **fields):
+        if DEBUG >= self.threshold:
+            self._write(DEBUG, {'message': message % args if args else message, **fields})
+
+    def info(self, message, *args, **fields):
+        self.log(INFO, message, *args, **fields)
+
+    def warning(self, message, *args, **fields):
+        self.log(WARNING, message, *args, **fields)
+
+    def error(self, message, *args, **fields):
+        self.log(ERROR, message, *args, **fields)
+
+    def exception(self, message, *args, **fields):
+        """ERROR line with the current exception's traceback."""
+        self.log(ERROR, message, *args, traceback=traceback.format_exc(), **fields)
+
+    def timer(self, name):
+        """Context manager adding the time spent in the block to the summary as ``<name>_ms``."""
+        return self.tracer.phase(name)
+
+    def note(self, **fields):
+        """Add fields to this invocation's summary line."""
+        self.fields.update(fields)
+
+    # -- invocations -----------------------------------------------------------
+
+    def begin(self, event=None, context=None):
+        self.request_id = getattr(context, 'aws_request_id', None)
+        self.sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        self.threshold = min(self.level, DEBUG) if self.sampled else self.level
+        self.fields = {}
+        self.tracer.begin(event)
+
+    def end(self, duration_ms, status, error=None):
+        """Write the summary line of the invocation."""
+        failed = error is not None or (isinstance(status, int) and status >= 500)
+        level = ERROR if failed else INFO
+        metrics = self.tracer.end(duration_ms, failed)
+        if level >= self.threshold or '_aws' in metrics:
+            record = {'message': 'summary', 'status': status, 'cold_start': self.cold_start}
+            record.update(metrics)
+            record.update(self.fields)
+            if self.sampled:
+                record['sampled'] = True
+            if error is not None:
+                record['error'] = repr(error)
+            self._write(level, record)
+        self.cold_start = False
+        self.threshold = self.level
+
+    def handler(self, function):
+        """Decorator for ``lambda_handler``: one summary line per invocation."""
+        @functools.wraps(function)
+        def wrapper(event, context):
+            self.begin(event, context)
+            started = time.perf_counter()
+            try:
+                response = function(event, context)
+            except Exception as e:
+                self.end((time.perf_counter() - started) * 1000, None, e)
+                raise
+            status = response.get('statusCode') if isinstance(response, dict) else None
+            add_trace_header(response, self.tracer.trace_id)
+            self.end((time.perf_counter() - started) * 1000, status)
+            return response
+        return wrapper
@@ -0,0 +1,246 @@
+"""
+Risk assessment of points against risk zones.
+
+:func:`assessment` builds the response of ``area_info_handler`` for one
+point: the containing zone nearest to its centre, ``risk_level``,
+recommendations and safety tips, or the ``SAFE`` answer.
+
+:class:`BatchAssessor` finds that zone for many points at once. Circles
+from ``risk_zones`` are held in NumPy arrays together with a grid of
+the cells they cover; containment and the distance to each centre are
+computed for a whole chunk of points in array operations, only for the
+circles sharing each point's cell. Polygons (usually few) go through a
+:class:`navrakshak.spatial.ZoneIndex`. Without NumPy every point is
+looked up in a :class:`~navrakshak.spatial.ZoneIndex` over all zones,
+which gives the same answers more slowly.
+"""
+
+import math
+
+from navrakshak.geofence import DEFAULT_CELL_DEG, EARTH_RADIUS_M, CircleZone, haversine_m
+from navrakshak.spatial import PolygonZone, ZoneIndex
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Points joined with the circle grid per NumPy chunk
+CHUNK_POINTS = 65536
+
+# (minimum risk_score, risk_level, recommendations, safety_tips), highest first
+RISK_LEVELS = [
+    (8.0, "VERY HIGH", [
+        "🚨 AVOID this area if possible",
+        "👥 Travel in groups if you must go",
+        "📱 Share your location with trusted contacts",
+        "🚔 Have emergency numbers ready"
+    ], [
+        "Stay in well-lit, populated areas",
+        "Trust your instincts - leave if you feel unsafe"
+    ]),
+    (6.0, "HIGH", [
+        "⚠️ Exercise extreme caution",
+        "🌅 Prefer daylight hours for travel",
+        "📱 Keep emergency contacts ready",
+        "💼 Keep valuables secure"
+    ], [
+        "Be aware of your surroundings at all times",
+        "Avoid displaying expensive items"
+    ]),
+    (4.0, "MODERATE", [
+        "👀 Stay alert and aware of surroundings",
+        "🎒 Keep valuables secure",
+        "📱 Keep emergency contacts handy"
+    ], [
+        "Maintain situational awareness",
+        "Follow local safety guidelines"
+    ]),
+    (2.0, "LOW", [
+        "✅ Area has minimal safety concerns",
+        "👍 Follow general safety precautions"
+    ], [
+        "Maintain normal precautions"
+    ]),
+    (float('-inf'), "VERY LOW", [
+        "✅ Area appears very safe",
+        "😊 Enjoy your visit!"
+    ], [
+        "Standard travel precautions apply"
+    ]),
+]
+
+SAFE_MESSAGE = 'No risk zones found for this location - area appears safe'
+SAFE_RECOMMENDATIONS = [
+    "✅ No specific risk zones affect this location",
+    "👍 Follow standard safety precautions",
+    "📍 Stay aware of your surroundings"
+]
+SAFE_TIPS = [
+    "Contact local authorities for area-specific safety information"
+]
+
+
+def risk_advice(risk_score):
+    """``(risk_level, recommendations, safety_tips)`` for a 0-10 score."""
+    for minimum, level, recommendations, safety_tips in RISK_LEVELS:
+        if risk_score >= minimum:
+            return level, recommendations, safety_tips
+    return RISK_LEVELS[-1][1:]
+
+
+def zone_summary(zone, distance_km, risk_level):
+    """The ``nearest_risk_zone`` object of an assessment.
+
+    ``created_at``/``updated_at`` are left as ``datetime`` values for
+    :func:`navrakshak.serialize.dumps` to format.
+    """
+    polygon = isinstance(zone, PolygonZone)
+    return {
+        'id': zone.db_id if polygon else zone.zone_id,
+        'shape': 'polygon' if polygon else 'circle',
+        'zone_name': zone.name,
+        'description': zone.description,
+        'risk_score': zone.risk_score,
+        'risk_level': risk_level,
+        'center_latitude': zone.center[0],
+        'center_longitude': zone.center[1],
+        'radius_km': None if polygon else zone.radius_m / 1000,
+        'distance_from_center': distance_km,
+        'created_at': zone.created_at,
+        'updated_at': zone.updated_at,
+    }
+
+
+def assessment(latitude, longitude, zone, distance_km, assessment_time):
+    """Response body for one point; *zone* is ``None`` when no zone contains it."""
+    location = {'latitude': latitude, 'longitude': longitude}
+    if zone is None:
+        return {
+            'location': location,
+            'nearest_risk_zone': None,
+            'risk_level': 'SAFE',
+            'message': SAFE_MESSAGE,
+            'recommendations': SAFE_RECOMMENDATIONS,
+            'safety_tips': SAFE_TIPS,
+            'assessment_time': assessment_time,
+        }
+    risk_level, recommendations, safety_tips = risk_advice(zone.risk_score)
+    return {
+        'location': location,
+        'nearest_risk_zone': zone_summary(zone, distance_km, risk_level),
+        'recommendations': recommendations,
+        'safety_tips': safety_tips,
+        'assessment_time': assessment_time,
+    }
+
+
+def nearest_containing(index, latitude, longitude):
+    """``(zone, distance_km)`` of the containing zone closest to its centre, or ``(None, None)``."""
+    best = None
+    best_km = None
+    for zone in index.containing(latitude, longitude):
+        km = haversine_m(zone.center[0], zone.center[1], latitude, longitude) / 1000
+        if best_km is None or km < best_km:
+            best, best_km = zone, km
+    return best, best_km
+
+
+class BatchAssessor:
+    """Nearest containing zone for many points.
+
+    With NumPy, circles are bucketed into a uniform grid stored as sorted
+    cell keys plus offsets into a zone array. A batch of points is joined
+    with that grid in array form (one ``searchsorted``), so haversine
+    distances are only computed for (point, circle) pairs that share a
+    cell, and the nearest containing circle per point comes out of one
+    ``lexsort``.
+
+    :param zones: Zone objects, e.g. from :func:`navrakshak.spatial.load_all_zones`.
+    :param use_numpy: Set to ``False`` to force the per-point path.
+        (default: use NumPy when it is installed)
+    :param cell_deg: Grid cell size in degrees. (default: 0.05)
+    """
+
+    def __init__(self, zones, use_numpy=None, cell_deg=DEFAULT_CELL_DEG):
+        zones = list(zones)
+        self.zones = zones
+        self.vectorized = np is not None if use_numpy is None else bool(use_numpy and np is not None)
+        if not self.vectorized:
+            self._index = ZoneIndex(zones)
+            return
+        self._circles = [z for z in zones if isinstance(z, CircleZone)]
+        self._index = ZoneIndex([z for z in zones if not isinstance(z, CircleZone)])
+        self._inv = 1.0 / cell_deg
+        self._lat = np.radians([z.lat for z in self._circles])
+        self._lon = np.radians([z.lon for z in self._circles])
+        self._cos_lat = np.cos(self._lat)
+        self._radius_m = np.array([z.radius_m for z in self._circles])
+
+        keys = []
+        members = []
+        for n, zone in enumerate(self._circles):
+            min_lat, min_lon, max_lat, max_lon = zone.bbox
+            for i in range(math.floor(min_lat * self._inv), math.floor(max_lat * self._inv) + 1):
+                for j in range(math.floor(min_lon * self._inv), math.floor(max_lon * self._inv) + 1):
+                    keys.append(_cell_key(i, j))
+                    members.append(n)
+        keys = np.array(keys, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self._members = np.array(members, dtype=np.int64)[order]
+        self._cells, self._starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+        self._counts = counts
+
+    def __len__(self):
+        return len(self.zones)
+
+    def nearest(self, points):
+        """List of ``(zone, distance_km)`` per ``(lat, lon)`` point; ``(None, None)`` outside all zones."""
+        if not self.vectorized:
+            return [nearest_containing(self._index, lat, lon) for lat, lon in points]
+
+        result = [(None, None)] * len(points)
+        if self._circles and points:
+            coords = np.asarray(points, dtype=float).reshape(-1, 2)
+            for start in range(0, len(coords), CHUNK_POINTS):
+                self._nearest_circles(coords[start:start + CHUNK_POINTS], start, result)
+        if len(self._index):
+            for i, (lat, lon) in enumerate(points):
+                zone, km = nearest_containing(self._index, lat, lon)
+                if zone is not None and (result[i][1] is None or km < result[i][1]):
+                    result[i] = (zone, km)
+        return result
+
+    def _nearest_circles(self, chunk, offset, result):
+        keys = _cell_key(np.floor(chunk[:, 0] * self._inv).astype(np.int64),
+                         np.floor(chunk[:, 1] * self._inv).astype(np.int64))
+        pos = np.minimum(np.searchsorted(self._cells, keys), len(self._cells) - 1)
+        counts = np.where(self._cells[pos] == keys, self._counts[pos], 0)
+        total = int(counts.sum())
+        if not total:
+            return
+
+        # One row per (point, circle sharing its cell)
+        point = np.repeat(np.arange(len(chunk)), counts)
+        first = np.repeat(self._starts[pos] - (np.cumsum(counts) - counts), counts)
+        circle = self._members[first + np.arange(total)]
+
+        lat = np.radians(chunk[point, 0])
+        lon = np.radians(chunk[point, 1])
+        a = (np.sin((self._lat[circle] - lat) / 2) ** 2 +
+             np.cos(lat) * self._cos_lat[circle] * np.sin((self._lon[circle] - lon) / 2) ** 2)
+        distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        inside = distance <= self._radius_m[circle]
+        point, circle, distance = point[inside], circle[inside], distance[inside]
+
+        # Sort by point, then distance; the first row of each point is its nearest circle
+        order = np.lexsort((distance, point))
+        sorted_point = point[order]
+        nearest = order[np.flatnonzero(np.r_[True, sorted_point[1:] != sorted_point[:-1]])]
+        for i, n, d in zip(point[nearest].tolist(), circle[nearest].tolist(), distance[nearest].tolist()):
+            result[offset + i] = (self._circles[n], d / 1000)
+
+
+def _cell_key(i, j):
+    # Works for ints and int64 arrays; cell indices stay far below 2**24 at any sane cell size
+    return (i + (1 << 24)) * (1 << 26) + (j + (1 << 24))
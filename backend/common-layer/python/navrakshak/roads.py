@@ -0,0 +1,283 @@
+"""
+Travel-time ranking on a locally loaded road graph.
+
+Straight-line distance ignores rivers, rail lines and divided highways, so
+the nearest hospital by haversine can be a long drive away. A
+:class:`RoadGraph` (built offline from an OpenStreetMap extract by
+``tools/build_road_graph.py``) lets the caller re-rank the top few
+straight-line candidates by driving time.
+
+The graph is one binary file of flat arrays: node coordinates in
+micro-degrees, CSR adjacency (``offsets``/``targets``) and edge travel
+times in seconds. Nodes are sorted by a 0.01 degree cell key, so snapping
+a point to the road network is a few :func:`bisect.bisect_left` calls and
+loading the file is a handful of ``array.frombytes`` copies; nothing is
+indexed at load time. Chains of shape points between junctions are
+merged into single edges (split every :data:`MAX_EDGE_M`, so a point
+next to a long rural road still snaps close by).
+
+:meth:`RoadGraph.travel_times` runs one A* search from the point towards
+all candidates at once, with the straight-line distance to the closest
+candidate at the graph's top speed as (admissible) heuristic. Each
+candidate's arrival, including the time from its road node to the
+candidate itself, is queued like a node, so candidates are settled in
+order of travel time and when the time budget runs out every settled
+candidate is known to be faster than every unsettled one.
+"""
+
+import array
+import bisect
+import heapq
+import math
+import struct
+import sys
+import time
+
+from navrakshak.geofence import METRES_PER_DEGREE, haversine_m
+
+MAGIC = b'NRRG'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHxxIIf')
+CELL_DEG = 0.01
+MAX_EDGE_M = 500.0
+SNAP_MAX_M = 1000.0
+DEFAULT_BUDGET_S = 0.1
+HEURISTIC_SLACK = 0.995
+
+# Speed between a point and the road node it snaps to (walking to the car, a driveway)
+ACCESS_SPEED_MPS = 20 / 3.6
+
+# km/h per OSM highway class; maxspeed tags override them
+ROAD_SPEEDS_KMH = {
+    'motorway': 90, 'motorway_link': 45,
+    'trunk': 70, 'trunk_link': 40,
+    'primary': 55, 'primary_link': 35,
+    'secondary': 45, 'secondary_link': 30,
+    'tertiary': 35, 'tertiary_link': 25,
+    'unclassified': 25, 'residential': 20,
+    'living_street': 10, 'service': 15, 'road': 25,
+}
+
+
+def cell_key(lat, lon):
+    return (math.floor(lat / CELL_DEG) + 18000) * 72000 + math.floor(lon / CELL_DEG) + 36000
+
+
+def build_graph(nodes, ways, max_edge_m=MAX_EDGE_M):
+    """Road graph from OSM-like nodes and ways.
+
+    :param nodes: ``{node_id: (lat, lon)}``
+    :param ways: ``(node_ids, speed_kmh, oneway)`` tuples; *oneway* is 0
+        (both directions), 1 (along the way) or -1 (against it).
+    :param max_edge_m: Keep a shape point at least this often along a chain.
+    :return: :class:`RoadGraph`
+    """
+    uses = {}
+    for refs, _, _ in ways:
+        for ref in refs:
+            uses[ref] = uses.get(ref, 0) + 1
+
+    kept = {}
+    edges = []
+
+    def keep(ref):
+        if ref not in kept:
+            kept[ref] = len(kept)
+        return kept[ref]
+
+    for refs, speed_kmh, oneway in ways:
+        speed = speed_kmh / 3.6
+        start = None
+        length = 0.0
+        previous = None
+        for ref in refs:
+            if ref not in nodes:
+                # Clipped at the extract border: restart the chain after the gap
+                start = previous = None
+                continue
+            if previous is not None:
+                length += haversine_m(*nodes[previous], *nodes[ref])
+            previous = ref
+            if start is None:
+                start, length = ref, 0.0
+                continue
+            if uses[ref] > 1 or ref == refs[-1] or length >= max_edge_m:
+                u, v = keep(start), keep(ref)
+                if oneway >= 0:
+                    edges.append((u, v, length / speed))
+                if oneway <= 0:
+                    edges.append((v, u, length / speed))
+                start, length = ref, 0.0
+
+    # Renumber by cell so snapping can bisect
+    coords = [None] * len(kept)
+    for ref, i in kept.items():
+        coords[i] = nodes[ref]
+    order = sorted(range(len(coords)), key=lambda i: cell_key(*coords[i]))
+    new_id = [0] * len(order)
+    for position, i in enumerate(order):
+        new_id[i] = position
+
+    edges = sorted((new_id[u], new_id[v], seconds) for u, v, seconds in edges)
+    offsets = array.array('I', [0] * (len(order) + 1))
+    for u, _, _ in edges:
+        offsets[u + 1] += 1
+    for i in range(len(order)):
+        offsets[i + 1] += offsets[i]
+    max_speed = max((speed for _, speed, _ in ways), default=1.0) / 3.6
+    return RoadGraph(
+        array.array('q', (cell_key(*coords[i]) for i in order)),
+        array.array('i', (round(coords[i][0] * 1e6) for i in order)),
+        array.array('i', (round(coords[i][1] * 1e6) for i in order)),
+        offsets,
+        array.array('I', (v for _, v, _ in edges)),
+        array.array('f', (seconds for _, _, seconds in edges)),
+        max_speed,
+    )
+
+
+class RoadGraph:
+    def __init__(self, keys, lat, lon, offsets, targets, seconds, max_speed):
+        self.keys = keys
+        self.lat = lat
+        self.lon = lon
+        self.offsets = offsets
+        self.targets = targets
+        self.seconds = seconds
+        self.max_speed = max_speed
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def snap(self, lat, lon, max_m=SNAP_MAX_M):
+        """``(node, distance_m)`` of the closest node within *max_m*, or ``None``."""
+        row, col = math.floor(lat / CELL_DEG), math.floor(lon / CELL_DEG)
+        rows = math.ceil(max_m / (CELL_DEG * METRES_PER_DEGREE))
+        cols = math.ceil(max_m / (CELL_DEG * METRES_PER_DEGREE * max(math.cos(math.radians(abs(lat) + CELL_DEG)), 0.01)))
+        best = None
+        best_m = max_m
+        for dr in range(-rows, rows + 1):
+            middle = (row + dr + 18000) * 72000 + col + 36000
+            lo = bisect.bisect_left(self.keys, middle - cols)
+            hi = bisect.bisect_right(self.keys, middle + cols, lo)
+            for node in range(lo, hi):
+                d = haversine_m(lat, lon, self.lat[node] * 1e-6, self.lon[node] * 1e-6)
+                if d <= best_m:
+                    best, best_m = node, d
+        return None if best is None else (best, best_m)
+
+    def travel_times(self, lat, lon, targets, budget_s=DEFAULT_BUDGET_S):
+        """Driving seconds from a point to each of *targets*.
+
+        :param targets: ``(lat, lon)`` pairs.
+        :param budget_s: Stop searching after this many seconds.
+        :return: One entry per target; ``None`` where a point is off the
+            road network or the target was not reached within the budget.
+        """
+        deadline = time.perf_counter() + budget_s
+        results = [None] * len(targets)
+        start = self.snap(lat, lon)
+        if start is None:
+            return results
+        goals = {}
+        for i, (target_lat, target_lon) in enumerate(targets):
+            snapped = self.snap(target_lat, target_lon)
+            if snapped is not None:
+                goals.setdefault(snapped[0], []).append((i, snapped[1] / ACCESS_SPEED_MPS))
+        if not goals:
+            return results
+
+        lat_a, lon_a, offsets, targets_a, seconds = self.lat, self.lon, self.offsets, self.targets, self.seconds
+        goal_coords = [(lat_a[node], lon_a[node]) for node in goals]
+        # Flat lower bound in micro-degrees: longitude scaled by the cosine a degree
+        # poleward of every endpoint, the whole bound shrunk a little for curvature
+        widest = max(abs(lat), *(abs(target[0]) for target in targets)) + 1.0
+        ky = HEURISTIC_SLACK * METRES_PER_DEGREE * 1e-6 / self.max_speed
+        kx = ky * math.cos(math.radians(min(widest, 89.0)))
+
+        def heuristic(node):
+            y, x = lat_a[node], lon_a[node]
+            return min(math.sqrt(((y - gy) * ky) ** 2 + ((x - gx) * kx) ** 2) for gy, gx in goal_coords)
+
+        source, access_m = start
+        g = access_m / ACCESS_SPEED_MPS
+        best = {source: g}
+        settled = set()
+        heap = [(g + heuristic(source), g, source)]
+        remaining = sum(len(arrivals) for arrivals in goals.values())
+        while heap and remaining:
+            _, g, node = heapq.heappop(heap)
+            if node < 0:
+                # Arrival at target ~node, queued with its access time included
+                results[~node] = g
+                remaining -= 1
+                continue
+            if node in settled:
+                continue
+            settled.add(node)
+            if node in goals:
+                # The heuristic is 0 at a goal, so the arrival pops in travel-time order
+                for i, access_s in goals[node]:
+                    heapq.heappush(heap, (g + access_s, g + access_s, ~i))
+            if not len(settled) & 255 and time.perf_counter() > deadline:
+                break
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbour = targets_a[edge]
+                cost = g + seconds[edge]
+                if cost < best.get(neighbour, math.inf):
+                    best[neighbour] = cost
+                    heapq.heappush(heap, (cost + heuristic(neighbour), cost, neighbour))
+        return results
+
+    # -- storage -------------------------------------------------------------
+
+    def to_bytes(self):
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, len(self), self.edge_count, self.max_speed)]
+        for values in (self.keys, self.lat, self.lon, self.offsets, self.targets, self.seconds):
+            if sys.byteorder == 'big':
+                values = array.array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """:raise ValueError: If *data* is not a road graph of this version."""
+        magic, version, nodes, edges, max_speed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('Not a road graph file of a supported version')
+        view = memoryview(data)[HEADER.size:]
+        arrays = []
+        for typecode, count in (('q', nodes), ('i', nodes), ('i', nodes), ('I', nodes + 1), ('I', edges), ('f', edges)):
+            values = array.array(typecode)
+            size = values.itemsize * count
+            values.frombytes(view[:size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            arrays.append(values)
+            view = view[size:]
+        return cls(*arrays, max_speed)
+
+
+def load_graph(path):
+    with open(path, 'rb') as f:
+        return RoadGraph.from_bytes(f.read())
+
+
+def rank_by_travel_time(graph, lat, lon, candidates, budget_s=DEFAULT_BUDGET_S):
+    """Re-rank straight-line candidates by driving time.
+
+    :param candidates: ``(row, distance_km)`` pairs, nearest first; rows
+        need ``latitude`` and ``longitude``.
+    :return: ``(row, distance_km, seconds)`` triples, fastest first.
+        Candidates without a travel time keep their straight-line order
+        after the others.
+    """
+    seconds = graph.travel_times(lat, lon, [(float(row['latitude']), float(row['longitude'])) for row, _ in candidates], budget_s)
+    ranked = [(row, distance_km, s) for (row, distance_km), s in zip(candidates, seconds)]
+    reached = sorted((entry for entry in ranked if entry[2] is not None), key=lambda entry: entry[2])
+    return reached + [entry for entry in ranked if entry[2] is None]
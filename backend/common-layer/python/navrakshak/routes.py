@@ -0,0 +1,231 @@
+"""
+Risk scoring of a route against the risk zones.
+
+A route is a polyline of ``(lat, lon)`` vertices. Legs longer than
+``max_step_m`` are split (densified) so every reported segment is short
+enough to be useful on a map. Each leg asks the shared
+:class:`navrakshak.spatial.ZoneIndex` once for zones whose bounding box
+overlaps the leg's; every segment of the leg is then clipped exactly
+against the candidates that overlap it:
+circles by solving the segment-circle intersection, polygons by cutting
+the segment at every edge crossing. Both work on a local equirectangular
+projection, accurate to well under a metre for segments of a few hundred
+metres.
+
+Exposure is risk score times distance inside a zone (risk-km). Where
+zones overlap, only the highest risk counts, so nested zones are not
+added up.
+"""
+
+import math
+
+from navrakshak.geofence import METRES_PER_DEGREE, CircleZone, haversine_m
+from navrakshak.risk import risk_advice
+
+DEFAULT_MAX_STEP_M = 250.0
+MAX_SEGMENTS = 20000
+
+
+def decode_polyline(encoded, precision=5):
+    """Decode an encoded polyline (Google format) into ``(lat, lon)`` vertices."""
+    factor = 10 ** precision
+    coords = []
+    pos = lat = lon = 0
+    while pos < len(encoded):
+        deltas = []
+        for _ in range(2):
+            value = shift = 0
+            while True:
+                b = ord(encoded[pos]) - 63
+                pos += 1
+                value |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            deltas.append(~(value >> 1) if value & 1 else value >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append((lat / factor, lon / factor))
+    return coords
+
+
+def densify(vertices, max_step_m=DEFAULT_MAX_STEP_M):
+    """Insert vertices so no segment is longer than *max_step_m*.
+
+    Returns ``(points, lengths)`` where ``lengths[i]`` is the length in
+    metres of the segment from ``points[i]`` to ``points[i + 1]``.
+    """
+    points = [vertices[0]]
+    lengths = []
+    for (lat1, lon1), (lat2, lon2) in zip(vertices, vertices[1:]):
+        length = haversine_m(lat1, lon1, lat2, lon2)
+        if not length:
+            continue
+        steps = max(1, math.ceil(length / max_step_m))
+        for k in range(1, steps + 1):
+            f = k / steps
+            points.append((lat1 + (lat2 - lat1) * f, lon1 + (lon2 - lon1) * f))
+            lengths.append(length / steps)
+    return points, lengths
+
+
+def _bbox(a, b):
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1])
+
+
+def _circle_interval(zone, a, b):
+    """Part ``(t0, t1)`` of segment *a*-*b* inside a circle, or ``None``."""
+    kx = math.cos(math.radians(zone.lat)) * METRES_PER_DEGREE
+    ax = (a[1] - zone.lon) * kx
+    ay = (a[0] - zone.lat) * METRES_PER_DEGREE
+    dx = (b[1] - a[1]) * kx
+    dy = (b[0] - a[0]) * METRES_PER_DEGREE
+    qa = dx * dx + dy * dy
+    qb = 2 * (ax * dx + ay * dy)
+    qc = ax * ax + ay * ay - zone.radius_m * zone.radius_m
+    if not qa:
+        return (0.0, 1.0) if qc <= 0 else None
+    disc = qb * qb - 4 * qa * qc
+    if disc <= 0:
+        return None
+    root = math.sqrt(disc)
+    t0 = max(0.0, (-qb - root) / (2 * qa))
+    t1 = min(1.0, (-qb + root) / (2 * qa))
+    return (t0, t1) if t1 > t0 else None
+
+
+def _polygon_intervals(zone, a, b):
+    """Parts ``[(t0, t1), ...]`` of segment *a*-*b* inside a polygon."""
+    dx = b[1] - a[1]
+    dy = b[0] - a[0]
+    cuts = [0.0, 1.0]
+    for lat1, lon1, lat2, lon2 in zone.edges:
+        ex = lon2 - lon1
+        ey = lat2 - lat1
+        denom = dx * ey - dy * ex
+        if not denom:
+            continue
+        qx = lon1 - a[1]
+        qy = lat1 - a[0]
+        t = (qx * ey - qy * ex) / denom
+        u = (qx * dy - qy * dx) / denom
+        if 0.0 < t < 1.0 and 0.0 <= u <= 1.0:
+            cuts.append(t)
+    cuts.sort()
+    intervals = []
+    for t0, t1 in zip(cuts, cuts[1:]):
+        if t1 <= t0:
+            continue
+        mid = (t0 + t1) / 2
+        if zone.contains(a[0] + dy * mid, a[1] + dx * mid):
+            if intervals and intervals[-1][1] == t0:
+                intervals[-1] = (intervals[-1][0], t1)
+            else:
+                intervals.append((t0, t1))
+    return intervals
+
+
+def zone_intervals(zone, a, b):
+    if isinstance(zone, CircleZone):
+        interval = _circle_interval(zone, a, b)
+        return [interval] if interval else []
+    return _polygon_intervals(zone, a, b)
+
+
+def _max_risk_length(hits):
+    """``(sum of max risk * dt, covered dt)`` over ``(risk, t0, t1)`` hits on one segment."""
+    cuts = sorted({t for _, t0, t1 in hits for t in (t0, t1)})
+    weighted = covered = 0.0
+    for t0, t1 in zip(cuts, cuts[1:]):
+        mid = (t0 + t1) / 2
+        risk = max((score for score, s0, s1 in hits if s0 <= mid <= s1), default=None)
+        if risk is not None:
+            weighted += risk * (t1 - t0)
+            covered += t1 - t0
+    return weighted, covered
+
+
+def score_route(index, vertices, max_step_m=DEFAULT_MAX_STEP_M):
+    """Score a route; returns the response body of the route risk endpoint.
+
+    :param index: A :class:`navrakshak.spatial.ZoneIndex`.
+    :param vertices: ``(lat, lon)`` route vertices, at least two.
+    :param max_step_m: Longest segment after densifying. Raised for very
+        long routes so they stay within :data:`MAX_SEGMENTS` segments.
+    :raise ValueError: If the route has fewer than two vertices.
+    """
+    if len(vertices) < 2:
+        raise ValueError('A route needs at least two points')
+    total_m = sum(haversine_m(*a, *b) for a, b in zip(vertices, vertices[1:]))
+    if total_m / max_step_m > MAX_SEGMENTS:
+        max_step_m = total_m / MAX_SEGMENTS
+
+    segments = []
+    zones = {}
+    total_exposure = risky_m = 0.0
+    max_risk = None
+    for leg_start, leg_end in zip(vertices, vertices[1:]):
+        points, lengths = densify((leg_start, leg_end), max_step_m)
+        # One index lookup per leg; its densified pieces only re-check bounding boxes
+        leg = _bbox(leg_start, leg_end)
+        candidates = index.overlapping(leg)
+        for i, length in enumerate(lengths):
+            a, b = points[i], points[i + 1]
+            min_lat, min_lon, max_lat, max_lon = _bbox(a, b) if len(lengths) > 1 else leg
+            hits = []
+            hit_zones = []
+            for zone in candidates:
+                box = zone.bbox
+                if box[0] > max_lat or box[2] < min_lat or box[1] > max_lon or box[3] < min_lon:
+                    continue
+                intervals = zone_intervals(zone, a, b)
+                if not intervals:
+                    continue
+                inside = sum(t1 - t0 for t0, t1 in intervals)
+                summary = zones.get(zone.zone_id)
+                if summary is None:
+                    summary = zones[zone.zone_id] = {
+                        'id': zone.zone_id,
+                        'zone_name': zone.name,
+                        'risk_score': zone.risk_score,
+                        'risk_level': risk_advice(zone.risk_score)[0],
+                        'distance_inside_km': 0.0,
+                    }
+                summary['distance_inside_km'] += inside * length / 1000
+                hits.extend((zone.risk_score, t0, t1) for t0, t1 in intervals)
+                hit_zones.append(zone.zone_id)
+
+            segment = {
+                'index': len(segments),
+                'start': {'latitude': a[0], 'longitude': a[1]},
+                'end': {'latitude': b[0], 'longitude': b[1]},
+                'length_m': round(length, 1),
+            }
+            if hits:
+                weighted, covered = _max_risk_length(hits)
+                exposure = weighted * length / 1000
+                segment_max = max(score for score, _, _ in hits)
+                total_exposure += exposure
+                risky_m += covered * length
+                max_risk = segment_max if max_risk is None else max(max_risk, segment_max)
+                segment.update({
+                    'max_risk_score': segment_max,
+                    'risk_level': risk_advice(segment_max)[0],
+                    'exposure': round(exposure, 4),
+                    'zones': hit_zones,
+                })
+            else:
+                segment.update({'max_risk_score': None, 'risk_level': 'SAFE', 'exposure': 0.0, 'zones': []})
+            segments.append(segment)
+
+    for summary in zones.values():
+        summary['distance_inside_km'] = round(summary['distance_inside_km'], 3)
+    return {
+        'distance_km': round(total_m / 1000, 3),
+        'distance_in_risk_zones_km': round(risky_m / 1000, 3),
+        'total_exposure': round(total_exposure, 4),
+        'max_risk_score': max_risk,
+        'risk_level': risk_advice(max_risk)[0] if max_risk is not None else 'SAFE',
+        'zones': sorted(zones.values(), key=lambda z: -z['risk_score']),
+        'segments': segments,
+    }
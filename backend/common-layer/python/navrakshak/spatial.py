@@ -0,0 +1,365 @@
+"""
+Polygon zones and the shared zone index.
+
+``zone_polygons`` stores each polygon compactly: ring vertices are packed
+as little-endian int32 micro-degrees (8 bytes per vertex) next to the
+polygon's bounding box, so a bbox prefilter needs no decoding at all.
+
+:class:`PolygonZone` precomputes an edge grid over its bounding box once.
+Cells that no edge touches are classified inside or outside when the
+grid is built, so most point-in-polygon tests are a single array lookup.
+Points in boundary cells cast a ray against only the edges of their
+horizontal slab (grid row).
+
+:class:`ZoneIndex` is an STR-packed R-tree over the bounding boxes of all
+zones (``risk_zones`` circles and polygons). ``area_info_handler`` and
+:class:`navrakshak.geofence.GeofenceEngine` both look zones up through it.
+"""
+
+import math
+import time
+from array import array
+
+import pymysql
+from pymysql.constants import ER
+
+from navrakshak.geofence import (
+    METRES_PER_DEGREE, ZONES_SQL, CircleZone, severity_for, zone_type_for,
+)
+
+COORD_SCALE = 1000000
+RTREE_NODE_SIZE = 16
+MAX_GRID = 64
+
+OUTSIDE = 0
+INSIDE = 1
+BOUNDARY = 2
+
+POLYGONS_SQL = """
+    SELECT id, zone_name, description, risk_score, vertices, created_at, updated_at
+    FROM zone_polygons
+"""
+
+INSERT_POLYGON_SQL = """
+    INSERT INTO zone_polygons
+        (zone_name, description, risk_score, min_lat, min_lon, max_lat, max_lon, vertex_count, vertices)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def encode_rings(rings):
+    """Pack rings of ``(lat, lon)`` into bytes: ring count, ring lengths, vertices.
+
+    The first ring is the outer boundary, any further rings are holes.
+    A closing vertex equal to the first one is dropped.
+    """
+    packed = array('i', [len(rings)])
+    coords = array('i')
+    for ring in rings:
+        ring = list(ring)
+        if len(ring) > 1 and ring[0] == ring[-1]:
+            ring.pop()
+        if len(ring) < 3:
+            raise ValueError('A polygon ring needs at least 3 vertices')
+        packed.append(len(ring))
+        for lat, lon in ring:
+            coords.append(round(lat * COORD_SCALE))
+            coords.append(round(lon * COORD_SCALE))
+    packed.extend(coords)
+    if packed.itemsize != 4:
+        raise RuntimeError('array("i") is not 32-bit on this platform')
+    return packed.tobytes()
+
+
+def decode_rings(data):
+    """Inverse of :func:`encode_rings`: list of ``[(lat, lon), ...]`` rings."""
+    values = array('i')
+    values.frombytes(data)
+    count = values[0]
+    pos = 1 + count
+    rings = []
+    for length in values[1:1 + count]:
+        flat = values[pos:pos + 2 * length]
+        rings.append([(flat[i] / COORD_SCALE, flat[i + 1] / COORD_SCALE) for i in range(0, len(flat), 2)])
+        pos += 2 * length
+    return rings
+
+
+def polygon_row(name, risk_score, rings, description=None):
+    """Argument tuple for :data:`INSERT_POLYGON_SQL`."""
+    outer = rings[0]
+    lats = [lat for lat, _ in outer]
+    lons = [lon for _, lon in outer]
+    vertices = encode_rings(rings)
+    return (name, description, risk_score, min(lats), min(lons), max(lats), max(lons),
+            sum(len(r) for r in decode_rings(vertices)), vertices)
+
+
+class PolygonZone:
+    """A polygon zone with an edge grid for fast point-in-polygon tests."""
+
+    __slots__ = ('zone_id', 'db_id', 'name', 'description', 'zone_type', 'severity', 'risk_score',
+                 'bbox', 'center', 'created_at', 'updated_at',
+                 '_edges', '_rows', '_cols', '_cell_h', '_cell_w', '_cells', '_slabs')
+
+    def __init__(self, zone_id, name, risk_score, rings, description=None,
+                 created_at=None, updated_at=None):
+        self.db_id = zone_id
+        # Prefixed so polygon ids never collide with risk_zones ids
+        self.zone_id = f'poly-{zone_id}'
+        self.name = name
+        self.description = description
+        self.risk_score = float(risk_score)
+        self.zone_type = zone_type_for(self.risk_score)
+        self.severity = severity_for(self.risk_score)
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+        edges = []
+        for ring in rings:
+            for i in range(len(ring)):
+                lat1, lon1 = ring[i - 1]
+                lat2, lon2 = ring[i]
+                if (lat1, lon1) != (lat2, lon2):
+                    edges.append((lat1, lon1, lat2, lon2))
+        self._edges = edges
+        outer = rings[0]
+        lats = [lat for lat, _ in outer]
+        lons = [lon for _, lon in outer]
+        self.bbox = (min(lats), min(lons), max(lats), max(lons))
+        self.center = (sum(lats) / len(lats), sum(lons) / len(lons))
+        self._build_grid()
+
+    def _build_grid(self):
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        n = max(4, min(MAX_GRID, int(math.sqrt(len(self._edges))) + 1))
+        self._rows = self._cols = n
+        self._cell_h = (max_lat - min_lat) / n or 1e-9
+        self._cell_w = (max_lon - min_lon) / n or 1e-9
+        cells = bytearray(n * n)
+        slabs = [[] for _ in range(n)]
+        for edge in self._edges:
+            lat1, lon1, lat2, lon2 = edge
+            r0, r1 = sorted((self._row(lat1), self._row(lat2)))
+            c0, c1 = sorted((self._col(lon1), self._col(lon2)))
+            for r in range(r0, r1 + 1):
+                slabs[r].append(edge)
+                # Conservative: every cell of the edge's bbox counts as boundary
+                for c in range(c0, c1 + 1):
+                    cells[r * n + c] = BOUNDARY
+        self._slabs = [tuple(s) for s in slabs]
+        for r in range(n):
+            lat = min_lat + (r + 0.5) * self._cell_h
+            for c in range(n):
+                if cells[r * n + c] != BOUNDARY:
+                    lon = min_lon + (c + 0.5) * self._cell_w
+                    cells[r * n + c] = INSIDE if self._ray_cast(lat, lon, self._edges) else OUTSIDE
+        self._cells = bytes(cells)
+
+    def _row(self, lat):
+        return min(self._rows - 1, max(0, int((lat - self.bbox[0]) / self._cell_h)))
+
+    def _col(self, lon):
+        return min(self._cols - 1, max(0, int((lon - self.bbox[1]) / self._cell_w)))
+
+    @staticmethod
+    def _ray_cast(lat, lon, edges):
+        inside = False
+        for lat1, lon1, lat2, lon2 in edges:
+            if (lat1 > lat) != (lat2 > lat):
+                cross = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+                if lon < cross:
+                    inside = not inside
+        return inside
+
+    @property
+    def edges(self):
+        """``(lat1, lon1, lat2, lon2)`` tuples of every ring."""
+        return self._edges
+
+    def contains(self, lat, lon):
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        if lat < min_lat or lat > max_lat or lon < min_lon or lon > max_lon:
+            return False
+        row = self._row(lat)
+        state = self._cells[row * self._cols + self._col(lon)]
+        if state != BOUNDARY:
+            return state == INSIDE
+        return self._ray_cast(lat, lon, self._slabs[row])
+
+    def distance_m(self, lat, lon):
+        """0 inside, else metres to the nearest edge (equirectangular)."""
+        if self.contains(lat, lon):
+            return 0.0
+        kx = math.cos(math.radians(lat)) * METRES_PER_DEGREE
+        ky = METRES_PER_DEGREE
+        best = float('inf')
+        for lat1, lon1, lat2, lon2 in self._edges:
+            ax, ay = (lon1 - lon) * kx, (lat1 - lat) * ky
+            dx, dy = (lon2 - lon1) * kx, (lat2 - lat1) * ky
+            length_sq = dx * dx + dy * dy
+            t = 0.0
+            if length_sq:
+                t = min(1.0, max(0.0, -(ax * dx + ay * dy) / length_sq))
+            px, py = ax + t * dx, ay + t * dy
+            d = px * px + py * py
+            if d < best:
+                best = d
+        return math.sqrt(best)
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a :data:`POLYGONS_SQL` row (tuple or dict)."""
+        if isinstance(row, dict):
+            row = (row['id'], row['zone_name'], row['description'], row['risk_score'],
+                   row['vertices'], row['created_at'], row['updated_at'])
+        zone_id, name, description, risk_score, vertices, created_at, updated_at = row
+        return cls(zone_id, name, risk_score, decode_rings(vertices), description,
+                   created_at, updated_at)
+
+
+def _expand(bbox, margin_m):
+    if not margin_m:
+        return bbox
+    min_lat, min_lon, max_lat, max_lon = bbox
+    dlat = margin_m / METRES_PER_DEGREE
+    dlon = dlat / max(math.cos(math.radians((min_lat + max_lat) / 2)), 1e-6)
+    return (min_lat - dlat, min_lon - dlon, max_lat + dlat, max_lon + dlon)
+
+
+def _union(boxes):
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+class ZoneIndex:
+    """Static R-tree (Sort-Tile-Recursive bulk load) over zone bounding boxes.
+
+    :param zones: Objects with ``bbox`` and ``contains(lat, lon)``.
+    :param margin_m: Grow every bbox by this many metres, e.g. the
+        geofence proximity distance.
+    """
+
+    def __init__(self, zones, margin_m=0.0):
+        self.zones = list(zones)
+        level = [(_expand(z.bbox, margin_m), z) for z in self.zones]
+        self.height = 1
+        # Leaves hold (bbox, zone); inner nodes hold (bbox, children)
+        while len(level) > RTREE_NODE_SIZE:
+            level = self._pack(level)
+            self.height += 1
+        self._root = tuple(level)
+
+    @staticmethod
+    def _pack(entries):
+        n = len(entries)
+        leaves = math.ceil(n / RTREE_NODE_SIZE)
+        slices = math.ceil(math.sqrt(leaves))
+        per_slice = slices * RTREE_NODE_SIZE
+        entries = sorted(entries, key=lambda e: e[0][1] + e[0][3])
+        nodes = []
+        for i in range(0, n, per_slice):
+            vertical = sorted(entries[i:i + per_slice], key=lambda e: e[0][0] + e[0][2])
+            for j in range(0, len(vertical), RTREE_NODE_SIZE):
+                children = tuple(vertical[j:j + RTREE_NODE_SIZE])
+                nodes.append((_union([c[0] for c in children]), children))
+        return nodes
+
+    def __len__(self):
+        return len(self.zones)
+
+    def candidates(self, lat, lon):
+        """Zones whose (expanded) bounding box contains the point."""
+        result = []
+        stack = [(self._root, self.height)]
+        while stack:
+            node, depth = stack.pop()
+            for box, child in node:
+                if box[0] <= lat <= box[2] and box[1] <= lon <= box[3]:
+                    if depth == 1:
+                        result.append(child)
+                    else:
+                        stack.append((child, depth - 1))
+        return result
+
+    def overlapping(self, bbox):
+        """Zones whose (expanded) bounding box intersects *bbox* ``(min_lat, min_lon, max_lat, max_lon)``."""
+        min_lat, min_lon, max_lat, max_lon = bbox
+        result = []
+        stack = [(self._root, self.height)]
+        while stack:
+            node, depth = stack.pop()
+            for box, child in node:
+                if box[0] <= max_lat and min_lat <= box[2] and box[1] <= max_lon and min_lon <= box[3]:
+                    if depth == 1:
+                        result.append(child)
+                    else:
+                        stack.append((child, depth - 1))
+        return result
+
+    def containing(self, lat, lon):
+        """Zones that contain the point."""
+        return [z for z in self.candidates(lat, lon) if z.contains(lat, lon)]
+
+
+def _no_polygon_table(error):
+    # A database created before zone_polygons existed simply has no polygons
+    return isinstance(error, pymysql.err.ProgrammingError) and error.args[0] == ER.NO_SUCH_TABLE
+
+
+def load_all_zones(connection):
+    """Circles from ``risk_zones`` plus polygons from ``zone_polygons``.
+
+    Without a ``zone_polygons`` table the circles are returned on their own.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(ZONES_SQL)
+        zones = [CircleZone.from_row(row) for row in cursor.fetchall()]
+        try:
+            cursor.execute(POLYGONS_SQL)
+        except pymysql.MySQLError as e:
+            if not _no_polygon_table(e):
+                raise
+            return zones
+        zones.extend(PolygonZone.from_row(row) for row in cursor.fetchall())
+    return zones
+
+
+async def load_all_zones_async(connection):
+    """:func:`load_all_zones` on a ``pymysql.aio`` connection."""
+    async with connection.cursor() as cursor:
+        await cursor.execute(ZONES_SQL)
+        zones = [CircleZone.from_row(row) for row in cursor.fetchall()]
+        try:
+            await cursor.execute(POLYGONS_SQL)
+        except pymysql.MySQLError as e:
+            if not _no_polygon_table(e):
+                raise
+            return zones
+        zones.extend(PolygonZone.from_row(row) for row in cursor.fetchall())
+    return zones
+
+
+class ZoneCache:
+    """Keep a :class:`ZoneIndex` between Lambda invocations.
+
+    ``get(connect)`` rebuilds the index at most every *ttl* seconds;
+    *connect* is only called when a reload is due. *build* turns the
+    loaded zones into the cached object. (default: :class:`ZoneIndex`)
+    """
+
+    def __init__(self, ttl=300, build=ZoneIndex):
+        self.ttl = ttl
+        self.build = build
+        self.index = None
+        self.loaded_at = 0.0
+
+    def get(self, connect):
+        if self.index is None or time.monotonic() - self.loaded_at > self.ttl:
+            connection = connect()
+            try:
+                self.index = self.build(load_all_zones(connection))
+            finally:
+                connection.close()
+            self.loaded_at = time.monotonic()
+        return self.index
@@ -0,0 +1,244 @@
+"""
+Precomputed risk heatmap tiles.
+
+Zones (circles from ``risk_zones`` and polygons from ``zone_polygons``) are
+rasterized into slippy-map tiles, ``{z}/{x}/{y}`` in Web Mercator as used
+by Leaflet and Mapbox. Every pixel holds the highest ``risk_score`` of the
+zones covering it, as ``round(risk_score * 25)`` in one byte; 0 means no
+zone. Zones smaller than a pixel still mark the pixel at their centre, so
+they stay visible when zoomed out.
+
+Each tile is written as a palette PNG (transparent where there is no
+risk) and/or as a compact grid: the zlib-compressed byte array, row by
+row from the north-west corner. Tiles without any zone are not written.
+
+``manifest.json`` records the zoom levels, tile size and the
+``updated_at`` and bounding box of every zone in the last build. The next
+:func:`build_tiles` renders only the tiles under zones that were added,
+removed, moved or whose ``updated_at`` changed, at every zoom level.
+"""
+
+import json
+import math
+import struct
+import zlib
+
+from navrakshak.geofence import METRES_PER_DEGREE, CircleZone
+from navrakshak.spatial import ZoneIndex
+
+DEFAULT_ZOOMS = range(5, 13)
+DEFAULT_TILE_SIZE = 256
+VALUE_SCALE = 25
+MANIFEST_KEY = 'manifest.json'
+MAX_LAT = 85.05112878
+
+FORMATS = {
+    'png': ('png', 'image/png'),
+    'grid': ('bin', 'application/octet-stream'),
+}
+
+
+def lonlat_to_tile(lat, lon, zoom):
+    """Fractional ``(x, y)`` tile coordinates of a point."""
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    n = 1 << zoom
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_lat(y, zoom):
+    """Latitude of the (fractional) tile row *y*."""
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / (1 << zoom)))))
+
+
+def tile_bbox(zoom, x, y):
+    """``(min_lat, min_lon, max_lat, max_lon)`` of a tile."""
+    n = 1 << zoom
+    return (tile_lat(y + 1, zoom), x / n * 360.0 - 180.0,
+            tile_lat(y, zoom), (x + 1) / n * 360.0 - 180.0)
+
+
+def tiles_for_bbox(bbox, zoom):
+    """All ``(x, y)`` tiles at *zoom* that a bounding box touches."""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    n = 1 << zoom
+    x0, y0 = lonlat_to_tile(max_lat, min_lon, zoom)
+    x1, y1 = lonlat_to_tile(min_lat, max_lon, zoom)
+    for x in range(max(0, int(x0)), min(n - 1, int(x1)) + 1):
+        for y in range(max(0, int(y0)), min(n - 1, int(y1)) + 1):
+            yield x, y
+
+
+def _spans(zone, lat):
+    """Longitude intervals of *zone* along the parallel *lat*."""
+    if isinstance(zone, CircleZone):
+        dy = (lat - zone.lat) * METRES_PER_DEGREE
+        if abs(dy) > zone.radius_m:
+            return ()
+        dlon = math.sqrt(zone.radius_m ** 2 - dy * dy) / (METRES_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        return ((zone.lon - dlon, zone.lon + dlon),)
+    # Even-odd scanline over all rings, so holes are left out
+    crossings = sorted(
+        lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+        for lat1, lon1, lat2, lon2 in zone.edges
+        if (lat1 > lat) != (lat2 > lat)
+    )
+    return tuple(zip(crossings[::2], crossings[1::2]))
+
+
+def render_tile(zones, zoom, x, y, size=DEFAULT_TILE_SIZE):
+    """Rasterize *zones* into a ``size * size`` bytearray of risk values.
+
+    Each pixel row is filled span by span (circle chords, polygon scanline
+    intervals), so the cost follows the rows a zone covers, not its pixels.
+    Zones are painted from lowest to highest risk, so where they overlap
+    the highest risk is left.
+    """
+    pixels = bytearray(size * size)
+    n = 1 << zoom
+    for zone in sorted(zones, key=lambda z: z.risk_score):
+        value = min(255, max(1, round(zone.risk_score * VALUE_SCALE)))
+        fill = bytes((value,)) * size
+        min_lat, min_lon, max_lat, max_lon = zone.bbox
+        fy0 = lonlat_to_tile(max_lat, min_lon, zoom)[1]
+        fy1 = lonlat_to_tile(min_lat, max_lon, zoom)[1]
+        py0 = max(0, int((fy0 - y) * size))
+        py1 = min(size - 1, int((fy1 - y) * size))
+
+        marked = False
+        for py in range(py0, py1 + 1):
+            lat = tile_lat(y + (py + 0.5) / size, zoom)
+            row = py * size
+            for lon_a, lon_b in _spans(zone, lat):
+                # Pixels whose centre lies inside the span
+                a = max(0, math.ceil(((lon_a + 180.0) / 360.0 * n - x) * size - 0.5))
+                b = min(size - 1, math.floor(((lon_b + 180.0) / 360.0 * n - x) * size - 0.5))
+                if a <= b:
+                    pixels[row + a:row + b + 1] = fill[:b - a + 1]
+                    marked = True
+        if not marked:
+            # Smaller than a pixel: mark the one holding its centre
+            cx, cy = lonlat_to_tile(zone.center[0], zone.center[1], zoom)
+            px, py = int((cx - x) * size), int((cy - y) * size)
+            if 0 <= px < size and 0 <= py < size and pixels[py * size + px] < value:
+                pixels[py * size + px] = value
+    return pixels
+
+
+def _palette():
+    """Green (low) through yellow to red (high); index 0 is transparent."""
+    rgb = bytearray(b'\0\0\0')
+    alpha = bytearray(b'\0')
+    for value in range(1, 256):
+        f = min(1.0, value / (10 * VALUE_SCALE))
+        if f < 0.5:
+            r, g = int(510 * f), 200
+        else:
+            r, g = 255, int(200 * (2 - 2 * f))
+        rgb += bytes((r, g, 0))
+        alpha.append(min(255, 90 + int(140 * f)))
+    return bytes(rgb), bytes(alpha)
+
+
+_PLTE, _TRNS = _palette()
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def encode_png(pixels, size=DEFAULT_TILE_SIZE):
+    """8-bit palette PNG of a rendered tile."""
+    raw = bytearray()
+    for row in range(size):
+        raw.append(0)
+        raw += pixels[row * size:(row + 1) * size]
+    return (b'\x89PNG\r\n\x1a\n' +
+            _chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 3, 0, 0, 0)) +
+            _chunk(b'PLTE', _PLTE) +
+            _chunk(b'tRNS', _TRNS) +
+            _chunk(b'IDAT', zlib.compress(bytes(raw), 9)) +
+            _chunk(b'IEND', b''))
+
+
+def encode_grid(pixels):
+    """zlib-compressed risk values; ``risk_score = value / 25``."""
+    return zlib.compress(bytes(pixels), 9)
+
+
+def tile_key(zoom, x, y, fmt):
+    return f'{zoom}/{x}/{y}.{FORMATS[fmt][0]}'
+
+
+def zone_manifest(zones):
+    """``{zone_id: [updated_at, bbox]}`` for the manifest."""
+    return {
+        str(zone.zone_id): [zone.updated_at.isoformat() if zone.updated_at else None,
+                            [round(v, 6) for v in zone.bbox]]
+        for zone in zones
+    }
+
+
+def dirty_tiles(previous, current, zooms):
+    """``{(z, x, y)}`` to re-render: tiles under the old and new box of every changed zone."""
+    boxes = []
+    for zone_id in previous.keys() | current.keys():
+        before = previous.get(zone_id)
+        after = current.get(zone_id)
+        if before == after:
+            continue
+        boxes.extend(entry[1] for entry in (before, after) if entry)
+    dirty = set()
+    for zoom in zooms:
+        for bbox in boxes:
+            dirty.update((zoom, x, y) for x, y in tiles_for_bbox(bbox, zoom))
+    return dirty
+
+
+def build_tiles(zones, store, zooms=DEFAULT_ZOOMS, size=DEFAULT_TILE_SIZE, formats=('png',), full=False):
+    """Render changed tiles into *store* and update its manifest.
+
+    :param zones: Zone objects, e.g. from :func:`navrakshak.spatial.load_all_zones`.
+    :param store: Object with ``get(key)`` (``None`` if missing),
+        ``put(key, data, content_type)`` and ``delete(key)``.
+    :param full: Ignore the previous manifest and render every tile under a zone.
+        Tiles of zoom levels dropped since the last build are left in place.
+    :return: Counts of ``rendered`` tiles, of those ``written`` and of
+        ``empty`` ones (deleted from *store* if they were there).
+    """
+    zooms = sorted(zooms)
+    current = zone_manifest(zones)
+    previous = {}
+    raw = None if full else store.get(MANIFEST_KEY)
+    if raw:
+        manifest = json.loads(raw)
+        previous = manifest['zones']
+        if (manifest.get('zooms'), manifest.get('size'), manifest.get('formats')) != (zooms, size, list(formats)):
+            # A different layout invalidates every tile under old and new zones
+            previous = {zone_id: ['invalidated', entry[1]] for zone_id, entry in previous.items()}
+
+    dirty = dirty_tiles(previous, current, zooms)
+    index = ZoneIndex(zones)
+    stats = {'zones': len(zones), 'rendered': 0, 'written': 0, 'empty': 0}
+    for zoom, x, y in sorted(dirty):
+        pixels = render_tile(index.overlapping(tile_bbox(zoom, x, y)), zoom, x, y, size)
+        stats['rendered'] += 1
+        empty = not any(pixels)
+        for fmt in formats:
+            key = tile_key(zoom, x, y, fmt)
+            if empty:
+                store.delete(key)
+                continue
+            data = encode_png(pixels, size) if fmt == 'png' else encode_grid(pixels)
+            store.put(key, data, FORMATS[fmt][1])
+        stats['empty' if empty else 'written'] += 1
+
+    store.put(MANIFEST_KEY, json.dumps({
+        'zooms': zooms,
+        'size': size,
+        'formats': list(formats),
+        'value_scale': VALUE_SCALE,
+        'zones': current,
+    }).encode(), 'application/json')
+    return stats
@@ -0,0 +1,240 @@
+"""
+Per-phase latency tracing for the Lambda functions and the Lex router.
+
+A :class:`Tracer` per function times named phases of an invocation
+(``with tracer.phase('query'):``) and, through :meth:`Tracer.handler`,
+the whole invocation. What happens with the timings depends on the mode:
+
+``emf``
+    One CloudWatch Embedded Metric Format line per invocation on stdout.
+    CloudWatch turns ``duration_ms``, every ``<phase>_ms`` and ``errors``
+    into metrics of the ``TRACE_NAMESPACE`` namespace with a ``function``
+    dimension; the line stays searchable by ``trace_id``. Default inside
+    Lambda.
+``histogram``
+    Nothing is written; timings go into in-process log-bucketed
+    histograms (:func:`report`), for local runs and benchmarks. Default
+    outside Lambda.
+``off``
+    Phases are still timed (the logger uses them) but not recorded.
+
+The router starts a trace for every Lex event and sends its id in the
+``X-Trace-Id`` header (:meth:`Tracer.headers`); handlers pick it up from
+the API Gateway event, so one id follows an SOS request across functions.
+The id is echoed in the response headers.
+"""
+
+import functools
+import json
+import math
+import os
+import re
+import sys
+import time
+import uuid
+
+TRACE_HEADER = 'X-Trace-Id'
+# Caller-supplied ids end up in logs and response headers: keep them short and plain
+TRACE_ID_PATTERN = re.compile(r'[A-Za-z0-9-]{1,64}')
+DEFAULT_NAMESPACE = 'NavRakshak'
+
+EMF = 'emf'
+HISTOGRAM = 'histogram'
+OFF = 'off'
+MODES = (EMF, HISTOGRAM, OFF)
+
+
+def new_trace_id():
+    return uuid.uuid4().hex
+
+
+def trace_id_from(event):
+    """Trace id sent by the caller (``X-Trace-Id`` header or a ``trace_id`` field), or ``None``.
+
+    Ids that are not 1-64 letters, digits and hyphens are ignored.
+    """
+    if not isinstance(event, dict):
+        return None
+    value = event.get('trace_id')
+    for key, header in (event.get('headers') or {}).items():
+        if key.lower() == 'x-trace-id':
+            value = header
+            break
+    if isinstance(value, str) and TRACE_ID_PATTERN.fullmatch(value):
+        return value
+    return None
+
+
+class Histogram:
+    """Latency histogram with 5% wide logarithmic buckets; percentiles are bucket upper bounds."""
+
+    RATIO = 1.05
+    _LOG_RATIO = math.log(RATIO)
+    _FLOOR = -142  # 1 us
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        bucket = max(self._FLOOR, math.ceil(math.log(ms) / self._LOG_RATIO)) if ms > 0 else self._FLOOR
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.RATIO ** bucket, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'p50': round(self.percentile(0.5), 3),
+            'p95': round(self.percentile(0.95), 3),
+            'p99': round(self.percentile(0.99), 3),
+            'max': round(self.max, 3),
+        }
+
+
+# (function, phase) -> Histogram, shared by every Tracer in the process
+_histograms = {}
+
+
+def report():
+    """``{function: {phase: {count, mean, p50, p95, p99, max}}}`` of the ``histogram`` mode, in ms."""
+    result = {}
+    for (function, phase), histogram in sorted(_histograms.items()):
+        result.setdefault(function, {})[phase] = histogram.summary()
+    return result
+
+
+def reset():
+    _histograms.clear()
+
+
+class _Phase:
+    __slots__ = ('phases', 'name', 'started')
+
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.started) * 1000
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + elapsed
+        return False
+
+
+class Tracer:
+    """Phase timings of one function; see the module docstring.
+
+    :param function: Name used as the ``function`` metric dimension.
+    :param mode: ``emf``, ``histogram`` or ``off``; defaults to
+        ``TRACE_MODE``, else ``emf`` inside Lambda and ``histogram`` outside.
+    :param namespace: CloudWatch namespace; defaults to ``TRACE_NAMESPACE``.
+    :raise ValueError: If *mode* is unknown.
+    """
+
+    def __init__(self, function, mode=None, namespace=None, stream=None):
+        self.function = function
+        self.mode = (mode or os.environ.get('TRACE_MODE')
+                     or (EMF if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ else HISTOGRAM))
+        if self.mode not in MODES:
+            raise ValueError(f'Unknown trace mode: {self.mode}')
+        self.namespace = namespace or os.environ.get('TRACE_NAMESPACE', DEFAULT_NAMESPACE)
+        self.stream = stream or sys.stdout
+        self.trace_id = None
+        self.phases = {}
+        self.failed = False
+
+    def phase(self, name):
+        """Context manager adding the time spent in the block to phase *name*."""
+        return _Phase(self.phases, name)
+
+    def headers(self, headers=None):
+        """*headers* plus the ``X-Trace-Id`` of the current trace, for outgoing requests."""
+        return {**(headers or {}), TRACE_HEADER: self.trace_id}
+
+    def mark_failed(self):
+        """Count this invocation in ``errors`` although it returned normally."""
+        self.failed = True
+
+    def begin(self, event=None):
+        self.trace_id = trace_id_from(event) or new_trace_id()
+        self.phases = {}
+        self.failed = False
+
+    def end(self, duration_ms, failed=False):
+        """Record the invocation.
+
+        :return: Its fields (``function``, ``trace_id``, ``duration_ms``,
+            ``<phase>_ms``, ``errors``), with the EMF ``_aws`` block in
+            ``emf`` mode.
+        """
+        values = {'duration_ms': round(duration_ms, 2)}
+        values.update((f'{name}_ms', round(ms, 2)) for name, ms in self.phases.items())
+        if self.mode == HISTOGRAM:
+            _histogram(self.function, 'duration').add(duration_ms)
+            for name, ms in self.phases.items():
+                _histogram(self.function, name).add(ms)
+        record = {'function': self.function, 'trace_id': self.trace_id, **values, 'errors': int(failed or self.failed)}
+        if self.mode == EMF:
+            metrics = [{'Name': name, 'Unit': 'Milliseconds'} for name in values]
+            metrics.append({'Name': 'errors', 'Unit': 'Count'})
+            record['_aws'] = {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{'Namespace': self.namespace, 'Dimensions': [['function']], 'Metrics': metrics}],
+            }
+        return record
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, default=str, separators=(',', ':')) + '\n')
+
+    def handler(self, function):
+        """Decorator for ``lambda_handler``: trace the invocation and emit its metrics."""
+        @functools.wraps(function)
+        def wrapper(event, context):
+            self.begin(event)
+            started = time.perf_counter()
+            try:
+                response = function(event, context)
+            except Exception:
+                record = self.end((time.perf_counter() - started) * 1000, True)
+                if self.mode == EMF:
+                    self.write(record)
+                raise
+            status = response.get('statusCode') if isinstance(response, dict) else None
+            add_trace_header(response, self.trace_id)
+            record = self.end((time.perf_counter() - started) * 1000, isinstance(status, int) and status >= 500)
+            if self.mode == EMF:
+                record['status'] = status
+                self.write(record)
+            return response
+        return wrapper
+
+
+def _histogram(function, phase):
+    histogram = _histograms.get((function, phase))
+    if histogram is None:
+        histogram = _histograms[(function, phase)] = Histogram()
+    return histogram
+
+
+def add_trace_header(response, trace_id):
+    """Echo the trace id in an API Gateway response's headers."""
+    if isinstance(response, dict) and 'statusCode' in response:
+        response.setdefault('headers', {})[TRACE_HEADER] = trace_id
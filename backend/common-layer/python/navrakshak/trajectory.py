@@ -0,0 +1,260 @@
+"""
+Trajectory compression for stored location history.
+
+A tourist's pings are cut into segments (at most ``max_points`` pings or
+``max_duration``, split at gaps longer than ``max_gap``). Each segment is
+simplified with Douglas-Peucker to the configured tolerance in metres and
+packed into a small blob:
+
+    version (1 byte) | point count (varint) | point 0 | point 1 | ...
+
+Every point is three zigzag varints: milliseconds, latitude and longitude
+in micro-degrees (about 0.1 m), each stored as the difference from the
+previous point. Point 0 is relative to ``(0, 0, 0)``. The accuracy of
+individual pings is not kept. Blobs are decoded lazily with
+:func:`iter_points`, so a reader that stops early never unpacks the rest.
+"""
+
+import collections
+import math
+from datetime import datetime, timedelta, timezone
+
+FORMAT_VERSION = 1
+
+DEFAULT_TOLERANCE_M = 5.0
+DEFAULT_MAX_POINTS = 720
+DEFAULT_MAX_DURATION = timedelta(minutes=15)
+DEFAULT_MAX_GAP = timedelta(minutes=5)
+
+COORD_SCALE = 1000000
+EARTH_RADIUS_M = 6371000.0
+_EPOCH = datetime(1970, 1, 1)
+
+Segment = collections.namedtuple(
+    'Segment', 'tourist_id start_at end_at raw_points stored_points tolerance_m data'
+)
+
+APPEND_SEGMENT_SQL = """
+    INSERT IGNORE INTO location_segments
+        (tourist_id, start_at, end_at, raw_points, stored_points, tolerance_m, data)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Segments never span more than max_duration, so bounding start_at from
+# below keeps the lookup a primary-key range scan.
+SEGMENTS_SQL = """
+    SELECT start_at, end_at, data
+    FROM location_segments
+    WHERE tourist_id = %s
+    AND start_at >= %s
+    AND start_at < %s
+    AND end_at >= %s
+    ORDER BY start_at
+"""
+
+
+def to_millis(value):
+    return int((value - _EPOCH) / timedelta(milliseconds=1))
+
+
+def from_millis(ms):
+    return _EPOCH + timedelta(milliseconds=ms)
+
+
+def simplify(points, tolerance_m=DEFAULT_TOLERANCE_M):
+    """Douglas-Peucker over ``(millis, lat, lon)`` tuples; keeps both endpoints.
+
+    Uses the synchronized Euclidean distance: a point is compared with
+    the position interpolated *at its own timestamp* between the segment
+    ends, not with the nearest point of the line. Replaying the kept points
+    by time is then within *tolerance_m* of every original ping, even when
+    the tourist stopped or changed speed along a straight line. Distances
+    are measured on an equirectangular projection around the first point.
+    """
+    n = len(points)
+    if n < 3 or tolerance_m <= 0:
+        return list(points)
+
+    lat0 = math.radians(points[0][1])
+    kx = math.cos(lat0) * math.pi / 180 * EARTH_RADIUS_M
+    ky = math.pi / 180 * EARTH_RADIUS_M
+    ts = [p[0] for p in points]
+    xs = [p[2] * kx for p in points]
+    ys = [p[1] * ky for p in points]
+
+    keep = bytearray(n)
+    keep[0] = keep[n - 1] = 1
+    tolerance_sq = tolerance_m * tolerance_m
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        t0, ax, ay = ts[first], xs[first], ys[first]
+        span = ts[last] - t0
+        vx = (xs[last] - ax) / span if span else 0.0
+        vy = (ys[last] - ay) / span if span else 0.0
+        worst, worst_sq = -1, tolerance_sq
+        for i in range(first + 1, last):
+            dt = ts[i] - t0
+            px = xs[i] - ax - vx * dt
+            py = ys[i] - ay - vy * dt
+            d_sq = px * px + py * py
+            if d_sq > worst_sq:
+                worst, worst_sq = i, d_sq
+        if worst > 0:
+            keep[worst] = 1
+            if worst - first > 1:
+                stack.append((first, worst))
+            if last - worst > 1:
+                stack.append((worst, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def _put_varint(buf, value):
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def encode(points):
+    """Pack ``(millis, lat, lon)`` points into a segment blob."""
+    buf = bytearray([FORMAT_VERSION])
+    count = len(points)
+    while count > 0x7F:
+        buf.append((count & 0x7F) | 0x80)
+        count >>= 7
+    buf.append(count)
+    pt = plat = plon = 0
+    for t, lat, lon in points:
+        ilat = round(lat * COORD_SCALE)
+        ilon = round(lon * COORD_SCALE)
+        _put_varint(buf, t - pt)
+        _put_varint(buf, ilat - plat)
+        _put_varint(buf, ilon - plon)
+        pt, plat, plon = t, ilat, ilon
+    return bytes(buf)
+
+
+def iter_points(data):
+    """Lazily yield ``(millis, lat, lon)`` from a segment blob.
+
+    :raise ValueError: If the blob has an unknown format version.
+    """
+    if not data or data[0] != FORMAT_VERSION:
+        raise ValueError('Unknown trajectory segment format')
+    pos = 1
+    count = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        count |= (b & 0x7F) << shift
+        shift += 7
+        if b < 0x80:
+            break
+
+    acc = [0, 0, 0]
+    for _ in range(count):
+        for k in range(3):
+            value = shift = 0
+            while True:
+                b = data[pos]
+                pos += 1
+                value |= (b & 0x7F) << shift
+                shift += 7
+                if b < 0x80:
+                    break
+            acc[k] += (value >> 1) ^ -(value & 1)
+        yield acc[0], acc[1] / COORD_SCALE, acc[2] / COORD_SCALE
+
+
+def compress(tourist_id, points, tolerance_m=DEFAULT_TOLERANCE_M):
+    """Build a :class:`Segment` from ``(millis, lat, lon)`` points in time order."""
+    kept = simplify(points, tolerance_m)
+    return Segment(
+        tourist_id,
+        from_millis(points[0][0]),
+        from_millis(points[-1][0]),
+        len(points),
+        len(kept),
+        tolerance_m,
+        encode(kept),
+    )
+
+
+def segment_rows(segments):
+    """Argument tuples for :data:`APPEND_SEGMENT_SQL`."""
+    return [tuple(s) for s in segments]
+
+
+def segments_query(tourist_id, start, end, max_duration=DEFAULT_MAX_DURATION):
+    """``(sql, args)`` for the segments of *tourist_id* overlapping ``[start, end)``."""
+    return SEGMENTS_SQL, (tourist_id, start - max_duration, end, start)
+
+
+def iter_track(rows, start=None, end=None):
+    """Lazily yield ``(recorded_at, lat, lon)`` from ``(start_at, end_at, data)``
+    rows in start order, clipped to ``[start, end)``."""
+    lo = to_millis(start) if start is not None else None
+    hi = to_millis(end) if end is not None else None
+    for row in rows:
+        data = row['data'] if isinstance(row, dict) else row[2]
+        for t, lat, lon in iter_points(data):
+            if lo is not None and t < lo:
+                continue
+            if hi is not None and t >= hi:
+                break
+            yield from_millis(t), lat, lon
+
+
+class SegmentBuilder:
+    """Accumulate pings per tourist and emit compressed :class:`Segment` s.
+
+    :meth:`add` returns the segments closed by that ping; call
+    :meth:`close_idle` periodically and :meth:`close_all` on shutdown so
+    quiet tourists are written too. Pings older than the last one of the
+    open segment are dropped and counted in ``out_of_order``.
+    """
+
+    def __init__(self, tolerance_m=DEFAULT_TOLERANCE_M, max_points=DEFAULT_MAX_POINTS,
+                 max_duration=DEFAULT_MAX_DURATION, max_gap=DEFAULT_MAX_GAP):
+        self.tolerance_m = tolerance_m
+        self.max_points = max_points
+        self.max_duration_ms = int(max_duration / timedelta(milliseconds=1))
+        self.max_gap_ms = int(max_gap / timedelta(milliseconds=1))
+        self._open = {}
+        self.out_of_order = 0
+
+    def __len__(self):
+        return len(self._open)
+
+    def add(self, ping):
+        t = to_millis(ping.recorded_at)
+        point = (t, ping.latitude, ping.longitude)
+        points = self._open.get(ping.tourist_id)
+        if points is None:
+            self._open[ping.tourist_id] = [point]
+            return []
+        last = points[-1][0]
+        if t <= last:
+            self.out_of_order += 1
+            return []
+        if t - last > self.max_gap_ms or t - points[0][0] > self.max_duration_ms:
+            self._open[ping.tourist_id] = [point]
+            return [compress(ping.tourist_id, points, self.tolerance_m)]
+        points.append(point)
+        if len(points) >= self.max_points:
+            del self._open[ping.tourist_id]
+            return [compress(ping.tourist_id, points, self.tolerance_m)]
+        return []
+
+    def close_idle(self, now=None):
+        """Close segments whose last ping is older than ``max_gap``."""
+        now_ms = to_millis(now or datetime.now(timezone.utc).replace(tzinfo=None))
+        idle = [tid for tid, points in self._open.items() if now_ms - points[-1][0] > self.max_gap_ms]
+        return [compress(tid, self._open.pop(tid), self.tolerance_m) for tid in idle]
+
+    def close_all(self):
+        closed = [compress(tid, points, self.tolerance_m) for tid, points in self._open.items()]
+        self._open.clear()
+        return closed
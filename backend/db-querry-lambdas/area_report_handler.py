@@ -0,0 +1,207 @@
+import json
+import os
+import pymysql
+from pymysql.constants import CLIENT
+from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.serialize import dumps
+from navrakshak.tracing import Tracer
+
+DISTANCE_SQL = """( 6371 * acos(
+                cos(radians(%s)) * cos(radians(latitude)) *
+                cos(radians(longitude) - radians(%s)) +
+                sin(radians(%s)) * sin(radians(latitude))
+            ))"""
+
+tracer = Tracer('area_report')
+
+
+def format_time(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+@tracer.handler
+@compressed(tracer.phase)
+def lambda_handler(event, context):
+    # Handle both direct Lambda testing and API Gateway calls
+    try:
+        if 'body' in event:
+            body = json.loads(event['body'])
+        else:
+            body = event
+
+        latitude = float(body['latitude'])
+        longitude = float(body['longitude'])
+        location = body.get('location') or ''
+        if not isinstance(location, str):
+            raise TypeError('location is not a string')
+        location = location.strip()
+        announcement_limit = int(body.get('announcement_limit', 5))
+        if announcement_limit < 0:
+            raise ValueError('announcement_limit is negative')
+    except (KeyError, TypeError, ValueError):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': 'Invalid input: Please provide latitude and longitude as numbers in JSON body, '
+                         'and optionally location as a string and a non-negative announcement_limit'
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    # Get DB connection details from environment variables
+    db_host = os.environ['DB_HOST']
+    db_user = os.environ['DB_USER']
+    db_password = os.environ['DB_PASSWORD']
+    db_name = os.environ['DB_NAME']
+
+    point = (latitude, longitude, latitude)
+
+    announcement_conditions = [
+        "is_active = TRUE",
+        "(valid_from IS NULL OR valid_from <= NOW())",
+        "(valid_until IS NULL OR valid_until >= NOW())"
+    ]
+    announcement_params = []
+    if location:
+        announcement_conditions.append("(location LIKE %s OR location = 'All India')")
+        announcement_params.append(f"%{location}%")
+    announcement_params.append(announcement_limit)
+
+    # All four lookups are sent together and answered in one network round trip
+    statements = [
+        (f"""
+            SELECT id, name, address, phone, type, latitude, longitude, district, state,
+            {DISTANCE_SQL} AS distance
+            FROM hospitals
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ORDER BY distance
+            LIMIT 1
+        """, point),
+        (f"""
+            SELECT id, name, address, state, latitude, longitude,
+            {DISTANCE_SQL} AS distance
+            FROM police_stations
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ORDER BY distance
+            LIMIT 1
+        """, point),
+        (f"""
+            SELECT id, zone_name, description, risk_score, latitude, longitude, radius_km,
+            {DISTANCE_SQL} AS distance_from_center
+            FROM risk_zones
+            WHERE latitude IS NOT NULL
+            AND longitude IS NOT NULL
+            AND radius_km IS NOT NULL
+            HAVING distance_from_center <= radius_km
+            ORDER BY risk_score DESC, distance_from_center ASC
+        """, point),
+        (f"""
+            SELECT announcement_id, title, content, category, priority, location, published_at
+            FROM announcements
+            WHERE {' AND '.join(announcement_conditions)}
+            ORDER BY
+                CASE priority
+                    WHEN 'CRITICAL' THEN 4
+                    WHEN 'HIGH' THEN 3
+                    WHEN 'MEDIUM' THEN 2
+                    WHEN 'LOW' THEN 1
+                END DESC,
+                published_at DESC
+            LIMIT %s
+        """, announcement_params),
+    ]
+
+    connection = None
+    try:
+        with tracer.phase('connect'):
+            connection = pymysql.connect(
+                host=db_host,
+                user=db_user,
+                password=db_password,
+                database=db_name,
+                port=3306,
+                client_flag=CLIENT.MULTI_STATEMENTS,
+                cursorclass=pymysql.cursors.DictCursor
+            )
+
+        with tracer.phase('query'):
+            hospitals, police_stations, zones, announcements = connection.query_batch(statements)
+
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Database error', 'message': str(e)}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    finally:
+        if connection:
+            connection.close()
+
+    hospital = hospitals[0] if hospitals else None
+    police = police_stations[0] if police_stations else None
+
+    response = {
+        'location': {
+            'latitude': latitude,
+            'longitude': longitude
+        },
+        'nearest_hospital': {
+            'id': hospital['id'],
+            'name': hospital['name'],
+            'address': hospital['address'],
+            'phone': hospital['phone'],
+            'type': hospital['type'],
+            'latitude': float(hospital['latitude']),
+            'longitude': float(hospital['longitude']),
+            'district': hospital['district'],
+            'state': hospital['state'],
+            'distance_km': float(hospital['distance'])
+        } if hospital else None,
+        'nearest_police_station': {
+            'id': police['id'],
+            'name': police['name'],
+            'address': police['address'],
+            'state': police['state'],
+            'latitude': float(police['latitude']),
+            'longitude': float(police['longitude']),
+            'distance_km': float(police['distance'])
+        } if police else None,
+        'risk_zones': [
+            {
+                'id': zone['id'],
+                'zone_name': zone['zone_name'],
+                'description': zone['description'],
+                'risk_score': float(zone['risk_score']),
+                'radius_km': float(zone['radius_km']),
+                'distance_from_center': float(zone['distance_from_center'])
+            }
+            for zone in zones
+        ],
+        'announcements': [
+            {
+                'announcement_id': announcement['announcement_id'],
+                'title': announcement['title'],
+                'content': announcement['content'],
+                'category': announcement['category'],
+                'priority': announcement['priority'],
+                'location': announcement['location'],
+                'published_at': format_time(announcement['published_at'])
+            }
+            for announcement in announcements
+        ],
+        'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+    }
+
+    with tracer.phase('serialize'):
+        body = dumps(response)
+
+    return {
+        'statusCode': 200,
+        'body': body,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        }
+    }
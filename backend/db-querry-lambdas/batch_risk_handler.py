@@ -0,0 +1,100 @@
+import json
+import os
+import pymysql
+from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.risk import BatchAssessor, assessment
+from navrakshak.serialize import dumps
+from navrakshak.spatial import ZoneCache
+from navrakshak.tracing import Tracer
+
+MAX_POINTS = int(os.environ.get('BATCH_MAX_POINTS', 10000))
+
+zone_cache = ZoneCache(ttl=int(os.environ.get('ZONE_CACHE_TTL', 300)), build=BatchAssessor)
+tracer = Tracer('batch_risk')
+
+
+def parse_points(body):
+    points = []
+    for point in body['points']:
+        if isinstance(point, dict):
+            lat, lon = float(point['latitude']), float(point['longitude'])
+        else:
+            lat, lon = (float(v) for v in point)
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f'coordinates out of range: {lat}, {lon}')
+        points.append((lat, lon))
+    return points
+
+
+@tracer.handler
+@compressed(tracer.phase)
+def lambda_handler(event, context):
+    try:
+        body = json.loads(event['body']) if 'body' in event else event
+        if not isinstance(body['points'], list):
+            raise TypeError('points must be a list')
+        # Count before parsing so an oversized request is turned away cheaply
+        too_many = len(body['points']) > MAX_POINTS
+        points = None if too_many else parse_points(body)
+    except (KeyError, TypeError, ValueError):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': 'Invalid input: Please provide "points" as a list of {latitude, longitude} objects or [latitude, longitude] pairs'
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+    if too_many:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': f'Too many points: at most {MAX_POINTS} per request'}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    def connect():
+        return pymysql.connect(
+            host=os.environ['DB_HOST'],
+            user=os.environ['DB_USER'],
+            password=os.environ['DB_PASSWORD'],
+            database=os.environ['DB_NAME'],
+            port=3306,
+            cursorclass=pymysql.cursors.DictCursor
+        )
+
+    try:
+        with tracer.phase('zones'):
+            assessor = zone_cache.get(connect)
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': 'Database error',
+                'message': str(e)
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    assessment_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+    with tracer.phase('assess'):
+        assessments = [
+            assessment(lat, lon, zone, distance_km, assessment_time)
+            for (lat, lon), (zone, distance_km) in zip(points, assessor.nearest(points))
+        ]
+
+    with tracer.phase('serialize'):
+        body = dumps({
+            'count': len(assessments),
+            'in_risk_zone': sum(1 for a in assessments if a['nearest_risk_zone'] is not None),
+            'assessments': assessments,
+            'assessment_time': assessment_time
+        })
+
+    return {
+        'statusCode': 200,
+        'body': body,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        }
+    }
@@ -0,0 +1,141 @@
+import json
+import os
+import uuid
+import boto3
+import pymysql
+from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.export import EXPORTS, FORMATS, CONTENT_TYPES, stream_export
+from navrakshak.serialize import dumps
+from navrakshak.tracing import Tracer
+
+# S3 requires every multipart part except the last to be at least 5 MB
+PART_SIZE = 8 * 1024 * 1024
+
+s3 = boto3.client('s3')
+tracer = Tracer('export')
+
+
+def upload_stream(chunks, bucket, key, content_type):
+    """Upload an iterator of byte chunks to S3 without holding it in memory."""
+    upload = s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)
+    upload_id = upload['UploadId']
+    parts = []
+    buf = bytearray()
+    total = 0
+    try:
+        for chunk in chunks:
+            buf += chunk
+            total += len(chunk)
+            if len(buf) >= PART_SIZE:
+                parts.append(_upload_part(bucket, key, upload_id, len(parts) + 1, buf))
+                buf = bytearray()
+        if buf or not parts:
+            parts.append(_upload_part(bucket, key, upload_id, len(parts) + 1, buf))
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+    except Exception:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return total
+
+
+def _upload_part(bucket, key, upload_id, part_number, data):
+    part = s3.upload_part(
+        Bucket=bucket, Key=key, UploadId=upload_id,
+        PartNumber=part_number, Body=bytes(data)
+    )
+    return {'ETag': part['ETag'], 'PartNumber': part_number}
+
+
+@tracer.handler
+@compressed(tracer.phase)
+def lambda_handler(event, context):
+    # Handle both direct Lambda testing and API Gateway calls
+    try:
+        if 'body' in event:
+            body = json.loads(event['body']) if event['body'] else {}
+        else:
+            body = event
+
+        dataset = body.get('dataset', '').strip()
+        fmt = body.get('format', 'jsonl').strip().lower()
+        since = body.get('since')
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Invalid JSON input'}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    if dataset not in EXPORTS or fmt not in FORMATS:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': f"Provide 'dataset' as one of {sorted(EXPORTS)} and 'format' as one of {list(FORMATS)}"
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    # Get DB connection details from environment variables
+    db_host = os.environ['DB_HOST']
+    db_user = os.environ['DB_USER']
+    db_password = os.environ['DB_PASSWORD']
+    db_name = os.environ['DB_NAME']
+    bucket = os.environ['EXPORT_BUCKET']
+
+    key = f"exports/{dataset}/{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.{fmt}"
+
+    connection = None
+    try:
+        with tracer.phase('connect'):
+            connection = pymysql.connect(
+                host=db_host,
+                user=db_user,
+                password=db_password,
+                database=db_name,
+                port=3306
+            )
+
+        # Rows are streamed from the server, encoded and uploaded part by part
+        with tracer.phase('export'):
+            chunks = stream_export(connection, dataset, fmt, since=since)
+            size_bytes = upload_stream(chunks, bucket, key, CONTENT_TYPES[fmt])
+
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Database error', 'message': str(e)}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    finally:
+        if connection:
+            connection.close()
+
+    download_url = s3.generate_presigned_url(
+        'get_object', Params={'Bucket': bucket, 'Key': key}, ExpiresIn=3600
+    )
+
+    response = {
+        'dataset': dataset,
+        'format': fmt,
+        'size_bytes': size_bytes,
+        'download_url': download_url,
+        'expires_in_seconds': 3600,
+        'exported_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+    }
+
+    with tracer.phase('serialize'):
+        body = dumps(response)
+
+    return {
+        'statusCode': 200,
+        'body': body,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        }
+    }
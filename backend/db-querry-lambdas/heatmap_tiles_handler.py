@@ -0,0 +1,83 @@
+import json
+import os
+import boto3
+import pymysql
+from botocore.exceptions import ClientError
+from navrakshak.spatial import load_all_zones
+from navrakshak.tiles import DEFAULT_TILE_SIZE, MANIFEST_KEY, build_tiles, tile_key
+from navrakshak.tracing import Tracer
+
+s3 = boto3.client('s3')
+tracer = Tracer('heatmap_tiles')
+
+
+class S3Store:
+    """Tiles under *prefix* in *bucket*; tiles are cacheable, the manifest is not."""
+
+    def __init__(self, bucket, prefix, max_age):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_age = max_age
+
+    def get(self, key):
+        try:
+            return s3.get_object(Bucket=self.bucket, Key=self.prefix + key)['Body'].read()
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return None
+            raise
+
+    def put(self, key, data, content_type):
+        cache_control = 'no-cache' if key == MANIFEST_KEY else f'public, max-age={self.max_age}'
+        s3.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data,
+                      ContentType=content_type, CacheControl=cache_control)
+
+    def delete(self, key):
+        s3.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+
+@tracer.handler
+def lambda_handler(event, context):
+    # Runs from an EventBridge schedule; {"full": true} forces a complete rebuild
+    event = event or {}
+    bucket = os.environ['HEATMAP_BUCKET']
+    prefix = os.environ.get('HEATMAP_PREFIX', 'heatmap/')
+    first, last = (int(z) for z in os.environ.get('HEATMAP_ZOOMS', '5-12').split('-'))
+    formats = tuple(os.environ.get('HEATMAP_FORMATS', 'png').split(','))
+    store = S3Store(bucket, prefix, int(os.environ.get('HEATMAP_MAX_AGE', 3600)))
+
+    connection = None
+    try:
+        with tracer.phase('connect'):
+            connection = pymysql.connect(
+                host=os.environ['DB_HOST'],
+                user=os.environ['DB_USER'],
+                password=os.environ['DB_PASSWORD'],
+                database=os.environ['DB_NAME'],
+                port=3306
+            )
+        with tracer.phase('zones'):
+            zones = load_all_zones(connection)
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Database error', 'message': str(e)}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+    finally:
+        if connection:
+            connection.close()
+
+    with tracer.phase('render'):
+        stats = build_tiles(zones, store, range(first, last + 1),
+                            int(os.environ.get('HEATMAP_TILE_SIZE', DEFAULT_TILE_SIZE)),
+                            formats, full=bool(event.get('full')))
+    # One URL template per format; tiles_url is the first, for callers that expect a single one
+    stats['tiles_urls'] = {fmt: f"s3://{bucket}/{prefix}{tile_key('{z}', '{x}', '{y}', fmt)}" for fmt in formats}
+    stats['tiles_url'] = stats['tiles_urls'][formats[0]]
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps(stats),
+        'headers': {'Content-Type': 'application/json'}
+    }
@@ -0,0 +1,120 @@
+import json
+import os
+import pymysql
+from datetime import datetime, timedelta
+from itertools import islice
+from navrakshak.compression import compressed
+from navrakshak.history import track_query
+from navrakshak.locations import parse_timestamp
+from navrakshak.serialize import dumps
+from navrakshak.tracing import Tracer
+from navrakshak.trajectory import iter_track, segments_query
+
+DEFAULT_WINDOW_HOURS = 24
+MAX_POINTS = 20000
+
+# 'raw' reads location_history, 'segments' reads compressed location_segments
+HISTORY_FORMAT = os.environ.get('HISTORY_FORMAT', 'raw')
+
+tracer = Tracer('location_history')
+
+
+@tracer.handler
+@compressed(tracer.phase)
+def lambda_handler(event, context):
+    # Handle both direct Lambda testing and API Gateway calls
+    try:
+        if 'body' in event:
+            body = json.loads(event['body']) if event['body'] else {}
+        else:
+            body = event
+
+        tourist_id = body['tourist_id'].strip()
+        end = parse_timestamp(body['end']) if body.get('end') else datetime.utcnow()
+        if body.get('start'):
+            start = parse_timestamp(body['start'])
+        else:
+            start = end - timedelta(hours=DEFAULT_WINDOW_HOURS)
+        limit = min(int(body.get('limit', 5000)), MAX_POINTS)
+        if not tourist_id or start >= end or limit <= 0:
+            raise ValueError
+    except (KeyError, TypeError, ValueError, AttributeError, OverflowError):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': 'Invalid input: Please provide tourist_id and optionally start, end (ISO 8601) and limit'
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    # Get DB connection details from environment variables
+    db_host = os.environ['DB_HOST']
+    db_user = os.environ['DB_USER']
+    db_password = os.environ['DB_PASSWORD']
+    db_name = os.environ['DB_NAME']
+
+    connection = None
+    try:
+        with tracer.phase('connect'):
+            connection = pymysql.connect(
+                host=db_host,
+                user=db_user,
+                password=db_password,
+                database=db_name,
+                port=3306,
+                cursorclass=pymysql.cursors.Cursor
+            )
+
+        # Primary-key range scan on (tourist_id, recorded_at), pruned to the day partitions
+        with tracer.phase('query'), connection.cursor() as cursor:
+            if HISTORY_FORMAT == 'segments':
+                cursor.execute(*segments_query(tourist_id, start, end))
+                # Segments are unpacked lazily; decoding stops once limit points are read
+                rows = [
+                    (recorded_at, latitude, longitude, None)
+                    for recorded_at, latitude, longitude in islice(
+                        iter_track(cursor.fetchall(), start, end), limit
+                    )
+                ]
+            else:
+                cursor.execute(*track_query(tourist_id, start, end, limit))
+                rows = cursor.fetchall()
+
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Database error', 'message': str(e)}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    finally:
+        if connection:
+            connection.close()
+
+    with tracer.phase('serialize'):
+        response = {
+            'tourist_id': tourist_id,
+            'start': start.strftime('%Y-%m-%d %H:%M:%S'),
+            'end': end.strftime('%Y-%m-%d %H:%M:%S'),
+            'total_points': len(rows),
+            'truncated': len(rows) == limit,
+            'points': [
+                {
+                    'recorded_at': recorded_at.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'accuracy_m': accuracy
+                }
+                for recorded_at, latitude, longitude, accuracy in rows
+            ]
+        }
+        body = dumps(response)
+
+    return {
+        'statusCode': 200,
+        'body': body,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        }
+    }
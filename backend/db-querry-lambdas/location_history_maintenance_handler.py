@@ -0,0 +1,59 @@
+import json
+import os
+import pymysql
+from navrakshak.history import (
+    DEFAULT_DAYS_AHEAD, DEFAULT_RETENTION_DAYS, PARTITIONED_TABLES, maintain_partitions
+)
+from navrakshak.tracing import Tracer
+
+tracer = Tracer('location_history_maintenance')
+
+
+@tracer.handler
+def lambda_handler(event, context):
+    # Invoked daily by an EventBridge schedule; event contents are ignored
+    retention_days = int(os.environ.get('HISTORY_RETENTION_DAYS', DEFAULT_RETENTION_DAYS))
+    days_ahead = int(os.environ.get('HISTORY_DAYS_AHEAD', DEFAULT_DAYS_AHEAD))
+
+    # Get DB connection details from environment variables
+    db_host = os.environ['DB_HOST']
+    db_user = os.environ['DB_USER']
+    db_password = os.environ['DB_PASSWORD']
+    db_name = os.environ['DB_NAME']
+
+    connection = None
+    try:
+        with tracer.phase('connect'):
+            connection = pymysql.connect(
+                host=db_host,
+                user=db_user,
+                password=db_password,
+                database=db_name,
+                port=3306,
+                cursorclass=pymysql.cursors.DictCursor
+            )
+
+        with tracer.phase('partitions'):
+            result = {
+                table: maintain_partitions(
+                    connection, retention_days=retention_days, days_ahead=days_ahead, table=table
+                )
+                for table in PARTITIONED_TABLES
+            }
+
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Database error', 'message': str(e)}),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    finally:
+        if connection:
+            connection.close()
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'retention_days': retention_days, 'tables': result}),
+        'headers': {'Content-Type': 'application/json'}
+    }
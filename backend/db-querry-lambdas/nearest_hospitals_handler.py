@@ -2,13 +2,32 @@ import json
 import os
 import pymysql
 from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.facilities import GridCache
+from navrakshak.roads import load_graph, rank_by_travel_time
+from navrakshak.serialize import dumps
+from navrakshak.tracing import Tracer
 
+grid_cache = GridCache('hospitals', ttl=int(os.environ.get('FACILITY_GRID_TTL', 900)))
+
+# Optional offline road graph (e.g. shipped in a layer under /opt); loaded during cold start, not per request
+road_graph = load_graph(os.environ['ROAD_GRAPH_PATH']) if os.environ.get('ROAD_GRAPH_PATH') else None
+road_candidates = int(os.environ.get('ROAD_CANDIDATES', 5))
+road_budget = int(os.environ.get('ROAD_BUDGET_MS', 100)) / 1000
+
+tracer = Tracer('nearest_hospitals')
+
+@tracer.handler
+@compressed(tracer.phase)
 def lambda_handler(event, context):
     # Parse latitude and longitude from request body
     try:
         body = json.loads(event['body'])
         latitude = float(body['latitude'])
         longitude = float(body['longitude'])
+        rank_by = body.get('rank_by', os.environ.get('HOSPITAL_RANK_BY', 'distance'))
+        if rank_by not in ('distance', 'travel_time'):
+            raise ValueError(f'Unknown rank_by: {rank_by}')
     except (KeyError, TypeError, ValueError):
         return {
             'statusCode': 400,
@@ -24,9 +43,8 @@ def lambda_handler(event, context):
     db_password = os.environ['DB_PASSWORD']
     db_name = os.environ['DB_NAME']
     
-    connection = None
-    try:
-        connection = pymysql.connect(
+    def connect():
+        return pymysql.connect(
             host=db_host,
             user=db_user,
             password=db_password,
@@ -34,23 +52,48 @@ def lambda_handler(event, context):
             port=3306,
             cursorclass=pymysql.cursors.DictCursor
         )
-        
-        with connection.cursor() as cursor:
-            sql = """
-            SELECT id, name, address, phone, type, latitude, longitude, district, state, created_at,
-            ( 6371 * acos(
-                cos(radians(%s)) * cos(radians(latitude)) *
-                cos(radians(longitude) - radians(%s)) +
-                sin(radians(%s)) * sin(radians(latitude))
-            )) AS distance
-            FROM hospitals
-            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
-            ORDER BY distance
-            LIMIT 1;
-            """
-            cursor.execute(sql, (latitude, longitude, latitude))
-            result = cursor.fetchone()
-        
+
+    # Travel-time ranking re-orders the few nearest hospitals by straight line
+    by_road = rank_by == 'travel_time' and road_graph is not None
+    limit = road_candidates if by_road else 1
+
+    connection = None
+    try:
+        # The precomputed grid answers without a query; points it does not cover fall back to SQL
+        with tracer.phase('grid'):
+            grid = grid_cache.get(connect)
+            if grid and by_road:
+                candidates = grid.nearest_k(latitude, longitude, limit)
+            else:
+                found = grid.nearest(latitude, longitude) if grid else None
+                candidates = [found] if found else []
+        if not candidates:
+            with tracer.phase('connect'):
+                connection = connect()
+            with tracer.phase('query'), connection.cursor() as cursor:
+                sql = """
+                SELECT id, name, address, phone, type, latitude, longitude, district, state, created_at,
+                ( 6371 * acos(
+                    cos(radians(%s)) * cos(radians(latitude)) *
+                    cos(radians(longitude) - radians(%s)) +
+                    sin(radians(%s)) * sin(radians(latitude))
+                )) AS distance
+                FROM hospitals
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                ORDER BY distance
+                LIMIT %s;
+                """
+                cursor.execute(sql, (latitude, longitude, latitude, limit))
+                candidates = [(row, float(row['distance'])) for row in cursor.fetchall()]
+
+        travel_seconds = None
+        if by_road and candidates:
+            with tracer.phase('rank'):
+                row, distance, travel_seconds = rank_by_travel_time(road_graph, latitude, longitude,
+                                                                     candidates, road_budget)[0]
+            candidates = [(row, distance)]
+        result = dict(candidates[0][0], distance=candidates[0][1]) if candidates else None
+
         if result:
             # Convert Decimal objects to float and handle datetime for JSON serialization
             response = {
@@ -64,8 +107,12 @@ def lambda_handler(event, context):
                 'district': result['district'],
                 'state': result['state'],
                 'distance_km': float(result['distance']),
-                'created_at': result['created_at'].strftime('%Y-%m-%d %H:%M:%S') if result['created_at'] else None
+                'created_at': (result['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+                               if hasattr(result['created_at'], 'strftime') else result['created_at'])
             }
+            if rank_by == 'travel_time':
+                response['ranked_by'] = 'travel_time' if travel_seconds is not None else 'distance'
+                response['travel_time_min'] = round(travel_seconds / 60, 1) if travel_seconds is not None else None
         else:
             response = {
                 'message': 'No hospital found nearby'
@@ -85,9 +132,12 @@ def lambda_handler(event, context):
         if connection:
             connection.close()
     
+    with tracer.phase('serialize'):
+        body = dumps(response)
+
     return {
         'statusCode': 200,
-        'body': json.dumps(response),
+        'body': body,
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
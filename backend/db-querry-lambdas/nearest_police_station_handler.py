@@ -1,8 +1,16 @@
 import json
 import os
 import pymysql
+from navrakshak.compression import compressed
+from navrakshak.facilities import GridCache
+from navrakshak.serialize import dumps
+from navrakshak.tracing import Tracer
 
+grid_cache = GridCache('police_stations', ttl=int(os.environ.get('FACILITY_GRID_TTL', 900)))
+tracer = Tracer('nearest_police_station')
 
+@tracer.handler
+@compressed(tracer.phase)
 def lambda_handler(event, context):
     # Parse latitude and longitude from request body
     try:
@@ -22,9 +30,8 @@ def lambda_handler(event, context):
     db_password = os.environ['DB_PASSWORD']
     db_name = os.environ['DB_NAME']
     
-    connection = None
-    try:
-        connection = pymysql.connect(
+    def connect():
+        return pymysql.connect(
             host=db_host,
             user=db_user,
             password=db_password,
@@ -32,21 +39,32 @@ def lambda_handler(event, context):
             port=3306,
             cursorclass=pymysql.cursors.DictCursor
         )
-        
-        with connection.cursor() as cursor:
-            sql = """
-            SELECT id, name, address, state, latitude, longitude,
-            ( 6371 * acos(
-                cos(radians(%s)) * cos(radians(latitude)) *
-                cos(radians(longitude) - radians(%s)) +
-                sin(radians(%s)) * sin(radians(latitude))
-            )) AS distance
-            FROM police_stations
-            ORDER BY distance
-            LIMIT 1;
-            """
-            cursor.execute(sql, (latitude, longitude, latitude))
-            result = cursor.fetchone()
+
+    connection = None
+    try:
+        # The precomputed grid answers without a query; points it does not cover fall back to SQL
+        with tracer.phase('grid'):
+            grid = grid_cache.get(connect)
+            found = grid.nearest(latitude, longitude) if grid else None
+        if found:
+            result = dict(found[0], distance=found[1])
+        else:
+            with tracer.phase('connect'):
+                connection = connect()
+            with tracer.phase('query'), connection.cursor() as cursor:
+                sql = """
+                SELECT id, name, address, state, latitude, longitude,
+                ( 6371 * acos(
+                    cos(radians(%s)) * cos(radians(latitude)) *
+                    cos(radians(longitude) - radians(%s)) +
+                    sin(radians(%s)) * sin(radians(latitude))
+                )) AS distance
+                FROM police_stations
+                ORDER BY distance
+                LIMIT 1;
+                """
+                cursor.execute(sql, (latitude, longitude, latitude))
+                result = cursor.fetchone()
         
         if result:
             # Convert Decimal objects to float for JSON serialization
@@ -73,9 +91,12 @@ def lambda_handler(event, context):
         if connection:
             connection.close()
     
+    with tracer.phase('serialize'):
+        body = dumps(response)
+
     return {
         'statusCode': 200,
-        'body': json.dumps(response),
+        'body': body,
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
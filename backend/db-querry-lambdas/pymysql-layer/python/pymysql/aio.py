@@ -0,0 +1,821 @@
+"""
+asyncio transport for the MySQL client-server protocol.
+
+:class:`AsyncConnection` drives the same protocol code as
+:class:`~pymysql.connections.Connection` (``protocol.MysqlPacket``,
+``_auth`` scrambles, ``converters``, ``MySQLResult`` parsing) but does its
+socket I/O through ``asyncio.StreamReader``/``StreamWriter``, so a single
+event loop can multiplex many in-flight queries.
+
+Each response is first read asynchronously into a packet buffer; the
+unchanged synchronous result parser then consumes that buffer.  Cursors
+are therefore always buffered: ``execute()`` and ``nextset()`` are
+coroutines while the ``fetch*()`` methods stay synchronous.
+
+Usage::
+
+    pool = await pymysql.aio.create_pool(host=..., user=..., maxsize=50)
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT 1")
+            print(cur.fetchone())
+    await pool.close()
+"""
+
+import asyncio
+import collections
+import struct
+import time
+
+from . import _auth, err
+from .charset import charset_by_name
+from .connections import Connection, MySQLResult, MAX_PACKET_LEN, DEBUG
+from .constants import CLIENT, COMMAND, CR, SERVER_STATUS
+from .cursors import Cursor, DictCursorMixin, RE_INSERT_VALUES
+from .protocol import MysqlPacket, OKPacketWrapper, dump_packet
+
+
+class AsyncCursor(Cursor):
+    """Buffered cursor for :class:`AsyncConnection`.
+
+    ``execute()``, ``executemany()``, ``nextset()`` and ``close()`` are
+    coroutines. Rows are fully read before ``execute()`` returns, so the
+    ``fetch*()`` methods are regular synchronous calls.
+    """
+
+    async def close(self):
+        conn = self.connection
+        if conn is None:
+            return
+        try:
+            while await self.nextset():
+                pass
+        finally:
+            self.connection = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        del exc_info
+        await self.close()
+
+    async def _nextset(self, unbuffered=False):
+        conn = self._get_db()
+        current_result = self._result
+        if current_result is None or current_result is not conn._result:
+            return None
+        if not current_result.has_next:
+            return None
+        self._result = None
+        self._clear_result()
+        await conn.next_result()
+        self._do_get_result()
+        return True
+
+    async def nextset(self):
+        return await self._nextset(False)
+
+    async def execute(self, query, args=None):
+        """Execute a query. See :meth:`Cursor.execute`."""
+        while await self.nextset():
+            pass
+
+        query = self.mogrify(query, args)
+
+        result = await self._query(query)
+        self._executed = query
+        return result
+
+    async def executemany(self, query, args):
+        """Run several data against one query. See :meth:`Cursor.executemany`."""
+        if not args:
+            return
+
+        m = RE_INSERT_VALUES.match(query)
+        if m:
+            q_prefix = m.group(1) % ()
+            q_values = m.group(2).rstrip()
+            q_postfix = m.group(3) or ""
+            assert q_values[0] == "(" and q_values[-1] == ")"
+            return await self._do_execute_many(
+                q_prefix,
+                q_values,
+                q_postfix,
+                args,
+                self.max_stmt_length,
+                self._get_db().encoding,
+            )
+
+        rows = 0
+        for arg in args:
+            rows += await self.execute(query, arg)
+        self.rowcount = rows
+        return rows
+
+    async def _do_execute_many(
+        self, prefix, values, postfix, args, max_stmt_length, encoding
+    ):
+        conn = self._get_db()
+        escape = self._escape_args
+        if isinstance(prefix, str):
+            prefix = prefix.encode(encoding)
+        if isinstance(postfix, str):
+            postfix = postfix.encode(encoding)
+        sql = bytearray(prefix)
+        args = iter(args)
+        v = values % escape(next(args), conn)
+        if isinstance(v, str):
+            v = v.encode(encoding, "surrogateescape")
+        sql += v
+        rows = 0
+        for arg in args:
+            v = values % escape(arg, conn)
+            if isinstance(v, str):
+                v = v.encode(encoding, "surrogateescape")
+            if len(sql) + len(v) + len(postfix) + 1 > max_stmt_length:
+                rows += await self.execute(sql + postfix)
+                sql = bytearray(prefix)
+            else:
+                sql += b","
+            sql += v
+        rows += await self.execute(sql + postfix)
+        self.rowcount = rows
+        return rows
+
+    async def callproc(self, procname, args=()):
+        raise err.NotSupportedError("callproc is not supported by AsyncCursor")
+
+    async def _query(self, q):
+        conn = self._get_db()
+        self._clear_result()
+        await conn.query(q)
+        self._do_get_result()
+        return self.rowcount
+
+
+class AsyncDictCursor(DictCursorMixin, AsyncCursor):
+    """An asyncio cursor which returns results as a dictionary"""
+
+
+class AsyncConnection(Connection):
+    """
+    asyncio variant of :class:`~pymysql.connections.Connection`.
+
+    Accepts the same keyword arguments, except that ``local_infile``,
+    ``compress`` and ``named_pipe`` are not supported. The connection is
+    never opened in the constructor; use :func:`connect` or
+    ``await conn.connect()``.
+
+    All methods that talk to the server are coroutines. A connection must
+    not be shared by concurrent tasks; use a :class:`Pool` instead.
+    """
+
+    _reader = None
+    _writer = None
+    _packets = ()
+
+    def __init__(self, **kwargs):
+        for option in ("local_infile", "compress"):
+            if kwargs.get(option):
+                raise err.NotSupportedError(
+                    f"{option} is not supported by AsyncConnection"
+                )
+        kwargs["defer_connect"] = True
+        kwargs.setdefault("cursorclass", AsyncCursor)
+        super().__init__(**kwargs)
+        # Raw packet payloads read ahead of the synchronous parser.
+        self._packets = collections.deque()
+        self._last_used = time.monotonic()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        del exc_info
+        await self.close()
+
+    async def connect(self, sock=None):
+        if sock is not None:
+            raise err.NotSupportedError("AsyncConnection opens its own stream")
+        self._closed = False
+        try:
+            if self.unix_socket:
+                opener = asyncio.open_unix_connection(self.unix_socket)
+                self.host_info = "Localhost via UNIX socket"
+                self._secure = True
+            else:
+                kwargs = {}
+                if self.bind_address is not None:
+                    kwargs["local_addr"] = (self.bind_address, 0)
+                opener = asyncio.open_connection(self.host, self.port, **kwargs)
+                self.host_info = "socket %s:%d" % (self.host, self.port)
+            self._reader, self._writer = await asyncio.wait_for(
+                opener, self.connect_timeout
+            )
+            self._sock = self._writer
+            self._next_seq_id = 0
+            self._packets.clear()
+
+            self._packets.append(await self._read_raw_packet())
+            self._get_server_information()
+            await self._request_authentication_async()
+
+            await self.set_character_set(self.charset, self.collation)
+
+            if self.sql_mode is not None:
+                await self.query(
+                    "SET sql_mode=%s" % self.escape(self.sql_mode)
+                )
+
+            if self.init_command is not None:
+                await self.query(self.init_command)
+
+            if self.autocommit_mode is not None:
+                await self.autocommit(self.autocommit_mode)
+        except BaseException as e:
+            self._force_close()
+
+            if isinstance(e, (OSError, IOError, asyncio.TimeoutError)):
+                exc = err.OperationalError(
+                    CR.CR_CONN_HOST_ERROR,
+                    f"Can't connect to MySQL server on {self.host!r} ({e!r})",
+                )
+                exc.original_exception = e
+                raise exc
+            raise
+        self._last_used = time.monotonic()
+
+    async def close(self):
+        """Send the quit message and close the stream.
+
+        :raise Error: If the connection is already closed.
+        """
+        if self._closed:
+            raise err.Error("Already closed")
+        self._closed = True
+        if self._writer is None:
+            return
+        writer = self._writer
+        try:
+            self._write_bytes(struct.pack("<iB", 1, COMMAND.COM_QUIT))
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            self._force_close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    def _force_close(self):
+        """Close the stream without QUIT message."""
+        if self._writer is not None:
+            self._writer.close()
+        self._sock = None
+        self._reader = None
+        self._writer = None
+        if self._packets:
+            self._packets.clear()
+
+    __del__ = _force_close
+
+    # Reading: the network side is async, the parser side replays buffered packets.
+
+    async def _read_bytes_async(self, num_bytes):
+        try:
+            if self._read_timeout is None:
+                return await self._reader.readexactly(num_bytes)
+            return await asyncio.wait_for(
+                self._reader.readexactly(num_bytes), self._read_timeout
+            )
+        except (asyncio.IncompleteReadError, OSError, asyncio.TimeoutError) as e:
+            self._force_close()
+            raise err.OperationalError(
+                CR.CR_SERVER_LOST,
+                f"Lost connection to MySQL server during query ({e!r})",
+            )
+        except BaseException:
+            # Don't convert unknown exception (e.g. cancellation) to MySQLError.
+            self._force_close()
+            raise
+
+    async def _read_raw_packet(self):
+        """Read one logical packet payload from the stream.
+
+        :raise OperationalError: If the connection to the MySQL server is lost.
+        :raise InternalError: If the packet sequence number is wrong.
+        """
+        if self._reader is None:
+            raise err.InterfaceError(0, "")
+        buff = bytearray()
+        while True:
+            packet_header = await self._read_bytes_async(4)
+            btrl, btrh, packet_number = struct.unpack("<HBB", packet_header)
+            bytes_to_read = btrl + (btrh << 16)
+            if packet_number != self._next_seq_id:
+                self._force_close()
+                if packet_number == 0:
+                    # MariaDB sends error packet with seqno==0 when shutdown
+                    raise err.OperationalError(
+                        CR.CR_SERVER_LOST,
+                        "Lost connection to MySQL server during query",
+                    )
+                raise err.InternalError(
+                    "Packet sequence number wrong - got %d expected %d"
+                    % (packet_number, self._next_seq_id)
+                )
+            self._next_seq_id = (self._next_seq_id + 1) % 256
+
+            buff += await self._read_bytes_async(bytes_to_read)
+            if bytes_to_read < MAX_PACKET_LEN:
+                break
+        data = bytes(buff)
+        if DEBUG:
+            dump_packet(data)
+        if data[:1] == b"\xff":
+            self._packets.clear()
+            MysqlPacket(data, self.encoding).raise_for_error()
+        return data
+
+    async def _read_packet_async(self, packet_type=MysqlPacket):
+        return packet_type(await self._read_raw_packet(), self.encoding)
+
+    def _read_packet(self, packet_type=MysqlPacket):
+        """Return the next packet read ahead by the async side."""
+        try:
+            data = self._packets.popleft()
+        except IndexError:
+            raise err.InternalError("No packet buffered for the result parser")
+        return packet_type(data, self.encoding)
+
+    async def _read_result_packets(self):
+        """Buffer every packet of the next result (OK or full result set)."""
+        first = await self._read_raw_packet()
+        self._packets.append(first)
+        if first[0] == 0 or first[0] == 0xFB:
+            return
+        field_count = MysqlPacket(first, self.encoding).read_length_encoded_integer()
+        # column definitions followed by an EOF packet
+        for _ in range(field_count + 1):
+            self._packets.append(await self._read_raw_packet())
+        while True:
+            packet = await self._read_raw_packet()
+            self._packets.append(packet)
+            if packet[0] == 0xFE and len(packet) < 9:
+                break
+
+    # Writing is buffered in the StreamWriter and flushed with drain().
+
+    def _write_bytes(self, data):
+        if self._writer is None:
+            raise err.InterfaceError(0, "")
+        self._writer.write(data)
+
+    async def _drain(self):
+        try:
+            if self._write_timeout is None:
+                await self._writer.drain()
+            else:
+                await asyncio.wait_for(self._writer.drain(), self._write_timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            self._force_close()
+            raise err.OperationalError(
+                CR.CR_SERVER_GONE_ERROR, f"MySQL server has gone away ({e!r})"
+            )
+
+    async def _roundtrip(self, data):
+        self.write_packet(data)
+        await self._drain()
+        return await self._read_packet_async()
+
+    async def _execute_command_async(self, command, sql):
+        # Finish any remaining result sets before sending a new command.
+        if self._result is not None:
+            while self._result.has_next:
+                await self.next_result()
+            self._result = None
+        self._execute_command(command, sql)
+        await self._drain()
+
+    async def _read_query_result_async(self):
+        self._result = None
+        await self._read_result_packets()
+        result = MySQLResult(self)
+        result.read()
+        self._result = result
+        if result.server_status is not None:
+            self.server_status = result.server_status
+        self._last_used = time.monotonic()
+        return result.affected_rows
+
+    async def _read_ok_packet_async(self):
+        pkt = await self._read_packet_async()
+        if not pkt.is_ok_packet():
+            raise err.OperationalError(
+                CR.CR_COMMANDS_OUT_OF_SYNC,
+                "Command Out of Sync",
+            )
+        ok = OKPacketWrapper(pkt)
+        self.server_status = ok.server_status
+        self._last_used = time.monotonic()
+        return ok
+
+    # Public API (coroutines)
+
+    async def query(self, sql, unbuffered=False):
+        if unbuffered:
+            raise err.NotSupportedError("AsyncConnection only supports buffered results")
+        if isinstance(sql, str):
+            sql = sql.encode(self.encoding, "surrogateescape")
+        await self._execute_command_async(COMMAND.COM_QUERY, sql)
+        self._affected_rows = await self._read_query_result_async()
+        return self._affected_rows
+
+    async def next_result(self, unbuffered=False):
+        self._affected_rows = await self._read_query_result_async()
+        return self._affected_rows
+
+    async def _simple_command(self, command, arg=""):
+        await self._execute_command_async(command, arg)
+        return await self._read_ok_packet_async()
+
+    async def autocommit(self, value):
+        self.autocommit_mode = bool(value)
+        current = self.get_autocommit()
+        if value != current:
+            await self._simple_command(
+                COMMAND.COM_QUERY,
+                "SET AUTOCOMMIT = %s" % self.escape(self.autocommit_mode),
+            )
+
+    async def begin(self):
+        """Begin transaction."""
+        await self._simple_command(COMMAND.COM_QUERY, "BEGIN")
+
+    async def commit(self):
+        """Commit changes to stable storage."""
+        await self._simple_command(COMMAND.COM_QUERY, "COMMIT")
+
+    async def rollback(self):
+        """Roll back the current transaction."""
+        await self._simple_command(COMMAND.COM_QUERY, "ROLLBACK")
+
+    async def select_db(self, db):
+        """Set current db."""
+        await self._simple_command(COMMAND.COM_INIT_DB, db)
+
+    async def show_warnings(self):
+        """Send the "SHOW WARNINGS" SQL command."""
+        await self.query("SHOW WARNINGS")
+        return self._result.rows
+
+    async def kill(self, thread_id):
+        if not isinstance(thread_id, int):
+            raise TypeError("thread_id must be an integer")
+        await self.query(f"KILL {thread_id:d}")
+
+    async def ping(self, reconnect=True):
+        """Check if the server is alive, reconnecting if asked to."""
+        if self._writer is None:
+            if reconnect:
+                await self.connect()
+                reconnect = False
+            else:
+                raise err.Error("Already closed")
+        try:
+            await self._simple_command(COMMAND.COM_PING)
+        except Exception:
+            if reconnect:
+                await self.connect()
+                await self.ping(False)
+            else:
+                raise
+
+    async def set_character_set(self, charset, collation=None):
+        """Send "SET NAMES charset [COLLATE collation]" query."""
+        encoding = charset_by_name(charset).encoding
+
+        if collation:
+            query = f"SET NAMES {charset} COLLATE {collation}"
+        else:
+            query = f"SET NAMES {charset}"
+        await self._execute_command_async(COMMAND.COM_QUERY, query)
+        await self._read_packet_async()
+        self.charset = charset
+        self.encoding = encoding
+        self.collation = collation
+
+    async def query_batch(self, statements, cursor=None):
+        """Run several statements in one round trip. See :meth:`Connection.query_batch`."""
+        if not self.client_flag & CLIENT.MULTI_STATEMENTS:
+            raise err.ProgrammingError(
+                "query_batch() requires client_flag=CLIENT.MULTI_STATEMENTS"
+            )
+        cur = self.cursor(cursor)
+        try:
+            sql = ";\n".join(
+                cur.mogrify(*stmt) if isinstance(stmt, (tuple, list)) else stmt
+                for stmt in statements
+            )
+            await cur.execute(sql)
+            results = [cur.fetchall()]
+            while await cur.nextset():
+                results.append(cur.fetchall())
+        finally:
+            await cur.close()
+        return results
+
+    @property
+    def in_transaction(self):
+        return bool(self.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+
+    # Authentication
+
+    async def _request_authentication_async(self):
+        data_init = self._handshake_response_init()
+
+        if self.ssl and self.server_capabilities & CLIENT.SSL:
+            self.write_packet(data_init)
+            await self._drain()
+            if not hasattr(self._writer, "start_tls"):
+                raise err.NotSupportedError("TLS on AsyncConnection needs Python 3.11+")
+            await self._writer.start_tls(self.ctx, server_hostname=self.host)
+            self._secure = True
+
+        auth_packet = await self._roundtrip(self._handshake_response(data_init))
+
+        if auth_packet.is_auth_switch_request():
+            # https://dev.mysql.com/doc/internals/en/connection-phase-packets.html#packet-Protocol::AuthSwitchRequest
+            auth_packet.read_uint8()  # 0xfe packet identifier
+            plugin_name = auth_packet.read_string()
+            if (
+                self.server_capabilities & CLIENT.PLUGIN_AUTH
+                and plugin_name is not None
+            ):
+                auth_packet = await self._process_auth_async(plugin_name, auth_packet)
+            else:
+                raise err.OperationalError("received unknown auth switch request")
+        elif auth_packet.is_extra_auth_data():
+            if self._auth_plugin_name == "caching_sha2_password":
+                auth_packet = await self._caching_sha2_password_auth(auth_packet)
+            elif self._auth_plugin_name == "sha256_password":
+                auth_packet = await self._sha256_password_auth(auth_packet)
+            else:
+                raise err.OperationalError(
+                    "Received extra packet for auth method %r", self._auth_plugin_name
+                )
+
+    async def _process_auth_async(self, plugin_name, auth_packet):
+        if plugin_name == b"caching_sha2_password":
+            return await self._caching_sha2_password_auth(auth_packet)
+        elif plugin_name == b"sha256_password":
+            return await self._sha256_password_auth(auth_packet)
+        elif plugin_name == b"mysql_native_password":
+            data = _auth.scramble_native_password(self.password, auth_packet.read_all())
+        elif plugin_name == b"client_ed25519":
+            data = _auth.ed25519_password(self.password, auth_packet.read_all())
+        elif plugin_name == b"mysql_clear_password":
+            data = self.password + b"\0"
+        else:
+            raise err.OperationalError(
+                CR.CR_AUTH_PLUGIN_CANNOT_LOAD,
+                "Authentication plugin '%s' not supported by AsyncConnection"
+                % plugin_name,
+            )
+        return await self._roundtrip(data)
+
+    def _take_salt(self, pkt):
+        self.salt = pkt.read_all()
+        if self.salt.endswith(b"\0"):
+            self.salt = self.salt[:-1]
+
+    async def _sha256_password_auth(self, pkt):
+        # Mirrors _auth.sha256_password_auth with async round trips.
+        if self._secure:
+            return await self._roundtrip(self.password + b"\0")
+
+        if pkt.is_auth_switch_request():
+            self._take_salt(pkt)
+            if not self.server_public_key and self.password:
+                pkt = await self._roundtrip(b"\1")
+
+        if pkt.is_extra_auth_data():
+            self.server_public_key = pkt._data[1:]
+
+        if self.password:
+            if not self.server_public_key:
+                raise err.OperationalError("Couldn't receive server's public key")
+            data = _auth.sha2_rsa_encrypt(
+                self.password, self.salt, self.server_public_key
+            )
+        else:
+            data = b""
+
+        return await self._roundtrip(data)
+
+    async def _caching_sha2_password_auth(self, pkt):
+        # Mirrors _auth.caching_sha2_password_auth with async round trips.
+        if not self.password:
+            return await self._roundtrip(b"")
+
+        if pkt.is_auth_switch_request():
+            self._take_salt(pkt)
+            pkt = await self._roundtrip(
+                _auth.scramble_caching_sha2(self.password, self.salt)
+            )
+
+        if not pkt.is_extra_auth_data():
+            raise err.OperationalError(
+                "caching sha2: Unknown packet for fast auth: %s" % pkt._data[:1]
+            )
+
+        # 3 - fast auth succeeded, 4 - need full auth
+        pkt.advance(1)
+        n = pkt.read_uint8()
+
+        if n == 3:
+            return await self._read_packet_async()
+
+        if n != 4:
+            raise err.OperationalError(
+                "caching sha2: Unknown result for fast auth: %s" % n
+            )
+
+        if self._secure:
+            return await self._roundtrip(self.password + b"\0")
+
+        if not self.server_public_key:
+            pkt = await self._roundtrip(b"\x02")  # Request public key
+            if not pkt.is_extra_auth_data():
+                raise err.OperationalError(
+                    "caching sha2: Unknown packet for public key: %s" % pkt._data[:1]
+                )
+            self.server_public_key = pkt._data[1:]
+
+        data = _auth.sha2_rsa_encrypt(self.password, self.salt, self.server_public_key)
+        return await self._roundtrip(data)
+
+
+async def connect(**kwargs):
+    """Open and return an :class:`AsyncConnection`."""
+    conn = AsyncConnection(**kwargs)
+    await conn.connect()
+    return conn
+
+
+class _PoolConnectionContext:
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    async def __aenter__(self):
+        self._conn = await self._pool.acquire()
+        return self._conn
+
+    async def __aexit__(self, *exc_info):
+        del exc_info
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+
+class Pool:
+    """
+    A pool of :class:`AsyncConnection` objects.
+
+    :param minsize: Connections opened by :func:`create_pool`. (default: 1)
+    :param maxsize: Upper bound of open connections; further ``acquire()``
+        calls wait for a release. (default: 10)
+    :param pool_recycle: Seconds after which an idle connection is replaced
+        instead of reused. -1 disables recycling. (default: -1)
+
+    Any other keyword argument is passed to :class:`AsyncConnection`.
+    """
+
+    def __init__(self, minsize=1, maxsize=10, pool_recycle=-1, **conn_kwargs):
+        if minsize < 0 or maxsize < 1 or minsize > maxsize:
+            raise ValueError("need 0 <= minsize <= maxsize and maxsize >= 1")
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.pool_recycle = pool_recycle
+        self._conn_kwargs = conn_kwargs
+        self._free = collections.deque()
+        self._used = set()
+        self._size = 0  # open plus connecting
+        self._cond = asyncio.Condition()
+        self._closed = False
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def freesize(self):
+        return len(self._free)
+
+    async def fill(self):
+        """Open connections until ``minsize`` are available."""
+        missing = self.minsize - self._size
+        if missing <= 0:
+            return
+        self._size += missing
+        results = await asyncio.gather(
+            *(connect(**self._conn_kwargs) for _ in range(missing)),
+            return_exceptions=True,
+        )
+        async with self._cond:
+            for conn in results:
+                if isinstance(conn, BaseException):
+                    self._size -= 1
+                else:
+                    self._free.append(conn)
+            self._cond.notify_all()
+        for conn in results:
+            if isinstance(conn, BaseException):
+                raise conn
+
+    def _is_stale(self, conn):
+        if not conn.open:
+            return True
+        return (
+            self.pool_recycle > -1
+            and time.monotonic() - conn._last_used > self.pool_recycle
+        )
+
+    async def acquire(self):
+        """Return a free connection, opening one if under ``maxsize``."""
+        async with self._cond:
+            while True:
+                if self._closed:
+                    raise err.InterfaceError(0, "Pool is closed")
+                while self._free:
+                    conn = self._free.popleft()
+                    if self._is_stale(conn):
+                        self._size -= 1
+                        conn._force_close()
+                        continue
+                    self._used.add(conn)
+                    return conn
+                if self._size < self.maxsize:
+                    self._size += 1
+                    break
+                await self._cond.wait()
+
+        try:
+            conn = await connect(**self._conn_kwargs)
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._used.add(conn)
+        return conn
+
+    async def release(self, conn):
+        """Return *conn* to the pool.
+
+        Connections left inside a transaction are rolled back; broken ones
+        are dropped.
+        """
+        self._used.discard(conn)
+        keep = conn.open and not self._closed
+        if keep and (conn.in_transaction or conn._result is not None and conn._result.has_next):
+            try:
+                while conn._result is not None and conn._result.has_next:
+                    await conn.next_result()
+                if conn.in_transaction:
+                    await conn.rollback()
+            except err.MySQLError:
+                keep = False
+        async with self._cond:
+            if keep:
+                self._free.append(conn)
+            else:
+                self._size -= 1
+                conn._force_close()
+            self._cond.notify()
+
+    def connection(self):
+        """``async with pool.connection() as conn:`` acquire/release helper."""
+        return _PoolConnectionContext(self)
+
+    async def close(self):
+        """Close free connections; in-use ones are closed on release."""
+        async with self._cond:
+            self._closed = True
+            free, self._free = list(self._free), collections.deque()
+            self._size -= len(free)
+            self._cond.notify_all()
+        for conn in free:
+            try:
+                await conn.close()
+            except err.MySQLError:
+                pass
+
+
+async def create_pool(minsize=1, maxsize=10, pool_recycle=-1, **conn_kwargs):
+    """Create a :class:`Pool` and open ``minsize`` connections."""
+    pool = Pool(minsize, maxsize, pool_recycle, **conn_kwargs)
+    await pool.fill()
+    return pool
@@ -7,8 +7,10 @@ import os
 import socket
 import struct
 import sys
+import time
 import traceback
 import warnings
+import zlib
 
 from . import _auth
 
@@ -25,7 +27,7 @@ from .protocol import (
     EOFPacketWrapper,
     LoadLocalPacketWrapper,
 )
-from . import err, VERSION_STRING
+from . import err, profiling, VERSION_STRING
 
 try:
     import ssl
@@ -154,7 +156,13 @@ class Connection:
         (if no authenticate method) for returning a string from the user. (experimental)
     :param server_public_key: SHA256 authentication plugin public key value. (default: None)
     :param binary_prefix: Add _binary prefix on bytes and bytearray. (default: False)
-    :param compress: Not supported.
+    :param compress: Use the compressed protocol (CLIENT.COMPRESS) if the server
+        supports it. Outgoing packets shorter than ``min_compress_length`` are sent
+        uncompressed. Worth enabling for large result sets over slow links;
+        it costs CPU on both ends. (default: False)
+    :param profiler: :class:`~pymysql.profiling.Profiler` receiving a profile of
+        every query. (default: the one installed with :func:`pymysql.profiling.enable`,
+        usually None)
     :param named_pipe: Not supported.
     :param db: **DEPRECATED** Alias for database.
     :param passwd: **DEPRECATED** Alias for password.
@@ -168,6 +176,12 @@ class Connection:
     _auth_plugin_name = ""
     _closed = False
     _secure = False
+    _compress = False
+    _profile = None
+
+    #: Outgoing payloads shorter than this are not worth compressing.
+    #: Only used with ``compress=True``; the server applies its own threshold.
+    min_compress_length = 50
 
     def __init__(
         self,
@@ -208,7 +222,8 @@ class Connection:
         ssl_key_password=None,
         ssl_verify_cert=None,
         ssl_verify_identity=None,
-        compress=None,  # not supported
+        compress=None,
+        profiler=None,
         named_pipe=None,  # not supported
         passwd=None,  # deprecated
         db=None,  # deprecated
@@ -226,10 +241,10 @@ class Connection:
             # )
             password = passwd
 
-        if compress or named_pipe:
-            raise NotImplementedError(
-                "compress and named_pipe arguments are not supported"
-            )
+        if named_pipe:
+            raise NotImplementedError("named_pipe argument is not supported")
+        self._compress_requested = bool(compress)
+        self.profiler = profiler if profiler is not None else profiling.profiler
 
         self._local_infile = bool(local_infile)
         if self._local_infile:
@@ -426,6 +441,7 @@ class Connection:
         if self._sock is None:
             return
         send_data = struct.pack("<iB", 1, COMMAND.COM_QUIT)
+        self._next_comp_seq_id = 0
         try:
             self._write_bytes(send_data)
         except Exception:
@@ -449,6 +465,7 @@ class Connection:
                 pass
         self._sock = None
         self._rfile = None
+        self._compress = False
 
     __del__ = _force_close
 
@@ -565,6 +582,40 @@ class Connection:
             return cursor(self)
         return self.cursorclass(self)
 
+    def query_batch(self, statements, cursor=None):
+        """
+        Run several statements in a single round trip and return all result sets.
+
+        The statements are escaped client-side, joined with ``;`` and sent as one
+        COM_QUERY; every result set is then read back through ``Cursor.nextset()``.
+        The connection must be opened with ``client_flag=CLIENT.MULTI_STATEMENTS``.
+
+        :param statements: Sequence of ``(query, args)`` pairs or plain query strings.
+        :param cursor: The type of cursor used to read the results. None means
+            use the connection's cursorclass.
+        :return: One ``fetchall()`` result per statement, in order.
+        :rtype: list
+
+        :raise ProgrammingError: If multi statements are not enabled.
+        """
+        if not self.client_flag & CLIENT.MULTI_STATEMENTS:
+            raise err.ProgrammingError(
+                "query_batch() requires client_flag=CLIENT.MULTI_STATEMENTS"
+            )
+        cur = self.cursor(cursor)
+        try:
+            sql = ";\n".join(
+                cur.mogrify(*stmt) if isinstance(stmt, (tuple, list)) else stmt
+                for stmt in statements
+            )
+            cur.execute(sql)
+            results = [cur.fetchall()]
+            while cur.nextset():
+                results.append(cur.fetchall())
+        finally:
+            cur.close()
+        return results
+
     # The following methods are INTERNAL USE ONLY (called from Cursor)
     def query(self, sql, unbuffered=False):
         # if DEBUG:
@@ -676,10 +727,18 @@ class Connection:
             self._sock = sock
             self._rfile = sock.makefile("rb")
             self._next_seq_id = 0
+            self._compress = False
 
             self._get_server_information()
             self._request_authentication()
 
+            # Compression starts right after the authentication OK packet.
+            if self.client_flag & CLIENT.COMPRESS:
+                self._compress = True
+                self._next_comp_seq_id = 0
+                self._comp_rbuf = bytearray()
+                self._comp_rpos = 0
+
             # Send "SET NAMES" query on init for:
             # - Ensure charaset (and collation) is set to the server.
             #   - collation_id in handshake packet may be ignored.
@@ -753,6 +812,12 @@ class Connection:
 
             btrl, btrh, packet_number = struct.unpack("<HBB", packet_header)
             bytes_to_read = btrl + (btrh << 16)
+            if packet_number != self._next_seq_id and self._compress:
+                # The server resets its packet number to the compressed sequence
+                # number whenever it flushes a compressed packet, so inside
+                # compressed frames the numbering restarts mid-result. The
+                # compressed sequence is still checked in _read_compressed_frame().
+                self._next_seq_id = packet_number
             if packet_number != self._next_seq_id:
                 self._force_close()
                 if packet_number == 0:
@@ -783,6 +848,41 @@ class Connection:
         return packet
 
     def _read_bytes(self, num_bytes):
+        if self._compress:
+            return self._read_compressed_bytes(num_bytes)
+        return self._read_raw_bytes(num_bytes)
+
+    def _read_compressed_bytes(self, num_bytes):
+        """Return *num_bytes* of decompressed payload, reading frames as needed."""
+        buf = self._comp_rbuf
+        pos = self._comp_rpos
+        while len(buf) - pos < num_bytes:
+            if pos:
+                del buf[:pos]
+                pos = 0
+            buf += self._read_compressed_frame()
+        self._comp_rpos = pos + num_bytes
+        return bytes(buf[pos : pos + num_bytes])
+
+    def _read_compressed_frame(self):
+        # https://dev.mysql.com/doc/dev/mysql-server/latest/page_protocol_basic_compression_packet.html
+        header = self._read_raw_bytes(7)
+        comp_len = header[0] | header[1] << 8 | header[2] << 16
+        seq_id = header[3]
+        uncomp_len = header[4] | header[5] << 8 | header[6] << 16
+        if seq_id != self._next_comp_seq_id:
+            self._force_close()
+            raise err.InternalError(
+                "Compressed packet sequence number wrong - got %d expected %d"
+                % (seq_id, self._next_comp_seq_id)
+            )
+        self._next_comp_seq_id = (seq_id + 1) % 256
+        payload = self._read_raw_bytes(comp_len)
+        if uncomp_len:
+            payload = zlib.decompress(payload)
+        return payload
+
+    def _read_raw_bytes(self, num_bytes):
         self._sock.settimeout(self._read_timeout)
         while True:
             try:
@@ -808,6 +908,31 @@ class Connection:
         return data
 
     def _write_bytes(self, data):
+        if self._compress:
+            data = self._compress_frames(data)
+        self._write_raw_bytes(data)
+
+    def _compress_frames(self, data):
+        """Wrap *data* in compressed protocol frames."""
+        frames = []
+        for start in range(0, len(data), MAX_PACKET_LEN):
+            chunk = data[start : start + MAX_PACKET_LEN]
+            uncomp_len = 0
+            if len(chunk) >= self.min_compress_length:
+                compressed = zlib.compress(chunk)
+                if len(compressed) < len(chunk):
+                    uncomp_len = len(chunk)
+                    chunk = compressed
+            frames.append(
+                _pack_int24(len(chunk))
+                + bytes([self._next_comp_seq_id])
+                + _pack_int24(uncomp_len)
+            )
+            frames.append(chunk)
+            self._next_comp_seq_id = (self._next_comp_seq_id + 1) % 256
+        return b"".join(frames)
+
+    def _write_raw_bytes(self, data):
         self._sock.settimeout(self._write_timeout)
         try:
             self._sock.sendall(data)
@@ -819,7 +944,10 @@ class Connection:
 
     def _read_query_result(self, unbuffered=False):
         self._result = None
-        result = MySQLResult(self)
+        if self._profile is None:
+            result = MySQLResult(self)
+        else:
+            result = ProfiledResult(self, self._profile)
         if unbuffered:
             result.init_unbuffered_query()
         else:
@@ -856,6 +984,9 @@ class Connection:
         if isinstance(sql, str):
             sql = sql.encode(self.encoding)
 
+        # Both sequence numbers restart with every command.
+        self._next_comp_seq_id = 0
+
         packet_size = min(MAX_PACKET_LEN, len(sql) + 1)  # +1 is for command
 
         # tiny optimization: build first packet manually instead of
@@ -878,11 +1009,20 @@ class Connection:
             if not sql and packet_size < MAX_PACKET_LEN:
                 break
 
-    def _request_authentication(self):
+    def _handshake_response_init(self):
+        """Build the fixed-size head of the HandshakeResponse packet.
+
+        It is also sent on its own as the SSLRequest packet.
+        """
         # https://dev.mysql.com/doc/internals/en/connection-phase-packets.html#packet-Protocol::HandshakeResponse
         if int(self.server_version.split(".", 1)[0]) >= 5:
             self.client_flag |= CLIENT.MULTI_RESULTS
 
+        if self._compress_requested and self.server_capabilities & CLIENT.COMPRESS:
+            self.client_flag |= CLIENT.COMPRESS
+        else:
+            self.client_flag &= ~CLIENT.COMPRESS
+
         if self.user is None:
             raise ValueError("Did not specify a username")
 
@@ -890,17 +1030,12 @@ class Connection:
         if isinstance(self.user, str):
             self.user = self.user.encode(self.encoding)
 
-        data_init = struct.pack(
+        return struct.pack(
             "<iIB23s", self.client_flag, MAX_PACKET_LEN, charset_id, b""
         )
 
-        if self.ssl and self.server_capabilities & CLIENT.SSL:
-            self.write_packet(data_init)
-
-            self._sock = self.ctx.wrap_socket(self._sock, server_hostname=self.host)
-            self._rfile = self._sock.makefile("rb")
-            self._secure = True
-
+    def _handshake_response(self, data_init):
+        """Build the full HandshakeResponse packet for the server's auth plugin."""
         data = data_init + self.user + b"\0"
 
         authresp = b""
@@ -954,7 +1089,19 @@ class Connection:
                 connect_attrs += _lenenc_int(len(v)) + v
             data += _lenenc_int(len(connect_attrs)) + connect_attrs
 
-        self.write_packet(data)
+        return data
+
+    def _request_authentication(self):
+        data_init = self._handshake_response_init()
+
+        if self.ssl and self.server_capabilities & CLIENT.SSL:
+            self.write_packet(data_init)
+
+            self._sock = self.ctx.wrap_socket(self._sock, server_hostname=self.host)
+            self._rfile = self._sock.makefile("rb")
+            self._secure = True
+
+        self.write_packet(self._handshake_response(data_init))
         auth_packet = self._read_packet()
 
         # if authentication method isn't accepted the first byte
@@ -1403,6 +1550,50 @@ class MySQLResult:
         self.description = tuple(description)
 
 
+class ProfiledResult(MySQLResult):
+    """
+    :class:`MySQLResult` that fills in a :class:`~pymysql.profiling.QueryProfile`
+    while reading. Only used for profiled queries, so the plain result path
+    carries no measuring code.
+    """
+
+    def __init__(self, connection, profile):
+        super().__init__(connection)
+        self.profile = profile
+
+    def read(self):
+        self._read_counting(super().read)
+
+    def init_unbuffered_query(self):
+        self._read_counting(super().init_unbuffered_query)
+
+    def _read_counting(self, read):
+        connection = self.connection
+        profile = self.profile
+        read_packet = connection._read_packet
+
+        def counting_read_packet(packet_type=MysqlPacket):
+            packet = read_packet(packet_type)
+            if not profile.packets:
+                profile.rtt_ms = (time.perf_counter() - profile.started) * 1000
+            profile.packets += 1
+            profile.bytes += len(packet._data) + 4
+            return packet
+
+        # Shadow the method on this connection for the duration of the read
+        connection._read_packet = counting_read_packet
+        try:
+            read()
+        finally:
+            del connection._read_packet
+
+    def _read_row_from_packet(self, packet):
+        started = time.perf_counter()
+        row = super()._read_row_from_packet(packet)
+        self.profile.decode_ms += (time.perf_counter() - started) * 1000
+        return row
+
+
 class LoadLocalFile:
     def __init__(self, filename, connection):
         self.filename = filename
@@ -1,4 +1,5 @@
 import re
+import time
 import warnings
 from . import err
 
@@ -41,6 +42,7 @@ class Cursor:
         self._executed = None
         self._result = None
         self._rows = None
+        self._statement = None
 
     def close(self):
         """
@@ -148,6 +150,9 @@ class Cursor:
         while self.nextset():
             pass
 
+        if self.connection.profiler is not None:
+            # Fingerprinted from the template, not the statement with literals
+            self._statement = (query, args)
         query = self.mogrify(query, args)
 
         result = self._query(query)
@@ -319,10 +324,31 @@ class Cursor:
     def _query(self, q):
         conn = self._get_db()
         self._clear_result()
+        if conn.profiler is not None:
+            return self._profiled_query(conn, q)
         conn.query(q)
         self._do_get_result()
         return self.rowcount
 
+    def _profiled_query(self, conn, q, unbuffered=False):
+        template, args = self._statement or (None, None)
+        self._statement = None
+        profiler = conn.profiler
+        profile = profiler.begin(q, template, args)
+        conn._profile = profile
+        try:
+            conn.query(q, unbuffered=unbuffered)
+        except Exception as e:
+            profiler.end(profile, error=e)
+            raise
+        finally:
+            conn._profile = None
+        started = time.perf_counter()
+        self._do_get_result()
+        profile.decode_ms += (time.perf_counter() - started) * 1000
+        profiler.end(profile, None if unbuffered else len(self._rows or ()))
+        return self.rowcount
+
     def _clear_result(self):
         self.rownumber = 0
         self._result = None
@@ -444,6 +470,8 @@ class SSCursor(Cursor):
     def _query(self, q):
         conn = self._get_db()
         self._clear_result()
+        if conn.profiler is not None:
+            return self._profiled_query(conn, q, unbuffered=True)
         conn.query(q, unbuffered=True)
         self._do_get_result()
         return self.rowcount
@@ -0,0 +1,256 @@
+"""
+Query-level profiling hooks.
+
+With a :class:`Profiler` installed, every query run through
+:meth:`Cursor.execute() <pymysql.cursors.Cursor.execute>` (and anything
+else that ends in ``Cursor._query``) produces one :class:`QueryProfile`:
+
+``fingerprint``
+    The statement with literals and placeholders replaced by ``?`` and
+    ``IN``/``VALUES`` lists collapsed, so every call of the same query
+    aggregates under one key.
+``binds``
+    Number of parameters passed to ``execute()``.
+``rtt_ms``
+    From sending the command to the first response packet: server time
+    plus one network round trip.
+``total_ms``
+    Until the cursor has the rows (conversion included).
+``decode_ms``
+    Time spent converting column values and building dict rows.
+``rows``, ``packets``, ``bytes``
+    Rows returned and protocol packets/bytes received (after
+    decompression). Unbuffered cursors only report the column
+    definitions; their rows are read later, one ``fetch`` at a time.
+
+Profiles go to a sink: :class:`TopQueries` aggregates per fingerprint and
+reports the slowest, :class:`LogSink` writes one JSON line per query above a
+threshold. Any object with a ``record(profile)`` method works.
+
+Nothing is measured unless a profiler is installed: a connection reads
+:data:`profiler` once when it is created, and the only cost left on the
+query path is one ``is None`` check per query. Install one globally with
+:func:`enable`, per connection with ``Connection(profiler=...)``, or set
+``PYMYSQL_PROFILE=log`` (with an optional ``PYMYSQL_PROFILE_MIN_MS``) to log
+slow queries without touching code. The asyncio cursors are not profiled.
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+import time
+
+#: Profiler picked up by new connections; see :func:`enable`.
+profiler = None
+
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_LITERAL = re.compile(
+    r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|%\(\w+\)s|%s"""
+    r"|(?<![\w.$])(?:0x[0-9a-fA-F]+|-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)"
+)
+_SPACE = re.compile(r"\s+")
+_COMMA = re.compile(r" ?, ?")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(\((?:\?, )*\?\))(?:, \1)+")
+
+
+@functools.lru_cache(maxsize=512)
+def fingerprint(sql):
+    """Normalized form of *sql* used to group executions of one query.
+
+    :param sql: Query template or final statement.
+    :type sql: str
+    :rtype: str
+    """
+    sql = _COMMENT.sub(" ", sql)
+    sql = _LITERAL.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip().rstrip(";").strip()
+    sql = _COMMA.sub(", ", sql).replace("( ", "(").replace(" )", ")")
+    sql = _IN_LIST.sub("IN (?+)", sql)
+    return _VALUES_LIST.sub(r"\1, ...", sql)
+
+
+def _bind_count(args):
+    if args is None:
+        return 0
+    if isinstance(args, (tuple, list, dict)):
+        return len(args)
+    return 1
+
+
+class QueryProfile:
+    """Measurements of one query; see the module docstring for the fields."""
+
+    __slots__ = (
+        "fingerprint",
+        "binds",
+        "started",
+        "rtt_ms",
+        "total_ms",
+        "decode_ms",
+        "rows",
+        "packets",
+        "bytes",
+        "error",
+    )
+
+    def __init__(self, fingerprint, binds):
+        self.fingerprint = fingerprint
+        self.binds = binds
+        self.started = time.perf_counter()
+        self.rtt_ms = None
+        self.total_ms = None
+        self.decode_ms = 0.0
+        self.rows = None
+        self.packets = 0
+        self.bytes = 0
+        self.error = None
+
+    def as_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "binds": self.binds,
+            "rtt_ms": _round(self.rtt_ms),
+            "total_ms": _round(self.total_ms),
+            "decode_ms": _round(self.decode_ms),
+            "rows": self.rows,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "error": self.error,
+        }
+
+
+def _round(ms):
+    return None if ms is None else round(ms, 3)
+
+
+class Profiler:
+    """Creates a :class:`QueryProfile` per query and hands it to *sink*.
+
+    :param sink: Object with a ``record(profile)`` method.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def begin(self, sql, template=None, args=None):
+        """Start profiling a query.
+
+        :param sql: Statement sent to the server.
+        :param template: Query as passed to ``execute()``, if known; it is
+            cheaper to fingerprint and shared by every execution.
+        :param args: Parameters passed to ``execute()``.
+        :rtype: QueryProfile
+        """
+        source = sql if template is None else template
+        if isinstance(source, (bytes, bytearray)):
+            source = bytes(source).decode("utf-8", "replace")
+        return QueryProfile(fingerprint(source), _bind_count(args))
+
+    def end(self, profile, rows=None, error=None):
+        """Finish *profile* and record it.
+
+        :param rows: Rows returned, ``None`` if unknown.
+        :param error: Exception raised by the query, if any.
+        """
+        profile.total_ms = (time.perf_counter() - profile.started) * 1000
+        profile.rows = rows
+        if error is not None:
+            profile.error = repr(error)
+        self.sink.record(profile)
+
+
+class TopQueries:
+    """In-memory aggregate per fingerprint.
+
+    :param n: Default number of entries returned by :meth:`top`.
+    """
+
+    def __init__(self, n=10):
+        self.n = n
+        self.stats = {}
+
+    def record(self, profile):
+        stats = self.stats.get(profile.fingerprint)
+        if stats is None:
+            stats = self.stats[profile.fingerprint] = {
+                "fingerprint": profile.fingerprint,
+                "count": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rtt_ms": 0.0,
+                "decode_ms": 0.0,
+                "rows": 0,
+                "bytes": 0,
+            }
+        stats["count"] += 1
+        stats["errors"] += profile.error is not None
+        stats["total_ms"] += profile.total_ms
+        stats["max_ms"] = max(stats["max_ms"], profile.total_ms)
+        stats["rtt_ms"] += profile.rtt_ms or 0.0
+        stats["decode_ms"] += profile.decode_ms
+        stats["rows"] += profile.rows or 0
+        stats["bytes"] += profile.bytes
+
+    def top(self, n=None, by="total_ms"):
+        """The *n* fingerprints with the highest *by* (``total_ms``,
+        ``max_ms``, ``count``, ``rows``, ``bytes``, ...), with per-call means.
+
+        :rtype: list of dict
+        """
+        ranked = sorted(self.stats.values(), key=lambda s: s[by], reverse=True)
+        result = []
+        for stats in ranked[: n or self.n]:
+            count = stats["count"]
+            entry = {key: _round(v) if isinstance(v, float) else v for key, v in stats.items()}
+            entry["mean_ms"] = _round(stats["total_ms"] / count)
+            entry["mean_rtt_ms"] = _round(stats["rtt_ms"] / count)
+            entry["mean_rows"] = round(stats["rows"] / count, 1)
+            result.append(entry)
+        return result
+
+    def reset(self):
+        self.stats.clear()
+
+
+class LogSink:
+    """One JSON line per query taking at least *min_ms* (and per failed query).
+
+    :param stream: Where lines go. (default: stdout)
+    :param min_ms: Threshold on ``total_ms``. (default: 0, every query)
+    """
+
+    def __init__(self, stream=None, min_ms=0.0):
+        self.stream = stream or sys.stdout
+        self.min_ms = min_ms
+
+    def record(self, profile):
+        if profile.total_ms < self.min_ms and profile.error is None:
+            return
+        level = "ERROR" if profile.error is not None else "INFO"
+        record = {"level": level, "message": "query", **profile.as_dict()}
+        self.stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def enable(sink):
+    """Profile the queries of every connection created from now on.
+
+    :param sink: Object with a ``record(profile)`` method.
+    :return: The installed :class:`Profiler`.
+    """
+    global profiler
+    profiler = Profiler(sink)
+    return profiler
+
+
+def disable():
+    """Stop profiling connections created from now on."""
+    global profiler
+    profiler = None
+
+
+if os.environ.get("PYMYSQL_PROFILE") == "log":
+    enable(LogSink(min_ms=float(os.environ.get("PYMYSQL_PROFILE_MIN_MS", 0))))
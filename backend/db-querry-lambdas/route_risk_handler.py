@@ -0,0 +1,96 @@
+import json
+import os
+import pymysql
+from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.routes import DEFAULT_MAX_STEP_M, decode_polyline, score_route
+from navrakshak.serialize import dumps
+from navrakshak.spatial import ZoneCache
+from navrakshak.tracing import Tracer
+
+MAX_VERTICES = int(os.environ.get('ROUTE_MAX_VERTICES', 5000))
+
+zone_cache = ZoneCache(ttl=int(os.environ.get('ZONE_CACHE_TTL', 300)))
+tracer = Tracer('route_risk')
+
+
+def parse_point(point):
+    if isinstance(point, dict):
+        lat, lon = float(point['latitude']), float(point['longitude'])
+    else:
+        lat, lon = (float(v) for v in point)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f'coordinates out of range: {lat}, {lon}')
+    return lat, lon
+
+
+def parse_route(body):
+    polyline = body.get('polyline')
+    if isinstance(polyline, str):
+        return [parse_point(p) for p in decode_polyline(polyline)]
+    if polyline is not None:
+        return [parse_point(p) for p in polyline]
+    return ([parse_point(body['start'])] +
+            [parse_point(p) for p in body.get('waypoints') or []] +
+            [parse_point(body['end'])])
+
+
+@tracer.handler
+@compressed(tracer.phase)
+def lambda_handler(event, context):
+    try:
+        body = json.loads(event['body']) if 'body' in event else event
+        if not isinstance(body, dict):
+            raise TypeError('request body is not an object')
+        vertices = parse_route(body)
+        max_step_m = min(5000.0, max(10.0, float(body.get('max_step_m', DEFAULT_MAX_STEP_M))))
+        if not 2 <= len(vertices) <= MAX_VERTICES:
+            raise ValueError('bad vertex count')
+    except (KeyError, TypeError, ValueError, IndexError):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': f'Invalid input: Please provide "polyline" (encoded string or list of points) '
+                         f'or "start", "end" and optional "waypoints"; 2 to {MAX_VERTICES} points'
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    def connect():
+        return pymysql.connect(
+            host=os.environ['DB_HOST'],
+            user=os.environ['DB_USER'],
+            password=os.environ['DB_PASSWORD'],
+            database=os.environ['DB_NAME'],
+            port=3306,
+            cursorclass=pymysql.cursors.DictCursor
+        )
+
+    try:
+        with tracer.phase('zones'):
+            index = zone_cache.get(connect)
+    except pymysql.MySQLError as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': 'Database error',
+                'message': str(e)
+            }),
+            'headers': {'Content-Type': 'application/json'}
+        }
+
+    with tracer.phase('score'):
+        response = score_route(index, vertices, max_step_m)
+    response['assessment_time'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+
+    with tracer.phase('serialize'):
+        body = dumps(response)
+
+    return {
+        'statusCode': 200,
+        'body': body,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        }
+    }
@@ -1,19 +1,62 @@
 import json
 import os
 import pymysql
+import time
 from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.log import RequestLogger
+from navrakshak.serialize import dumps
 
+log = RequestLogger('safety_updates')
+
+# Serialized responses per filter set, reused for CACHE_TTL seconds (0 turns the cache off)
+CACHE_TTL = int(os.environ.get('ANNOUNCEMENTS_CACHE_TTL', 30))
+CACHE_MAX_ENTRIES = 256
+cached_bodies = {}
+
+
+def cached_body(key):
+    entry = cached_bodies.get(key)
+    if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def cache_body(key, body):
+    if len(cached_bodies) >= CACHE_MAX_ENTRIES:
+        now = time.monotonic()
+        for stale in [k for k, (stored_at, _) in cached_bodies.items() if now - stored_at >= CACHE_TTL]:
+            del cached_bodies[stale]
+        if len(cached_bodies) >= CACHE_MAX_ENTRIES:
+            cached_bodies.clear()
+    cached_bodies[key] = (time.monotonic(), body)
+
+
+def ok(body):
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*'
+    }
+    if CACHE_TTL > 0:
+        headers['Cache-Control'] = f'public, max-age={CACHE_TTL}'
+    return {
+        'statusCode': 200,
+        'body': body,
+        'headers': headers
+    }
+
+
+@log.handler
+@compressed(log.timer)
 def lambda_handler(event, context):
-    print(f"DEBUG: Received event: {json.dumps(event)}")
+    log.debug('received event: %s', event)
     
     # Handle both direct Lambda testing and API Gateway calls
     try:
         if 'body' in event:
             body = json.loads(event['body']) if event['body'] else {}
-            print("DEBUG: Using API Gateway format")
         else:
             body = event
-            print("DEBUG: Using direct Lambda format")
             
         # Optional filters
         category = body.get('category', '').strip()
@@ -21,13 +64,20 @@ def lambda_handler(event, context):
         location = body.get('location', '').strip()
         limit = int(body.get('limit', 20))
         
-        print(f"DEBUG: Filters - category: {category}, priority: {priority}, location: {location}, limit: {limit}")
+        log.debug('filters category=%r priority=%r location=%r limit=%s', category, priority, location, limit)
         
     except (json.JSONDecodeError, TypeError, ValueError) as e:
-        print(f"DEBUG: Error parsing input: {e}")
+        log.warning('invalid input, using default filters: %s', e)
         # Continue with default values
         category = priority = location = ""
         limit = 20
+
+    cache_key = (category, priority, location, limit)
+    if CACHE_TTL > 0:
+        body = cached_body(cache_key)
+        log.note(cache_hit=body is not None)
+        if body is not None:
+            return ok(body)
     
     # Database connection
     db_host = os.environ['DB_HOST']
@@ -37,15 +87,15 @@ def lambda_handler(event, context):
     
     connection = None
     try:
-        connection = pymysql.connect(
-            host=db_host,
-            user=db_user,
-            password=db_password,
-            database=db_name,
-            port=3306,
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        print("DEBUG: Database connection successful")
+        with log.timer('connect'):
+            connection = pymysql.connect(
+                host=db_host,
+                user=db_user,
+                password=db_password,
+                database=db_name,
+                port=3306,
+                cursorclass=pymysql.cursors.DictCursor
+            )
         
         with connection.cursor() as cursor:
             # Build dynamic query
@@ -86,31 +136,15 @@ def lambda_handler(event, context):
             """
             query_params.append(limit)
             
-            cursor.execute(sql, query_params)
-            announcements = cursor.fetchall()
-            print(f"DEBUG: Found {len(announcements)} announcements")
-        
-        # Process results
-        processed_announcements = []
-        for announcement in announcements:
-            processed_announcement = {
-                'announcement_id': announcement['announcement_id'],
-                'title': announcement['title'],
-                'content': announcement['content'],
-                'category': announcement['category'],
-                'source': announcement['source'],
-                'priority': announcement['priority'],
-                'location': announcement['location'],
-                'valid_from': announcement['valid_from'].strftime('%Y-%m-%d %H:%M:%S') if announcement['valid_from'] else None,
-                'valid_until': announcement['valid_until'].strftime('%Y-%m-%d %H:%M:%S') if announcement['valid_until'] else None,
-                'published_at': announcement['published_at'].strftime('%Y-%m-%d %H:%M:%S') if announcement['published_at'] else None,
-                'updated_at': announcement['updated_at'].strftime('%Y-%m-%d %H:%M:%S') if announcement['updated_at'] else None
-            }
-            processed_announcements.append(processed_announcement)
+            with log.timer('query'):
+                cursor.execute(sql, query_params)
+                announcements = cursor.fetchall()
+            log.note(announcements=len(announcements))
         
         response = {
-            'total_announcements': len(processed_announcements),
-            'announcements': processed_announcements,
+            # Rows go out as fetched; dumps() formats the DATETIME columns
+            'total_announcements': len(announcements),
+            'announcements': announcements,
             'filters_applied': {
                 'category': category if category else 'all',
                 'priority': priority if priority else 'all',
@@ -119,10 +153,9 @@ def lambda_handler(event, context):
             },
             'retrieved_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
         }
-        print("DEBUG: Successfully created response")
         
     except pymysql.MySQLError as e:
-        print(f"DEBUG: Database error: {e}")
+        log.error('database error: %s', e)
         return {
             'statusCode': 500,
             'body': json.dumps({'error': 'Database error', 'message': str(e)}),
@@ -130,7 +163,7 @@ def lambda_handler(event, context):
         }
     
     except Exception as e:
-        print(f"DEBUG: Unexpected error: {e}")
+        log.exception('unexpected error: %s', e)
         return {
             'statusCode': 500,
             'body': json.dumps({'error': 'Internal server error', 'message': str(e)}),
@@ -140,14 +173,11 @@ def lambda_handler(event, context):
     finally:
         if connection:
             connection.close()
-            print("DEBUG: Database connection closed")
     
-    return {
-        'statusCode': 200,
-        'body': json.dumps(response),
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-        }
-    }
+    with log.timer('serialize'):
+        body = dumps(response)
+    if CACHE_TTL > 0:
+        cache_body(cache_key, body)
+
+    return ok(body)
 
@@ -3,25 +3,29 @@ import os
 import pymysql
 import hashlib
 from datetime import datetime
+from navrakshak.compression import compressed
+from navrakshak.log import RequestLogger
+from navrakshak.serialize import dumps
 
+log = RequestLogger('user_profile')
+
+@log.handler
+@compressed(log.timer)
 def lambda_handler(event, context):
-    print(f"DEBUG: Received event: {json.dumps(event)}")
-    
     # Handle both direct Lambda testing and API Gateway calls
     try:
         if 'body' in event:
             body = json.loads(event['body'])
-            print("DEBUG: Using API Gateway format")
         else:
             body = event
-            print("DEBUG: Using direct Lambda format")
             
         tourist_id = body.get('tourist_id', '').strip()
         password = body.get('password', '').strip()
-        print(f"DEBUG: Login attempt - tourist_id: '{tourist_id}', password: '{password}'")
+        # Never log the event or the password
+        log.debug('login attempt tourist_id=%r', tourist_id)
         
     except (json.JSONDecodeError, TypeError) as e:
-        print(f"DEBUG: Error parsing input: {e}")
+        log.warning('invalid input: %s', e)
         return {
             'statusCode': 400,
             'body': json.dumps({'error': 'Invalid JSON input'}),
@@ -29,7 +33,7 @@ def lambda_handler(event, context):
         }
     
     if not tourist_id or not password:
-        print("DEBUG: Missing tourist_id or password")
+        log.warning('missing tourist_id or password')
         return {
             'statusCode': 400,
             'body': json.dumps({'error': 'Both tourist_id and password are required'}),
@@ -38,7 +42,6 @@ def lambda_handler(event, context):
     
     # Hash password using MD5 (to match your database)
     password_hash = hashlib.md5(password.encode()).hexdigest()
-    print(f"DEBUG: Generated MD5 hash: {password_hash}")
     
     # Database connection
     db_host = os.environ['DB_HOST']
@@ -48,28 +51,23 @@ def lambda_handler(event, context):
     
     connection = None
     try:
-        connection = pymysql.connect(
-            host=db_host,
-            user=db_user,
-            password=db_password,
-            database=db_name,
-            port=3306,
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        print("DEBUG: Database connection successful")
+        with log.timer('connect'):
+            connection = pymysql.connect(
+                host=db_host,
+                user=db_user,
+                password=db_password,
+                database=db_name,
+                port=3306,
+                cursorclass=pymysql.cursors.DictCursor
+            )
         
-        with connection.cursor() as cursor:
+        with log.timer('query'), connection.cursor() as cursor:
             # First, check if user exists (for debugging)
             cursor.execute("SELECT tourist_id, password FROM tourists WHERE tourist_id = %s", (tourist_id,))
             user_check = cursor.fetchone()
             
-            if user_check:
-                print(f"DEBUG: User found in database")
-                print(f"DEBUG: Stored hash: {user_check['password']}")
-                print(f"DEBUG: Generated hash: {password_hash}")
-                print(f"DEBUG: Hashes match: {user_check['password'] == password_hash}")
-            else:
-                print("DEBUG: User not found in database")
+            if not user_check:
+                log.note(outcome='unknown_user')
                 return {
                     'statusCode': 401,
                     'body': json.dumps({'error': 'Invalid credentials'}),
@@ -85,10 +83,9 @@ def lambda_handler(event, context):
             """
             cursor.execute(sql, (tourist_id, password_hash))
             user = cursor.fetchone()
-            print(f"DEBUG: Authentication query executed, user authenticated: {user is not None}")
             
             if not user:
-                print("DEBUG: Invalid credentials - password mismatch")
+                log.note(outcome='wrong_password')
                 return {
                     'statusCode': 401,
                     'body': json.dumps({'error': 'Invalid credentials'}),
@@ -123,10 +120,10 @@ def lambda_handler(event, context):
                 }
             }
         }
-        print("DEBUG: Login successful, returning user profile")
+        log.note(outcome='authenticated')
         
     except pymysql.MySQLError as e:
-        print(f"DEBUG: Database error: {e}")
+        log.error('database error: %s', e)
         return {
             'statusCode': 500,
             'body': json.dumps({'error': 'Database error', 'message': str(e)}),
@@ -134,7 +131,7 @@ def lambda_handler(event, context):
         }
     
     except Exception as e:
-        print(f"DEBUG: Unexpected error: {e}")
+        log.exception('unexpected error: %s', e)
         return {
             'statusCode': 500,
             'body': json.dumps({'error': 'Internal server error', 'message': str(e)}),
@@ -144,11 +141,13 @@ def lambda_handler(event, context):
     finally:
         if connection:
             connection.close()
-            print("DEBUG: Database connection closed")
     
+    with log.timer('serialize'):
+        body = dumps(response)
+
     return {
         'statusCode': 200,
-        'body': json.dumps(response),
+        'body': body,
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
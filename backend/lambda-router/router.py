@@ -1,9 +1,11 @@
 import json
 import urllib3
 import os
+from navrakshak.tracing import Tracer
 
 # Initialize HTTP client
 http = urllib3.PoolManager()
+tracer = Tracer('router')
 
 # Environment variables for each separate API endpoint
 LOGIN_API = os.environ.get('LOGIN_API')
@@ -12,6 +14,7 @@ POLICE_API = os.environ.get('POLICE_API')
 RISK_API = os.environ.get('RISK_API')
 ANNOUNCEMENTS_API = os.environ.get('ANNOUNCEMENTS_API')
 
+@tracer.handler
 def lambda_handler(event, context):
     intent_name = event['sessionState']['intent']['name']
     slots = event['sessionState']['intent']['slots']
@@ -30,6 +33,7 @@ def lambda_handler(event, context):
         return close_response("I didn't understand that. Please try again.", session_attributes)
         
     except Exception as e:
+        tracer.mark_failed()
         return close_response("Sorry, I'm experiencing technical difficulties. Please try again.", session_attributes)
 
 def handle_emergency(slots, session_attributes):
@@ -39,11 +43,7 @@ def handle_emergency(slots, session_attributes):
         # Call your separate nearestpolice API
         payload = {"latitude": 28.7524404, "longitude": 77.4987640}  # Default coordinates
         
-        response = http.request('POST', POLICE_API,
-                              body=json.dumps(payload),
-                              headers={'Content-Type': 'application/json'})
-        
-        data = json.loads(response.data.decode('utf-8'))
+        data = post(POLICE_API, payload, 'police_api')
         
         message = f"""🚨 EMERGENCY SOS ALERT SENT!
 
@@ -63,11 +63,7 @@ NEAREST POLICE STATION:
         # Call your separate login API to get user's last location
         login_payload = {"tourist_id": "T003", "password": "password123"}
         
-        response = http.request('POST', LOGIN_API,
-                              body=json.dumps(login_payload),
-                              headers={'Content-Type': 'application/json'})
-        
-        data = json.loads(response.data.decode('utf-8'))
+        data = post(LOGIN_API, login_payload, 'login_api')
         location = data['user_profile']['last_location']
         
         message = f"""📍 LOCATION ASSISTANCE ACTIVATED!
@@ -94,11 +90,7 @@ def handle_area_info(slots, session_attributes):
         # Call your separate nearesthospital API
         payload = {"latitude": latitude, "longitude": longitude}
         
-        response = http.request('POST', HOSPITAL_API,
-                              body=json.dumps(payload),
-                              headers={'Content-Type': 'application/json'})
-        
-        data = json.loads(response.data.decode('utf-8'))
+        data = post(HOSPITAL_API, payload, 'hospital_api')
         
         message = f"""🏥 NEAREST HOSPITAL FOUND
 
@@ -118,11 +110,7 @@ def handle_area_info(slots, session_attributes):
         # Call your separate nearestpolice API
         payload = {"latitude": latitude, "longitude": longitude}
         
-        response = http.request('POST', POLICE_API,
-                              body=json.dumps(payload),
-                              headers={'Content-Type': 'application/json'})
-        
-        data = json.loads(response.data.decode('utf-8'))
+        data = post(POLICE_API, payload, 'police_api')
         
         message = f"""🚔 NEAREST POLICE STATION
 
@@ -139,11 +127,7 @@ def handle_area_info(slots, session_attributes):
         # Call your separate riskassessment API
         payload = {"latitude": latitude, "longitude": longitude}
         
-        response = http.request('POST', RISK_API,
-                              body=json.dumps(payload),
-                              headers={'Content-Type': 'application/json'})
-        
-        data = json.loads(response.data.decode('utf-8'))
+        data = post(RISK_API, payload, 'risk_api')
         
         message = f"""🛡️ AREA SAFETY ASSESSMENT
 
@@ -168,11 +152,7 @@ def handle_digital_id(slots, session_attributes):
     # Call your separate login API
     payload = {"tourist_id": "T003", "password": "password123"}
     
-    response = http.request('POST', LOGIN_API,
-                          body=json.dumps(payload),
-                          headers={'Content-Type': 'application/json'})
-    
-    data = json.loads(response.data.decode('utf-8'))
+    data = post(LOGIN_API, payload, 'login_api')
     profile = data['user_profile']
     
     if id_type == 'profile':
@@ -215,11 +195,7 @@ def handle_safety_updates(session_attributes):
     # Call your separate announcements API
     payload = {"priority": "HIGH", "limit": 3}
     
-    response = http.request('POST', ANNOUNCEMENTS_API,
-                          body=json.dumps(payload),
-                          headers={'Content-Type': 'application/json'})
-    
-    data = json.loads(response.data.decode('utf-8'))
+    data = post(ANNOUNCEMENTS_API, payload, 'announcements_api')
     
     message = "📢 LATEST SAFETY UPDATES\n\n"
     
@@ -232,6 +208,15 @@ def handle_safety_updates(session_attributes):
     
     return close_response(message, session_attributes)
 
+def post(url, payload, phase):
+    # Each backend call is timed as its own phase and carries the trace id to the handler
+    with tracer.phase(phase):
+        response = http.request('POST', url,
+                                body=json.dumps(payload),
+                                headers=tracer.headers({'Content-Type': 'application/json'}))
+    with tracer.phase('decode'):
+        return json.loads(response.data.decode('utf-8'))
+
 def get_slot_value(slots, slot_name):
     if slots and slot_name in slots and slots[slot_name]:
         return slots[slot_name]['value']['interpretedValue']
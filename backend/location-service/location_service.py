@@ -0,0 +1,478 @@
+"""
+Tourist location ingestion service.
+
+Accepts GPS pings over HTTP, coalesces them in memory per tourist and
+writes them to RDS in batches (see :mod:`navrakshak.locations`). Every
+ping is also kept as history: appended to ``location_history`` as is
+(``--history-format raw``, see :mod:`navrakshak.history`) or simplified and
+packed into ``location_segments`` (``--history-format segments``, see
+:mod:`navrakshak.trajectory`). Each ping is run through the geofence engine
+(see :mod:`navrakshak.geofence`) over the circles in ``risk_zones`` and the
+polygons in ``zone_polygons``; zone entry/exit alerts are stored in
+``geofence_alerts``. A batch is flushed when ``--batch-size`` tourists are
+pending or every ``--flush-interval`` seconds, whichever comes first.
+
+Endpoints:
+
+    PUT  /api/v1/tourists/<tourist_id>/location   one ping (website format)
+    POST /api/v1/locations                        {"pings": [{tourist_id, latitude, longitude, timestamp}, ...]}
+    GET  /api/v1/locations/stats                  throughput and flush latency
+    GET  /api/v1/alerts                           recent geofence alerts (limit, severity, zoneId)
+    POST /api/v1/monitoring/check-violations      {"touristId", "location": {"lat", "lng"}}
+
+    python backend/location-service/location_service.py --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import pymysql.aio
+
+from navrakshak.geofence import (
+    ALERT_INSERT_SQL, GeofenceEngine, alert_rows,
+)
+from navrakshak.history import APPEND_HISTORY_SQL, history_rows
+from navrakshak.locations import (
+    PingCoalescer, UPSERT_LOCATION_SQL, location_rows, parse_ping, sync_last_stayed_query,
+)
+from navrakshak.spatial import load_all_zones_async
+from navrakshak.trajectory import APPEND_SEGMENT_SQL, DEFAULT_TOLERANCE_M, SegmentBuilder, segment_rows
+
+logger = logging.getLogger('location_service')
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_FLUSH_INTERVAL = 1.0
+MAX_BODY_BYTES = 1024 * 1024
+LATENCY_WINDOW = 1024
+APPEND_CHUNK_ROWS = 5000
+HISTORY_FORMATS = ('raw', 'segments')
+# Unwritten history/alert rows beyond this many are discarded, oldest first
+MAX_APPEND_BACKLOG = 1000000
+RECENT_ALERTS = 1000
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class AppendBuffer:
+    """Rows waiting for a multi-row ``INSERT IGNORE`` into one table."""
+
+    def __init__(self, sql, row_builder, max_backlog=MAX_APPEND_BACKLOG):
+        self.sql = sql
+        self.row_builder = row_builder
+        self.max_backlog = max_backlog
+        self.pending = []
+        self.written = 0
+        self.dropped = 0
+
+    def take_chunks(self, size=APPEND_CHUNK_ROWS):
+        pending, self.pending = self.pending, []
+        return [pending[i:i + size] for i in range(0, len(pending), size)]
+
+    def requeue(self, chunk):
+        self.pending[:0] = chunk
+        overflow = len(self.pending) - self.max_backlog
+        if overflow > 0:
+            del self.pending[:overflow]
+            self.dropped += overflow
+
+
+class LocationIngestor:
+    """Buffer pings and flush them to the database in batches.
+
+    Flushes run one at a time; a large backlog is split into chunks of
+    *batch_size* tourists that are written concurrently over the pool,
+    together with the pending history rows (pings, or closed segments with
+    *history_format* ``'segments'``) and geofence alerts from *engine*. If
+    a chunk fails its rows go back into the buffer for the next flush.
+    """
+
+    def __init__(self, pool, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 history_format='raw', tolerance_m=DEFAULT_TOLERANCE_M, engine=None):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.coalescer = PingCoalescer()
+        if history_format == 'segments':
+            self.segments = SegmentBuilder(tolerance_m)
+            self.history = AppendBuffer(APPEND_SEGMENT_SQL, segment_rows)
+        else:
+            self.segments = None
+            self.history = AppendBuffer(APPEND_HISTORY_SQL, history_rows)
+        self.engine = engine
+        self.alerts = AppendBuffer(ALERT_INSERT_SQL, alert_rows)
+        self.recent_alerts = deque(maxlen=RECENT_ALERTS)
+        self._wake = asyncio.Event()
+        self._task = None
+        self.started = time.monotonic()
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.flush_latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def submit(self, ping):
+        self.coalescer.add(ping)
+        if self.segments is not None:
+            self.history.pending.extend(self.segments.add(ping))
+        else:
+            self.history.pending.append(ping)
+        if self.engine is not None:
+            alerts = self.engine.process(ping)
+            if alerts:
+                self.alerts.pending.extend(alerts)
+                self.recent_alerts.extend(alerts)
+        if len(self.coalescer) >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.segments is not None:
+            self.history.pending.extend(self.segments.close_all())
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        pings = self.coalescer.drain()
+        if self.segments is not None:
+            self.history.pending.extend(self.segments.close_idle())
+        chunks = [pings[i:i + self.batch_size] for i in range(0, len(pings), self.batch_size)]
+        appends = [(buffer, chunk) for buffer in (self.history, self.alerts)
+                   for chunk in buffer.take_chunks()]
+        if not chunks and not appends:
+            return 0
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._write(chunk) for chunk in chunks),
+            *(self._append(buffer, chunk) for buffer, chunk in appends),
+            return_exceptions=True,
+        )
+        written = 0
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                self.failed_flushes += 1
+                self.coalescer.restore(chunk)
+                logger.error('flush of %d pings failed: %s', len(chunk), result)
+            else:
+                written += len(chunk)
+        for (buffer, chunk), result in zip(appends, results[len(chunks):]):
+            if isinstance(result, BaseException):
+                self.failed_flushes += 1
+                buffer.requeue(chunk)
+                logger.error('append of %d rows failed: %s', len(chunk), result)
+            else:
+                buffer.written += len(chunk)
+        self.flushes += 1
+        self.rows_written += written
+        self.flush_latencies.append(time.perf_counter() - started)
+        return written
+
+    async def _write(self, pings):
+        sync_sql, sync_args = sync_last_stayed_query(pings)
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(UPSERT_LOCATION_SQL, location_rows(pings))
+                await cursor.execute(sync_sql, sync_args)
+            await conn.commit()
+
+    async def _append(self, buffer, rows):
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(buffer.sql, buffer.row_builder(rows))
+            await conn.commit()
+
+    async def refresh_zones(self):
+        async with self.pool.connection() as conn:
+            zones = await load_all_zones_async(conn)
+        self.engine.replace_zones(zones)
+        return len(zones)
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started
+        latencies = list(self.flush_latencies)
+        return {
+            'pings_received': self.coalescer.received,
+            'pings_coalesced': self.coalescer.coalesced,
+            'pending': len(self.coalescer),
+            'open_segments': len(self.segments) if self.segments is not None else 0,
+            'rows_written': self.rows_written,
+            'history_written': self.history.written,
+            'history_dropped': self.history.dropped,
+            'alerts_written': self.alerts.written,
+            'tourists_in_zones': self.engine.tracked() if self.engine is not None else 0,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'pings_per_second': round(self.coalescer.received / elapsed, 1) if elapsed else None,
+            'rows_per_second': round(self.rows_written / elapsed, 1) if elapsed else None,
+            'flush_ms_p50': _ms(percentile(latencies, 50)),
+            'flush_ms_p99': _ms(percentile(latencies, 99)),
+            'flush_ms_max': _ms(max(latencies) if latencies else None),
+        }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _api_response(status, data=None, error=None):
+    body = {'success': error is None, 'timestamp': datetime.utcnow().isoformat() + 'Z'}
+    if data is not None:
+        body['data'] = data
+    if error is not None:
+        body['error'] = error
+    return status, body
+
+
+class LocationHTTPServer:
+    """Minimal HTTP/1.1 front end with keep-alive; no framework dependency."""
+
+    REASONS = {200: 'OK', 202: 'Accepted', 204: 'No Content', 400: 'Bad Request',
+               404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+               413: 'Payload Too Large'}
+
+    def __init__(self, ingestor):
+        self.ingestor = ingestor
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get('content-length')
+                if length is None and method in ('PUT', 'POST'):
+                    status, body = _api_response(411, error='Content-Length required')
+                    await self._send(writer, status, body, keep_alive=False)
+                    break
+                try:
+                    length = int(length or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    status, body = _api_response(400, error='Malformed Content-Length')
+                    await self._send(writer, status, body, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    status, body = _api_response(413, error='Request body too large')
+                    await self._send(writer, status, body, keep_alive=False)
+                    break
+                raw = await reader.readexactly(length) if length else b''
+                status, body = self.route(method, path, raw)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._send(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def route(self, method, target, raw):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split('/') if p]
+        if method == 'OPTIONS':
+            return 204, None
+        try:
+            if parts[:3] == ['api', 'v1', 'tourists'] and len(parts) == 5 and parts[4] == 'location':
+                if method not in ('PUT', 'POST'):
+                    return _api_response(405, error='Use PUT')
+                ping = parse_ping(parts[3], json.loads(raw or b'{}'))
+                self.ingestor.submit(ping)
+                return _api_response(202, {
+                    'tourist_id': ping.tourist_id,
+                    'location': {'lat': ping.latitude, 'lng': ping.longitude},
+                    'lastSeen': ping.recorded_at.isoformat() + 'Z',
+                })
+            if parts == ['api', 'v1', 'locations']:
+                if method != 'POST':
+                    return _api_response(405, error='Use POST')
+                accepted, rejected = 0, []
+                for i, item in enumerate(json.loads(raw or b'{}').get('pings', [])):
+                    if not isinstance(item, dict):
+                        rejected.append({'index': i, 'error': 'ping is not an object'})
+                        continue
+                    try:
+                        self.ingestor.submit(parse_ping(None, item))
+                        accepted += 1
+                    except ValueError as e:
+                        rejected.append({'index': i, 'error': str(e)})
+                return _api_response(202, {'accepted': accepted, 'rejected': rejected})
+            if parts == ['api', 'v1', 'locations', 'stats']:
+                return _api_response(200, self.ingestor.stats())
+            if parts == ['api', 'v1', 'alerts'] and self.ingestor.engine is not None:
+                return _api_response(200, self.recent_alerts(parse_qs(url.query)))
+            if parts == ['api', 'v1', 'monitoring', 'check-violations'] and self.ingestor.engine is not None:
+                if method != 'POST':
+                    return _api_response(405, error='Use POST')
+                body = json.loads(raw or b'{}')
+                return _api_response(200, self.check_violations(body['location']))
+        except (ValueError, AttributeError, KeyError, TypeError) as e:
+            return _api_response(400, error=str(e))
+        return _api_response(404, error='Not found')
+
+    def recent_alerts(self, query):
+        """Newest alerts first, filtered like the dashboard's ``getAllAlerts``."""
+        limit = int(query.get('limit', ['100'])[0])
+        severity = query.get('severity', [None])[0]
+        zone_id = query.get('zoneId', [None])[0]
+        result = []
+        for alert in reversed(self.ingestor.recent_alerts):
+            if severity and alert['severity'] != severity:
+                continue
+            if zone_id and alert['zoneId'] != zone_id:
+                continue
+            result.append(alert)
+            if len(result) >= limit:
+                break
+        return result
+
+    def check_violations(self, location):
+        """Stateless check of one point, for ``checkGeofenceViolations``."""
+        violations, nearby = [], []
+        for zone, distance in self.ingestor.engine.evaluate(float(location['lat']), float(location['lng'])):
+            entry = {
+                'zoneId': str(zone.zone_id),
+                'zoneName': zone.name,
+                'zoneType': zone.zone_type,
+                'distance': round(distance, 1),
+            }
+            if distance <= 0:
+                violations.append(dict(entry, violationType='entry', severity=zone.severity))
+            else:
+                nearby.append(entry)
+        return {'violations': violations, 'nearbyZones': nearby}
+
+    async def _send(self, writer, status, body, keep_alive=True):
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = [
+            f'HTTP/1.1 {status} {self.REASONS.get(status, "OK")}',
+            'Content-Type: application/json',
+            'Access-Control-Allow-Origin: *',
+            'Access-Control-Allow-Methods: GET, POST, PUT, OPTIONS',
+            'Access-Control-Allow-Headers: Content-Type',
+            f'Content-Length: {len(payload)}',
+            'Connection: ' + ('keep-alive' if keep_alive else 'close'),
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+
+
+async def report(ingestor, interval):
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(json.dumps(ingestor.stats()))
+
+
+async def refresh_zones(ingestor, interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await ingestor.refresh_zones()
+        except Exception as e:
+            logger.error('zone refresh failed: %s', e)
+
+
+async def serve(args):
+    pool = await pymysql.aio.create_pool(
+        minsize=1,
+        maxsize=args.pool_size,
+        pool_recycle=300,
+        host=args.db_host,
+        port=args.db_port,
+        user=args.db_user,
+        password=args.db_password,
+        database=args.db_name,
+    )
+    engine = None if args.no_geofence else GeofenceEngine(proximity_m=args.proximity)
+    ingestor = LocationIngestor(pool, args.batch_size, args.flush_interval,
+                                args.history_format, args.tolerance, engine)
+    background = []
+    if engine is not None:
+        logger.info('loaded %d risk zones', await ingestor.refresh_zones())
+        background.append(asyncio.ensure_future(refresh_zones(ingestor, args.zone_refresh)))
+    ingestor.start()
+    server = await asyncio.start_server(LocationHTTPServer(ingestor).handle, args.host, args.port)
+    background.append(asyncio.ensure_future(report(ingestor, args.report_interval)))
+    logger.info('listening on %s:%d', args.host, args.port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in background:
+            task.cancel()
+        await ingestor.stop()
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tourist location ingestion service.')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8080)))
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='flush as soon as this many tourists have pending pings')
+    parser.add_argument('--flush-interval', type=float, default=DEFAULT_FLUSH_INTERVAL,
+                        help='flush at least this often (seconds)')
+    parser.add_argument('--history-format', choices=HISTORY_FORMATS,
+                        default=os.environ.get('HISTORY_FORMAT', 'raw'))
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE_M,
+                        help='line simplification tolerance in metres for --history-format segments')
+    parser.add_argument('--no-geofence', action='store_true', help='do not evaluate risk zones')
+    parser.add_argument('--proximity', type=float, default=0.0,
+                        help='emit proximity alerts within this many metres of a zone (0 = off)')
+    parser.add_argument('--zone-refresh', type=float, default=300.0,
+                        help='seconds between reloads of risk_zones')
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--report-interval', type=float, default=30.0)
+    parser.add_argument('--db-host', default=os.environ.get('DB_HOST', '127.0.0.1'))
+    parser.add_argument('--db-port', type=int, default=int(os.environ.get('DB_PORT', 3306)))
+    parser.add_argument('--db-user', default=os.environ.get('DB_USER', 'root'))
+    parser.add_argument('--db-password', default=os.environ.get('DB_PASSWORD', ''))
+    parser.add_argument('--db-name', default=os.environ.get('DB_NAME'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Helpers shared by the command-line tools.
+
+Importing this module puts both Lambda layers on ``sys.path`` so the tools
+run straight from a checkout.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _layer in (
+    os.path.join(BACKEND_DIR, 'common-layer', 'python'),
+    os.path.join(BACKEND_DIR, 'db-querry-lambdas', 'pymysql-layer', 'python'),
+):
+    if _layer not in sys.path:
+        sys.path.insert(0, _layer)
+
+import pymysql  # noqa: E402
+
+
+def add_db_arguments(parser):
+    """Add connection options, defaulting to the Lambda environment variables."""
+    group = parser.add_argument_group('database')
+    group.add_argument('--db-host', default=os.environ.get('DB_HOST', '127.0.0.1'))
+    group.add_argument('--db-port', type=int, default=int(os.environ.get('DB_PORT', 3306)))
+    group.add_argument('--db-user', default=os.environ.get('DB_USER', 'root'))
+    group.add_argument('--db-password', default=os.environ.get('DB_PASSWORD', ''))
+    group.add_argument('--db-name', default=os.environ.get('DB_NAME'))
+
+
+def connect(args, **kwargs):
+    """Open a connection from the options added by :func:`add_db_arguments`."""
+    return pymysql.connect(
+        host=args.db_host,
+        port=args.db_port,
+        user=args.db_user,
+        password=args.db_password,
+        database=args.db_name,
+        **kwargs
+    )
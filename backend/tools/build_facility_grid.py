@@ -0,0 +1,68 @@
+"""
+Build the nearest-facility lookup grids.
+
+Loads every hospital and/or police station, and either updates the grid
+stored in ``facility_grids`` (recomputing only the cells that added,
+removed or moved facilities can affect) or builds it from scratch. The
+nearest_* Lambda functions pick the new grid up within
+``FACILITY_GRID_TTL`` seconds.
+
+    python backend/tools/build_facility_grid.py all
+    python backend/tools/build_facility_grid.py hospitals --full --max-candidates 16
+"""
+
+import argparse
+import json
+import time
+
+import _common
+from navrakshak.facilities import DEFAULT_MAX_CANDIDATES, FACILITY_SQL, FacilityGrid, load_facilities, load_grid, save_grid
+
+
+def build(connection, facility_type, max_candidates, full):
+    started = time.perf_counter()
+    facilities = load_facilities(connection, facility_type)
+    grid = None if full else load_grid(connection, facility_type)
+    if grid is not None and grid.max_candidates == max_candidates:
+        changed, recomputed = grid.update(facilities)
+        mode = 'incremental'
+    else:
+        grid = FacilityGrid(facilities, max_candidates=max_candidates)
+        changed, recomputed = len(facilities), len(grid.cells)
+        mode = 'full'
+    built = time.perf_counter()
+    if changed:
+        save_grid(connection, facility_type, grid)
+    return {
+        'facility_type': facility_type,
+        'mode': mode,
+        'facilities': len(facilities),
+        'changed': changed,
+        'cells': len(grid.cells),
+        'recomputed': recomputed,
+        'bytes': len(grid.to_bytes()),
+        'build_seconds': round(built - started, 3),
+        'save_seconds': round(time.perf_counter() - built, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the nearest-facility lookup grids.')
+    parser.add_argument('facility_type', choices=sorted(FACILITY_SQL) + ['all'])
+    parser.add_argument('--max-candidates', type=int, default=DEFAULT_MAX_CANDIDATES,
+                        help='split cells with more candidate facilities than this')
+    parser.add_argument('--full', action='store_true', help='ignore the stored grid and rebuild every cell')
+    _common.add_db_arguments(parser)
+    args = parser.parse_args()
+
+    types = sorted(FACILITY_SQL) if args.facility_type == 'all' else [args.facility_type]
+    connection = _common.connect(args)
+    try:
+        for facility_type in types:
+            print(json.dumps(build(connection, facility_type, args.max_candidates, args.full)))
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Build risk heatmap tiles into a directory.
+
+Loads every zone from ``risk_zones`` and ``zone_polygons``, compares them
+with the ``manifest.json`` of the previous build in the output directory
+and re-renders only the tiles under zones that changed. The result is a
+static ``{z}/{x}/{y}.png`` tree that any web server, S3 bucket or CDN can
+serve as is.
+
+    python backend/tools/build_heatmap_tiles.py tiles/ --zooms 5-12
+    python backend/tools/build_heatmap_tiles.py tiles/ --formats png,grid --full
+"""
+
+import argparse
+import json
+import os
+import time
+
+import _common
+from navrakshak.spatial import load_all_zones
+from navrakshak.tiles import DEFAULT_TILE_SIZE, FORMATS, build_tiles
+
+
+class DirectoryStore:
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data, content_type):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a server never sees a half-written tile
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def parse_zooms(value):
+    if '-' in value:
+        first, last = value.split('-')
+        return range(int(first), int(last) + 1)
+    return [int(z) for z in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build risk heatmap tiles from the risk zones.')
+    parser.add_argument('out', help='output directory')
+    parser.add_argument('--zooms', type=parse_zooms, default=parse_zooms('5-12'), help='e.g. 5-12 or 6,8,10')
+    parser.add_argument('--size', type=int, default=DEFAULT_TILE_SIZE, help='tile size in pixels')
+    parser.add_argument('--formats', default='png', help=f"comma-separated: {', '.join(FORMATS)}")
+    parser.add_argument('--full', action='store_true', help='ignore the previous manifest and render everything')
+    _common.add_db_arguments(parser)
+    args = parser.parse_args()
+
+    formats = tuple(args.formats.split(','))
+    for fmt in formats:
+        if fmt not in FORMATS:
+            parser.error(f'unknown format: {fmt}')
+
+    started = time.perf_counter()
+    connection = _common.connect(args)
+    try:
+        zones = load_all_zones(connection)
+    finally:
+        connection.close()
+    loaded = time.perf_counter()
+    stats = build_tiles(zones, DirectoryStore(args.out), args.zooms, args.size, formats, args.full)
+    stats.update({
+        'load_seconds': round(loaded - started, 3),
+        'render_seconds': round(time.perf_counter() - loaded, 3),
+    })
+    print(json.dumps(stats))
+
+
+if __name__ == '__main__':
+    main()
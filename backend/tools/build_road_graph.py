@@ -0,0 +1,119 @@
+"""
+Build the road graph used for travel-time ranking.
+
+Reads an OpenStreetMap XML extract (``.osm``, ``.osm.gz`` or ``.osm.bz2``),
+keeps the drivable ``highway`` ways, and writes the flat binary graph
+loaded by :func:`navrakshak.roads.load_graph`. PBF extracts can be
+converted first, e.g. ``osmium cat region.osm.pbf -o region.osm``.
+Runs offline; the database is not touched.
+
+    python backend/tools/build_road_graph.py region.osm.bz2 road-graph.bin
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+
+import _common  # noqa: F401  (puts the layers on sys.path)
+from navrakshak.roads import MAX_EDGE_M, ROAD_SPEEDS_KMH, build_graph
+
+NO_ACCESS = {'no', 'private'}
+
+
+def open_extract(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def way_speed(tags):
+    """km/h for a drivable way, or ``None`` to skip it."""
+    highway = tags.get('highway')
+    if highway not in ROAD_SPEEDS_KMH or tags.get('access') in NO_ACCESS or tags.get('motor_vehicle') in NO_ACCESS:
+        return None
+    speed = ROAD_SPEEDS_KMH[highway]
+    match = re.match(r'\s*(\d+(?:\.\d+)?)\s*(mph)?', tags.get('maxspeed', ''))
+    if match:
+        # Tagged limits are upper bounds; traffic rarely reaches them
+        limit = float(match.group(1)) * (1.609 if match.group(2) else 1.0)
+        speed = min(speed * 1.25, limit * 0.8)
+    return max(speed, 5.0)
+
+
+def way_direction(tags):
+    oneway = tags.get('oneway')
+    if oneway in ('yes', 'true', '1'):
+        return 1
+    if oneway == '-1':
+        return -1
+    if oneway is None and (tags.get('junction') == 'roundabout' or tags.get('highway') == 'motorway'):
+        return 1
+    return 0
+
+
+def read_ways(path):
+    ways = []
+    with open_extract(path) as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == 'way':
+                tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+                speed = way_speed(tags)
+                if speed is not None:
+                    ways.append(([int(nd.get('ref')) for nd in element.iter('nd')], speed, way_direction(tags)))
+                element.clear()
+            elif element.tag in ('node', 'relation'):
+                element.clear()
+    return ways
+
+
+def read_nodes(path, wanted):
+    nodes = {}
+    with open_extract(path) as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == 'node':
+                node_id = int(element.get('id'))
+                if node_id in wanted:
+                    nodes[node_id] = (float(element.get('lat')), float(element.get('lon')))
+            if element.tag in ('node', 'way', 'relation'):
+                element.clear()
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the road graph used for travel-time ranking.')
+    parser.add_argument('extract', help='OSM XML extract (.osm, .osm.gz, .osm.bz2)')
+    parser.add_argument('out', help='output graph file')
+    parser.add_argument('--max-edge-m', type=float, default=MAX_EDGE_M,
+                        help='keep a shape point at least this often along a road')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    # Two passes, so only the nodes of road ways are held in memory
+    ways = read_ways(args.extract)
+    nodes = read_nodes(args.extract, {ref for refs, _, _ in ways for ref in refs})
+    parsed = time.perf_counter()
+    graph = build_graph(nodes, ways, args.max_edge_m)
+    data = graph.to_bytes()
+    with open(args.out + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(args.out + '.tmp', args.out)
+    print(json.dumps({
+        'ways': len(ways),
+        'osm_nodes': len(nodes),
+        'nodes': len(graph),
+        'edges': graph.edge_count,
+        'bytes': len(data),
+        'parse_seconds': round(parsed - started, 3),
+        'build_seconds': round(time.perf_counter() - parsed, 3),
+    }))
+
+
+if __name__ == '__main__':
+    main()
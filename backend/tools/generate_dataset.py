@@ -0,0 +1,404 @@
+"""
+Fill a database with a synthetic NavRakshak dataset.
+
+Generates hospitals, police stations, risk zones, tourists with their
+location pings and an announcement archive around major Indian cities.
+Facilities cluster around the cities in proportion to their population,
+with a rural share spread much wider; risk zones come in overlapping
+clusters; every tourist walks a track of pings ending at ``--now``, whose
+last point is also their ``tourist_locations`` row and ``last_stayed``
+position. Announcements span the two years before ``--now``, so most of
+them are expired history and only a few are currently valid.
+
+Rows go straight into the database (chunked ``INSERT``s, or ``LOAD DATA
+LOCAL INFILE`` for big tables, the two paths of ``ingest_facilities.py``)
+or into one CSV file per table with ``--csv``. Every table draws from its
+own random stream seeded from ``--seed`` (tracks: one stream per
+tourist), so the same seed, sizes and ``--now`` always give the same rows,
+and resizing one table does not change the others. Rows are generated
+while they are written, so memory use does not grow with the scale.
+Tourists log in with the password ``password123``.
+
+    python backend/tools/generate_dataset.py --truncate
+    python backend/tools/generate_dataset.py --scale 100 --mode load-data --truncate
+    python backend/tools/generate_dataset.py --scale 10 --csv dataset/ --now 2025-09-10
+"""
+
+import argparse
+import bisect
+import csv
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import _common
+from ingest_facilities import BBOXES, DEFAULT_CHUNK_ROWS, TABLES, load_data_local, load_executemany
+from navrakshak.history import maintain_partitions
+
+# Rows per table at --scale 1; 100x is a national-scale dataset
+# (1M tourists, 20M pings)
+DEFAULT_SIZES = {
+    'hospitals': 500,
+    'police_stations': 1000,
+    'risk_zones': 300,
+    'tourists': 10000,
+    'tourist_locations': 10000,
+    'location_history': 200000,
+    'announcements': 1000,
+}
+
+COLUMNS = {
+    **{table: TABLES[table] for table in ('hospitals', 'police_stations', 'risk_zones')},
+    'tourists': ['tourist_id', 'password', 'name', 'phone', 'email', 'emergency_contact', 'date_of_birth',
+                 'address', 'last_stayed_lat', 'last_stayed_lon'],
+    'tourist_locations': ['tourist_id', 'latitude', 'longitude', 'accuracy_m', 'recorded_at'],
+    'location_history': ['tourist_id', 'recorded_at', 'latitude', 'longitude', 'accuracy_m'],
+    'announcements': ['title', 'content', 'category', 'source', 'priority', 'location', 'valid_from',
+                      'valid_until', 'is_active', 'published_at'],
+}
+
+# (city, state, latitude, longitude, metro population in millions)
+CITIES = [
+    ('Delhi', 'Delhi', 28.6139, 77.2090, 32.0), ('Mumbai', 'Maharashtra', 19.0760, 72.8777, 21.0),
+    ('Bengaluru', 'Karnataka', 12.9716, 77.5946, 13.0), ('Kolkata', 'West Bengal', 22.5726, 88.3639, 15.0),
+    ('Chennai', 'Tamil Nadu', 13.0827, 80.2707, 11.5), ('Hyderabad', 'Telangana', 17.3850, 78.4867, 10.5),
+    ('Ahmedabad', 'Gujarat', 23.0225, 72.5714, 8.5), ('Pune', 'Maharashtra', 18.5204, 73.8567, 7.0),
+    ('Jaipur', 'Rajasthan', 26.9124, 75.7873, 4.1), ('Lucknow', 'Uttar Pradesh', 26.8467, 80.9462, 3.8),
+    ('Agra', 'Uttar Pradesh', 27.1767, 78.0081, 1.9), ('Varanasi', 'Uttar Pradesh', 25.3176, 82.9739, 1.6),
+    ('Ghaziabad', 'Uttar Pradesh', 28.6692, 77.4538, 2.4), ('Patna', 'Bihar', 25.5941, 85.1376, 2.5),
+    ('Bhopal', 'Madhya Pradesh', 23.2599, 77.4126, 2.4), ('Goa', 'Goa', 15.4909, 73.8278, 1.5),
+    ('Kochi', 'Kerala', 9.9312, 76.2673, 2.1), ('Amritsar', 'Punjab', 31.6340, 74.8723, 1.2),
+    ('Shimla', 'Himachal Pradesh', 31.1048, 77.1734, 0.2), ('Guwahati', 'Assam', 26.1445, 91.7362, 1.1),
+    ('Bhubaneswar', 'Odisha', 20.2961, 85.8245, 1.0), ('Udaipur', 'Rajasthan', 24.5854, 73.7125, 0.6),
+    ('Rishikesh', 'Uttarakhand', 30.0869, 78.2676, 0.1), ('Mysuru', 'Karnataka', 12.2958, 76.6394, 1.0),
+]
+CUM_POPULATION = list(itertools.accumulate(city[4] for city in CITIES))
+
+# Share of facilities outside the city clusters
+RURAL_SHARE = {'hospitals': 0.25, 'police_stations': 0.35}
+RURAL_SPREAD_DEG = 1.5
+INDIA = BBOXES['india']
+
+HOSPITAL_TYPES = ['Government', 'Private', 'Trust', 'Military']
+ANNOUNCEMENT_CATEGORIES = ['Safety', 'Advisory', 'Weather', 'Traffic', 'Health']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+PRIORITY_WEIGHTS = [30, 45, 20, 5]
+WORDS = (
+    'heavy rainfall expected avoid low lying areas monitor official alerts traffic diversion near temple '
+    'tourists advised carry identification emergency helpline police hospital district authority advisory '
+    'safety heatwave hydrated outdoor exposure vulnerable persons earthquake drill crowd festival route closed'
+).split()
+
+PASSWORD_HASH = hashlib.md5(b'password123').hexdigest()
+ARCHIVE_DAYS = 730
+PING_INTERVAL_S = (300, 900)
+PING_STEP_DEG = 0.002  # ~200 m between pings
+
+# auto mode switches to LOAD DATA LOCAL from this many rows
+LOAD_DATA_MIN_ROWS = 100000
+LOAD_DATA_CHUNK_ROWS = 500000
+
+
+def near_city(rng, spread_deg=0.25, weighted=True):
+    """``(city, lat, lon)`` scattered around a city.
+
+    :param weighted: Pick cities in proportion to their population (else
+        uniformly); the spread also grows with the population.
+    """
+    if weighted:
+        city = CITIES[bisect.bisect(CUM_POPULATION, rng.random() * CUM_POPULATION[-1])]
+        spread_deg *= min(2.0, max(0.4, math.sqrt(city[4] / 10)))
+    else:
+        city = rng.choice(CITIES)
+    return city, round(rng.gauss(city[2], spread_deg), 6), round(rng.gauss(city[3], spread_deg), 6)
+
+
+def facility_site(rng, table):
+    """``(city, lat, lon)`` of a facility: clustered in a city or rural, inside India."""
+    if rng.random() < RURAL_SHARE[table]:
+        city, lat, lon = near_city(rng, RURAL_SPREAD_DEG, weighted=False)
+        lat = round(min(max(lat, INDIA[0]), INDIA[1]), 6)
+        lon = round(min(max(lon, INDIA[2]), INDIA[3]), 6)
+        return city, lat, lon
+    return near_city(rng)
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def phone(rng):
+    return f'+91{rng.randint(6000000000, 9999999999)}'
+
+
+def hospitals(rng, n, context):
+    for i in range(n):
+        city, lat, lon = facility_site(rng, 'hospitals')
+        kind = rng.choice(HOSPITAL_TYPES)
+        yield (f'{city[0]} {kind} Hospital {i}', f'{i} Hospital Road, {city[0]}', phone(rng), kind, lat, lon,
+               city[0], city[1])
+
+
+def police_stations(rng, n, context):
+    for i in range(n):
+        city, lat, lon = facility_site(rng, 'police_stations')
+        yield (f'{city[0]} Police Station {i}', f'{i} Station Road, {city[0]}', phone(rng), lat, lon, city[0],
+               city[1])
+
+
+def risk_zones(rng, n, context):
+    """Zones in clusters around hotspots; most zones overlap an earlier one."""
+    hotspot = None
+    for i in range(n):
+        if hotspot is None or rng.random() < 0.4:
+            city, lat, lon = near_city(rng, 0.5)
+            hotspot = (city, lat, lon, 0.0)
+        city, lat, lon, radius_km = hotspot
+        if radius_km:
+            # centre within the previous zone's radius (1 degree ~ 111 km)
+            offset = rng.uniform(0, radius_km) / 111
+            angle = rng.uniform(0, 2 * math.pi)
+            lat = round(lat + offset * math.cos(angle), 6)
+            lon = round(lon + offset * math.sin(angle) / math.cos(math.radians(lat)), 6)
+        radius_km = round(min(25.0, max(0.2, rng.lognormvariate(1.0, 0.8))), 2)
+        hotspot = (city, lat, lon, radius_km)
+        yield (f'{city[0]} Zone {i}', sentence(rng, 12), round(rng.triangular(1, 10, 4), 1), lat, lon, radius_km)
+
+
+def pings_of(i, context):
+    """Number of ``location_history`` rows of tourist *i* (1-based)."""
+    tourists = context['sizes'].get('tourists', 0)
+    if not tourists:
+        return 0
+    base, extra = divmod(context['sizes'].get('location_history', 0), tourists)
+    return base + (i <= extra)
+
+
+def track(i, pings, context):
+    """Home city and *pings* ``(recorded_at, lat, lon, accuracy_m)`` of tourist *i*, ending before ``now``.
+
+    Tourists pick destinations uniformly, so small tourist towns get as
+    many visitors as the metros.
+    """
+    rng = random.Random(context['seed'] * 1000003 + i)
+    city, lat, lon = near_city(rng, 0.1, weighted=False)
+    pings = max(pings, 1)
+    window = context['days'] * 86400 - pings * PING_INTERVAL_S[1]
+    at = context['now'] - timedelta(seconds=context['days'] * 86400 - rng.uniform(0, max(window, 0)))
+    points = []
+    for _ in range(pings):
+        points.append((at.replace(microsecond=at.microsecond // 1000 * 1000), round(lat, 6), round(lon, 6),
+                       round(rng.uniform(3, 50), 1)))
+        at += timedelta(seconds=rng.uniform(*PING_INTERVAL_S))
+        lat += rng.gauss(0, PING_STEP_DEG)
+        lon += rng.gauss(0, PING_STEP_DEG)
+    return city, points
+
+
+def tourists(rng, n, context):
+    now = context['now']
+    for i in range(1, n + 1):
+        city, points = track(i, pings_of(i, context), context)
+        _, lat, lon, _ = points[-1]
+        yield (f'T{i:07d}', PASSWORD_HASH, f'Tourist {i}', phone(rng), f'tourist{i}@example.com', phone(rng),
+               (now - timedelta(days=rng.randint(18 * 365, 70 * 365))).date(), f'{city[0]}, {city[1]}',
+               lat, lon)
+
+
+def tourist_locations(rng, n, context):
+    for i in range(1, n + 1):
+        recorded_at, lat, lon, accuracy = track(i, pings_of(i, context), context)[1][-1]
+        yield f'T{i:07d}', lat, lon, accuracy, recorded_at
+
+
+def location_history(rng, n, context):
+    written = 0
+    for i in itertools.count(1):
+        pings = pings_of(i, context)
+        if written >= n or not pings:
+            return
+        tourist_id = f'T{i:07d}'
+        for recorded_at, lat, lon, accuracy in track(i, pings, context)[1][:n - written]:
+            yield tourist_id, recorded_at, lat, lon, accuracy
+        written += pings
+
+
+def announcements(rng, n, context):
+    """An archive: published over :data:`ARCHIVE_DAYS`, mostly expired by ``now``."""
+    now = context['now']
+    for i in range(n):
+        # more announcements recently than two years ago
+        published_at = now - timedelta(minutes=int(ARCHIVE_DAYS * 1440 * rng.random() ** 1.5))
+        valid_until = None if rng.random() < 0.05 else published_at + timedelta(hours=rng.randint(6, 90 * 24))
+        location = 'All India' if rng.random() < 0.2 else near_city(rng)[0][1]
+        category = rng.choice(ANNOUNCEMENT_CATEGORIES)
+        yield (f'{category} notice {i}', sentence(rng, rng.randint(20, 80)), category, f'{location} Authority',
+               rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0], location, published_at, valid_until,
+               int(rng.random() < 0.9), published_at)
+
+
+GENERATORS = {
+    'hospitals': hospitals,
+    'police_stations': police_stations,
+    'risk_zones': risk_zones,
+    'tourists': tourists,
+    'tourist_locations': tourist_locations,
+    'location_history': location_history,
+    'announcements': announcements,
+}
+
+
+def default_now():
+    """Midnight UTC today, the default end of the generated timelines."""
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+
+def generate(table, n, seed=1, sizes=None, now=None, days=7):
+    """Iterator over *n* rows of *table*, in :data:`COLUMNS` order.
+
+    :param sizes: Sizes of the other tables; tourists and pings are spread
+        over ``sizes['tourists']`` (default: *n* for ``tourists``).
+    :param now: End of the ping tracks and the announcement archive.
+    :param days: Ping tracks start at most this many days before *now*.
+    """
+    sizes = sizes or {table: n}
+    context = {
+        'seed': seed,
+        'sizes': {'tourists': n, **sizes} if table == 'tourists' else sizes,
+        'now': now or default_now(),
+        'days': days,
+    }
+    return GENERATORS[table](random.Random(f'{seed}:{table}'), n, context)
+
+
+def sizes_for(scale=1, **overrides):
+    """Row counts per table: :data:`DEFAULT_SIZES` times *scale*, then *overrides*.
+
+    ``tourist_locations`` follows ``tourists`` unless set explicitly.
+    """
+    sizes = {table: round(n * scale) for table, n in DEFAULT_SIZES.items()}
+    sizes.update((table, n) for table, n in overrides.items() if n is not None)
+    if overrides.get('tourist_locations') is None:
+        sizes['tourist_locations'] = sizes['tourists']
+    sizes['tourist_locations'] = min(sizes['tourist_locations'], sizes['tourists'])
+    return sizes
+
+
+def choose_mode(n, mode):
+    if mode != 'auto':
+        return mode
+    return 'load-data' if n >= LOAD_DATA_MIN_ROWS else 'executemany'
+
+
+def _csv_field(value):
+    return '' if value is None else value
+
+
+def write_csv(directory, sizes, seed=1, now=None, days=7, tables=None):
+    """Write ``<table>.csv`` (with a header row) per table into *directory*.
+
+    The facility and zone files are valid input for ``ingest_facilities.py``.
+    *tables* restricts the output to some tables of *sizes*.
+
+    :return: ``{table: {'rows': n, 'seconds': s, 'path': path}}``
+    """
+    os.makedirs(directory, exist_ok=True)
+    summary = {}
+    for table in tables or sizes:
+        n = sizes[table]
+        started = time.perf_counter()
+        path = os.path.join(directory, f'{table}.csv')
+        rows = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS[table])
+            for row in generate(table, n, seed, sizes, now, days):
+                writer.writerow([_csv_field(v) for v in row])
+                rows += 1
+        summary[table] = {'rows': rows, 'seconds': round(time.perf_counter() - started, 3), 'path': path}
+    return summary
+
+
+def load(connection, sizes, seed=1, truncate=False, chunk_rows=DEFAULT_CHUNK_ROWS, mode='executemany',
+         now=None, days=7, tables=None):
+    """Generate and insert every table in *sizes* (or only *tables*).
+
+    :param mode: ``executemany``, ``load-data`` (needs a connection opened
+        with ``local_infile=True``) or ``auto``, which uses ``LOAD DATA
+        LOCAL`` from :data:`LOAD_DATA_MIN_ROWS` rows up.
+    :return: ``{table: {'rows': n, 'seconds': s, 'mode': mode}}``
+    """
+    now = now or default_now()
+    summary = {}
+    for table in tables or sizes:
+        n = sizes[table]
+        started = time.perf_counter()
+        if truncate:
+            with connection.cursor() as cursor:
+                cursor.execute(f'TRUNCATE TABLE {table}')
+        if table == 'location_history' and n:
+            # day partitions for the pings (the maintenance job keeps them from here on)
+            maintain_partitions(connection, today=now.date(), retention_days=max(days, 30))
+        table_mode = choose_mode(n, mode)
+        rows = generate(table, n, seed, sizes, now, days)
+        if not n:
+            inserted = 0
+        elif table_mode == 'load-data':
+            inserted = 0
+            while True:
+                chunk = list(itertools.islice(rows, LOAD_DATA_CHUNK_ROWS))
+                if not chunk:
+                    break
+                inserted += load_data_local(connection, table, chunk, columns=COLUMNS[table])
+        else:
+            inserted = load_executemany(connection, table, rows, chunk_rows, columns=COLUMNS[table])
+        summary[table] = {'rows': inserted, 'seconds': round(time.perf_counter() - started, 3), 'mode': table_mode}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill a database with a synthetic NavRakshak dataset.')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every default table size (1, 10, 100)')
+    for table, n in DEFAULT_SIZES.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table,
+                            help=f'rows (default {n} times --scale)')
+    parser.add_argument('--tables', help='comma-separated subset of tables to generate')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--now', type=date.fromisoformat,
+                        help='end of the ping tracks and announcement archive, YYYY-MM-DD (default: today)')
+    parser.add_argument('--days', type=int, default=7, help='length of the ping tracks window')
+    parser.add_argument('--csv', metavar='DIR', help='write CSV files instead of loading the database')
+    parser.add_argument('--mode', choices=['auto', 'load-data', 'executemany'], default='auto',
+                        help=f'auto uses LOAD DATA LOCAL from {LOAD_DATA_MIN_ROWS} rows up')
+    parser.add_argument('--truncate', action='store_true', help='empty each table first')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    _common.add_db_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = sizes_for(args.scale, **{table: getattr(args, table) for table in DEFAULT_SIZES})
+    tables = args.tables.split(',') if args.tables else list(sizes)
+    unknown = set(tables) - set(sizes)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+    now = datetime.combine(args.now, datetime.min.time()) if args.now else default_now()
+
+    if args.csv:
+        summary = write_csv(args.csv, sizes, args.seed, now, args.days, tables)
+    else:
+        local_infile = any(choose_mode(sizes[table], args.mode) == 'load-data' for table in tables)
+        connection = _common.connect(args, local_infile=local_infile)
+        try:
+            summary = load(connection, sizes, args.seed, args.truncate, args.chunk_rows, args.mode, now, args.days,
+                           tables)
+        finally:
+            connection.close()
+    print(json.dumps({'seed': args.seed, 'now': now.isoformat(), 'tables': summary}))
+
+
+if __name__ == '__main__':
+    main()
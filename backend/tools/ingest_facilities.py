@@ -0,0 +1,312 @@
+"""
+Bulk-load hospitals, police stations and risk zones into RDS.
+
+Reads CSV, GeoJSON (FeatureCollection) or GeoJSON text sequences (one
+Feature per line), validates coordinates and streams the rows into MySQL
+either with ``LOAD DATA LOCAL INFILE`` (large inputs) or with chunked
+multi-row ``INSERT ... VALUES`` through ``Cursor.executemany``.
+
+    python backend/tools/ingest_facilities.py hospitals data/hospitals.csv
+    python backend/tools/ingest_facilities.py risk_zones zones.geojson --mode executemany
+    python backend/tools/ingest_facilities.py zone_polygons zones.geojson
+
+CSV headers must match the column names of the target table. GeoJSON
+features take their columns from ``properties`` and latitude/longitude
+from a ``Point`` geometry. ``zone_polygons`` reads ``Polygon`` features
+only (outer ring plus holes) and is always loaded with ``executemany``,
+since its packed vertex blob cannot go through a TSV spool.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+import _common
+from navrakshak.spatial import polygon_row
+
+TABLES = {
+    'hospitals': ['name', 'address', 'phone', 'type', 'latitude', 'longitude', 'district', 'state'],
+    'police_stations': ['name', 'address', 'phone', 'latitude', 'longitude', 'district', 'state'],
+    'risk_zones': ['zone_name', 'description', 'risk_score', 'latitude', 'longitude', 'radius_km'],
+    'zone_polygons': ['zone_name', 'description', 'risk_score', 'min_lat', 'min_lon', 'max_lat', 'max_lon',
+                      'vertex_count', 'vertices'],
+}
+
+REQUIRED = {
+    'hospitals': ['name', 'address'],
+    'police_stations': ['name', 'address'],
+    'risk_zones': ['zone_name', 'risk_score', 'radius_km'],
+    'zone_polygons': ['zone_name', 'risk_score'],
+}
+
+# Approximate bounding box of India, used with --bbox india
+BBOXES = {
+    'world': (-90.0, 90.0, -180.0, 180.0),
+    'india': (6.0, 37.5, 68.0, 97.5),
+}
+
+# Inputs at least this large go through LOAD DATA LOCAL in --mode auto
+LOAD_DATA_THRESHOLD_BYTES = 8 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 5000
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def _feature_record(feature):
+    record = dict(feature.get('properties') or {})
+    geometry = feature.get('geometry') or {}
+    if geometry.get('type') == 'Point':
+        record['longitude'], record['latitude'] = geometry['coordinates'][:2]
+    elif geometry.get('type') == 'Polygon':
+        record['rings'] = [[(c[1], c[0]) for c in ring] for ring in geometry['coordinates']]
+    return record
+
+
+def read_geojson(path):
+    with open(path, encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '\x1e' or _looks_like_sequence(f):
+            # GeoJSON text sequence: stream one feature per line
+            for line in f:
+                line = line.strip().lstrip('\x1e')
+                if line:
+                    yield _feature_record(json.loads(line))
+            return
+        f.seek(0)
+        for feature in json.load(f).get('features', []):
+            yield _feature_record(feature)
+
+
+def _looks_like_sequence(f):
+    line = f.readline()
+    f.seek(0)
+    try:
+        return json.loads(line).get('type') == 'Feature'
+    except (ValueError, AttributeError):
+        return False
+
+
+def read_records(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.geojson', '.geojsonl', '.geojsons', '.json', '.ndjson'):
+        return read_geojson(path)
+    return read_csv(path)
+
+
+def validate(table, record, bbox):
+    """Return the row tuple for *table*, or raise :class:`InvalidRow`."""
+    if table == 'zone_polygons':
+        return validate_polygon(record, bbox)
+    row = []
+    for column in TABLES[table]:
+        value = record.get(column)
+        if isinstance(value, str):
+            value = value.strip() or None
+        row.append(value)
+    values = dict(zip(TABLES[table], row))
+
+    for column in REQUIRED[table]:
+        if values[column] is None:
+            raise InvalidRow(f'missing {column}')
+
+    try:
+        lat = float(values['latitude'])
+        lon = float(values['longitude'])
+    except (TypeError, ValueError):
+        raise InvalidRow('latitude/longitude missing or not numeric')
+    min_lat, max_lat, min_lon, max_lon = bbox
+    if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+        raise InvalidRow(f'coordinates out of range: {lat}, {lon}')
+    values['latitude'] = round(lat, 6)
+    values['longitude'] = round(lon, 6)
+
+    if table == 'risk_zones':
+        try:
+            values['risk_score'] = round(float(values['risk_score']), 1)
+            values['radius_km'] = round(float(values['radius_km']), 2)
+        except (TypeError, ValueError):
+            raise InvalidRow('risk_score/radius_km not numeric')
+        if not 0 <= values['risk_score'] <= 10:
+            raise InvalidRow(f"risk_score out of range: {values['risk_score']}")
+        if not 0 < values['radius_km'] < 1000:
+            raise InvalidRow(f"radius_km out of range: {values['radius_km']}")
+
+    return tuple(values[c] for c in TABLES[table])
+
+
+def validate_polygon(record, bbox):
+    values = {}
+    for column in ('zone_name', 'description', 'risk_score'):
+        value = record.get(column)
+        if isinstance(value, str):
+            value = value.strip() or None
+        values[column] = value
+    for column in REQUIRED['zone_polygons']:
+        if values[column] is None:
+            raise InvalidRow(f'missing {column}')
+    try:
+        risk_score = round(float(values['risk_score']), 1)
+    except (TypeError, ValueError):
+        raise InvalidRow('risk_score not numeric')
+    if not 0 <= risk_score <= 10:
+        raise InvalidRow(f'risk_score out of range: {risk_score}')
+
+    rings = record.get('rings')
+    if not rings:
+        raise InvalidRow('no Polygon geometry')
+    min_lat, max_lat, min_lon, max_lon = bbox
+    try:
+        for ring in rings:
+            for lat, lon in ring:
+                if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                    raise InvalidRow(f'coordinates out of range: {lat}, {lon}')
+        return polygon_row(values['zone_name'], risk_score, rings, values['description'])
+    except InvalidRow:
+        raise
+    except (TypeError, ValueError) as e:
+        raise InvalidRow(f'invalid polygon: {e}')
+
+
+def valid_rows(table, records, bbox, stats, rejects=None):
+    """Yield validated row tuples, counting and optionally logging rejects."""
+    for line_no, record in enumerate(records, 1):
+        stats['read'] += 1
+        try:
+            yield validate(table, record, bbox)
+        except InvalidRow as e:
+            stats['rejected'] += 1
+            if rejects is not None:
+                rejects.write(f'{line_no}\t{e}\t{json.dumps(record, default=str)}\n')
+
+
+def _tsv_field(value):
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def load_executemany(connection, table, rows, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, columns=None):
+    """Insert *rows* with multi-row INSERTs, committing every *chunk_rows*.
+
+    *columns* defaults to the validated columns of *table* in :data:`TABLES`.
+    """
+    columns = columns or TABLES[table]
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+           f"VALUES ({', '.join(['%s'] * len(columns))})")
+    inserted = 0
+    chunk = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                inserted += cursor.executemany(sql, chunk)
+                connection.commit()
+                chunk = []
+                if progress:
+                    progress(inserted)
+        if chunk:
+            inserted += cursor.executemany(sql, chunk)
+            connection.commit()
+    return inserted
+
+
+def load_data_local(connection, table, rows, columns=None):
+    """Spool *rows* to a temporary TSV file and send it with LOAD DATA LOCAL."""
+    columns = columns or TABLES[table]
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', delete=False) as spool:
+        for row in rows:
+            spool.write('\t'.join(_tsv_field(v) for v in row))
+            spool.write('\n')
+        path = spool.name
+    try:
+        with connection.cursor() as cursor:
+            inserted = cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,)
+            )
+        connection.commit()
+    finally:
+        os.unlink(path)
+    return inserted
+
+
+def choose_mode(path, mode, table=None):
+    if table == 'zone_polygons':
+        return 'executemany'
+    if mode != 'auto':
+        return mode
+    if os.path.getsize(path) >= LOAD_DATA_THRESHOLD_BYTES:
+        return 'load-data'
+    return 'executemany'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load facility and risk zone datasets.')
+    parser.add_argument('table', choices=sorted(TABLES))
+    parser.add_argument('path', help='CSV, GeoJSON or GeoJSON text sequence file')
+    parser.add_argument('--mode', choices=['auto', 'load-data', 'executemany'], default='auto',
+                        help=f'auto uses LOAD DATA LOCAL from {LOAD_DATA_THRESHOLD_BYTES // 2**20} MB up')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--bbox', choices=sorted(BBOXES), default='india')
+    parser.add_argument('--rejects', help='write rejected rows (line, reason, record) to this file')
+    parser.add_argument('--dry-run', action='store_true', help='validate only, do not touch the database')
+    _common.add_db_arguments(parser)
+    args = parser.parse_args()
+
+    mode = choose_mode(args.path, args.mode, args.table)
+    stats = {'read': 0, 'rejected': 0}
+    rejects = open(args.rejects, 'w', encoding='utf-8') if args.rejects else None
+    started = time.perf_counter()
+
+    def progress(done):
+        elapsed = time.perf_counter() - started
+        print(f'  {done} rows inserted ({done / elapsed:,.0f} rows/s)', file=sys.stderr)
+
+    try:
+        rows = valid_rows(args.table, read_records(args.path), BBOXES[args.bbox], stats, rejects)
+        if args.dry_run:
+            mode = 'dry-run'
+            inserted = sum(1 for _ in rows)
+        else:
+            connection = _common.connect(args, local_infile=(mode == 'load-data'))
+            try:
+                if mode == 'load-data':
+                    inserted = load_data_local(connection, args.table, rows)
+                else:
+                    inserted = load_executemany(connection, args.table, rows, args.chunk_rows, progress)
+            finally:
+                connection.close()
+    finally:
+        if rejects:
+            rejects.close()
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'table': args.table,
+        'mode': mode,
+        'rows_read': stats['read'],
+        'rows_rejected': stats['rejected'],
+        'rows_inserted': inserted,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(stats['read'] / elapsed) if elapsed else None,
+    }))
+
+
+if __name__ == '__main__':
+    main()